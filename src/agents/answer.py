@@ -1,7 +1,7 @@
 from swarm import Agent
 from src.services.azure_client import AzureOpenAIClient
 from src.core.config import Config
-from src.core.knowledge_base import KnowledgeBase
+from src.core.knowledge_registry import get_knowledge_base
 from . import get_prompt
 import logging
 import re
@@ -15,7 +15,7 @@ azure_client = AzureOpenAIClient(
 )
 logger = logging.getLogger(__name__)
 
-kb = KnowledgeBase(qdrant_url='http://localhost:6333', collection_name='research_knowledge')
+kb = get_knowledge_base()
 
 def get_non_code_text_length(markdown_text):
     # Find the first code block
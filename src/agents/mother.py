@@ -255,12 +255,12 @@ class MotherAgent:
         answer_text = answer.functions[0](context_variables, user_query)
         history.append({"agent": "Answer", "type": "answer", "color": "green", "output": answer_text})
 
-        # Store in Knowledge Base
+        # Store in Knowledge Base (write-behind, so the reviewer does not wait on embedding/upserts)
         try:
-            from src.core.knowledge_base import KnowledgeBase
-            kb = KnowledgeBase(qdrant_url='http://localhost:6333', collection_name='research_knowledge')
-            point_ids = kb.add_research_result(user_query, answer_text, context_variables.get('sources', []), context_variables.get('session_id'))
-            history.append({"agent": "KnowledgeBase", "type": "storage", "color": "blue", "output": f"Stored research result in KB with point_ids: {point_ids}"})
+            from src.core.knowledge_registry import get_knowledge_base
+            from src.core.ingestion_queue import get_ingestion_worker
+            get_ingestion_worker().submit_research_result(get_knowledge_base(), user_query, answer_text, context_variables.get('sources', []), context_variables.get('session_id'))
+            history.append({"agent": "KnowledgeBase", "type": "storage", "color": "blue", "output": "Queued research result for storage in KB"})
         except Exception as e:
             history.append({"agent": "KnowledgeBase", "type": "storage", "color": "red", "output": f"Failed to store in KB: {e}"})
 
@@ -281,6 +281,20 @@ class MotherAgent:
             reporter.functions[0](context_variables)
             history.append({"agent": "Reporter", "type": "export", "color": "bright_magenta", "output": context_variables.get('project_report', '')})
 
+        # Store session artifacts so follow-up commands can fetch them by key (write-behind; reads flush the queue)
+        session_id = context_variables.get('session_id')
+        if session_id:
+            try:
+                from src.core.knowledge_registry import get_knowledge_base
+                from src.core.ingestion_queue import get_ingestion_worker
+                kb = get_knowledge_base()
+                worker = get_ingestion_worker()
+                if context_variables.get('generated_code'):
+                    worker.submit_call(kb.store_code, context_variables['generated_code'], session_id, user_query)
+                worker.submit_call(kb.store_report, context_variables.get('final_answer') or answer_text, session_id, user_query)
+            except Exception as e:
+                history.append({"agent": "KnowledgeBase", "type": "storage", "color": "red", "output": f"Failed to store session artifacts in KB: {e}"})
+
         return context_variables, history
 
     def run_code(self, context_variables: dict):
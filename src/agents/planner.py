@@ -24,11 +24,8 @@ def plan_research(context_variables, query: str):
     """
     try:
         # Get relevant context from knowledge base
-        from src.core.knowledge_base import KnowledgeBase
-        kb = KnowledgeBase(
-            qdrant_url=config.get('qdrant.url', 'http://localhost:6333'),
-            collection_name=config.get('qdrant.collection_name', 'research_knowledge')
-        )
+        from src.core.knowledge_registry import get_knowledge_base
+        kb = get_knowledge_base()
         context = kb.get_relevant_context(query)
 
         # Compose LLM prompt for agent-assigned planning
@@ -1,5 +1,6 @@
 from swarm import Agent
 from src.services.web_search import WebSearchService
+from src.services.scrape_race import scrape_race, scrape_all
 from src.core.config import Config
 from . import get_prompt
 import logging
@@ -80,26 +81,10 @@ def research_steps(context_variables):
                         all_results.append(r)
                         all_ranked_urls.add(link)
                         all_titles.add(r.get('title', ''))
-            # Scrape in order, record status and char count
-            scraped_results = []
-            scraping_status = []
-            char_counts = []
+            # Scrape: race the top URLs for the first good page, or fetch them all concurrently with deep_scrape
             deep_scrape = context_variables.get('deep_scrape', False)
-            for idx, r in enumerate(all_results):
-                url = r.get('link', '')
-                title = r.get('title', '')
-                if not url:
-                    continue
-                content = web_search_services[0].scrape_url(url)
-                if content:
-                    scraped_results.append({'title': title, 'url': url, 'content': content})
-                    scraping_status.append({'url': url, 'status': 'success'})
-                    char_counts.append({'url': url, 'chars': len(content)})
-                    if not deep_scrape:
-                        break  # Stop after first successful scrape unless deep_scrape is enabled
-                else:
-                    scraping_status.append({'url': url, 'status': 'fail'})
-                    char_counts.append({'url': url, 'chars': 0})
+            scrape = scrape_all if deep_scrape else scrape_race
+            scraped_results, scraping_status, char_counts = scrape(web_search_services[0], all_results)
             # If all scraping failed, fallback to snippets (if any)
             if not scraped_results and all_results:
                 for idx, r in enumerate(all_results):
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from typing import Dict, List
+from src.core.knowledge_base import KnowledgeBase
+from src.core.knowledge_registry import get_knowledge_base
+from src.core.vector_store import QdrantStore
+
+
+class AsyncKnowledgeBase:
+    """
+    asyncio front-end for a KnowledgeBase.
+    Vector I/O goes through AsyncQdrantClient when the knowledge base is backed by Qdrant;
+    CPU work (chunking, encoding) and the embedded backend run in worker threads.
+    """
+
+    def __init__(self, kb: KnowledgeBase = None):
+        self.kb = kb or get_knowledge_base()
+        self._client = None
+        self._client_resolved = False
+        self._client_lock = asyncio.Lock()
+
+    async def _qdrant(self):
+        """The async Qdrant client, or None when the knowledge base uses a different store."""
+        if not self._client_resolved:
+            async with self._client_lock:
+                if not self._client_resolved:
+                    store = await asyncio.to_thread(lambda: self.kb.store)
+                    if isinstance(store, QdrantStore):
+                        from qdrant_client import AsyncQdrantClient
+                        self._client = AsyncQdrantClient(url=self.kb.qdrant_url)
+                    self._client_resolved = True
+        return self._client
+
+    async def _dense_search_many(self, vectors, limit: int) -> List[List[Dict]]:
+        client = await self._qdrant()
+        if client is None:
+            return await asyncio.to_thread(self.kb.store.search_batch, vectors, limit, self.kb.CHUNK_FILTER)
+        store = self.kb.store
+        responses = await client.query_batch_points(
+            collection_name=store.collection_name,
+            requests=store.search_requests(vectors, limit, self.kb.CHUNK_FILTER)
+        )
+        return [[store.to_dict(hit) for hit in response.points] for response in responses]
+
+    async def _retrieve(self, ids: List[str], with_vectors: bool = False) -> List[Dict]:
+        if not ids:
+            return []
+        client = await self._qdrant()
+        if client is None:
+            return await asyncio.to_thread(self.kb.store.retrieve, ids, with_vectors)
+        points = await client.retrieve(collection_name=self.kb.store.collection_name, ids=ids, with_vectors=with_vectors)
+        return [self.kb.store.to_dict(point, with_vectors) for point in points]
+
+    async def aadd_knowledge(self, text: str, metadata: Dict = None) -> List[str]:
+        """Async add_knowledge: encode in a worker thread, then write all point batches concurrently."""
+        point_ids, points, stats = await asyncio.to_thread(self.kb._prepare_points, text, metadata)
+        if not point_ids:
+            return []
+        batch_size = self.kb.upsert_batch_size
+        batches = [points[i:i + batch_size] for i in range(0, len(points), batch_size)]
+        client = await self._qdrant()
+        start = time.perf_counter()
+        if client is None:
+            for batch in batches:
+                await asyncio.to_thread(self.kb.store.upsert, batch)
+        else:
+            await asyncio.gather(*(
+                client.upsert(collection_name=self.kb.store.collection_name, points=QdrantStore.to_point_structs(batch))
+                for batch in batches
+            ))
+        self.kb._index_points(points)
+        stats.update(upsert_seconds=time.perf_counter() - start, upsert_calls=len(batches))
+        self.kb._record_ingest(stats)
+        return point_ids
+
+    async def asearch_knowledge(self, query: str, limit: int = 5, mode: str = None) -> List[Dict]:
+        """Async search_knowledge."""
+        results = await self.search_many([query], limit, mode)
+        return results[0]
+
+    async def search_many(self, queries: List[str], limit: int = 5, mode: str = None) -> List[List[Dict]]:
+        """Search several queries with one batched encode and a single batched search request."""
+        if not queries:
+            return []
+        mode = mode or self.kb.search_mode
+        vectors = await asyncio.to_thread(self.kb._encode_queries, queries)
+        dense_results = await self._dense_search_many(vectors, self.kb._candidate_count(limit, mode))
+        if mode != 'hybrid':
+            return [[self.kb._format_hit(point) for point in hits] for hits in dense_results]
+        fused_results, points, missing = self.kb._fuse_many(queries, dense_results, limit)
+        points.update((str(point["id"]), point) for point in await self._retrieve(missing, with_vectors=True))
+        return [
+            [self.kb._format_hit(point) for point in self.kb._fused_hits(fused, points, vector)]
+            for fused, vector in zip(fused_results, vectors)
+        ]
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
@@ -31,14 +31,151 @@ class Config:
                 "host": "localhost",
                 "port": 6333,
                 "collection_name": "research_knowledge",
-                "binary_path": "./qdrant/qdrant.exe"
+                "binary_path": "./qdrant/qdrant.exe",
+                "backend": "auto",
+                "embedded_path": "data/vector_index",
+                "search_mode": "hybrid",
+                # Background BM25 rebuilds, which pick up writes from other processes (0 disables them)
+                "lexical_refresh_seconds": 600,
+                "mmr_oversample": 4,
+                "mmr_lambda": 0.5,
+                "context_max_chars": 6000,
+                "context_max_tokens": None,
+                # Per-collection vector storage: quantization is none, int8 or binary
+                "collections": {
+                    "research_knowledge": {
+                        "quantization": "none",
+                        "oversampling": 2.0,
+                        "rescore": True
+                    }
+                },
+                "embed_batch_size": 32,
+                "upsert_batch_size": 64
+            },
+            "embeddings": {
+                "model_name": "all-MiniLM-L6-v2",
+                # 'torch' (SentenceTransformer) or 'onnx' (onnxruntime on a local export, see embedding_backends.py)
+                "backend": "torch",
+                "onnx": {
+                    "path": "models/onnx/all-MiniLM-L6-v2",
+                    "quantized": False,
+                    "fallback_to_torch": True,
+                    "num_threads": None
+                },
+                "dimensions": 384,
+                "chunk_tokens": None,
+                "chunk_overlap_tokens": 32,
+                "disk_cache": {
+                    "enabled": True,
+                    "path": "data/embedding_cache",
+                    "max_entries": 100000
+                },
+                "query_cache_size": 1024
+            },
+            # Background knowledge base writes (src/core/ingestion_queue.py)
+            "ingestion": {
+                "max_queue_size": 256,
+                "batch_size": 16,
+                "max_retries": 3,
+                "retry_backoff": 1.0,
+                "submit_timeout": 1.0,
+                "shutdown_timeout": 30,
+                # Longest a session artifact read waits for queued writes
+                "read_flush_timeout": 10
+            },
+            # Bulk document loading (python -m src.core.ingest); workers None means one per CPU
+            "ingest": {
+                "workers": None,
+                "batch_size": 1024,
+                "checkpoint_dir": "data/ingest_checkpoints"
             },
             "database": {
                 "path": "data/research.db"
             },
             "web_search": {
                 "max_results": 5,
-                "timeout": 30
+                "timeout": 30,
+                # Shared HTTP client: per-host keep-alive pools (hosts kept, connections per host), default timeout,
+                # retries for connection errors and 502/503/504 on GET, and scrapes between connection stats log lines
+                "http": {
+                    "pool_connections": 32,
+                    "pool_maxsize": 32,
+                    "timeout": 30,
+                    "max_retries": 2,
+                    "stats_log_interval": 50
+                },
+                # Static HTTP fetch tried before the browser; pages with less text than min_chars are rendered,
+                # and at most max_bytes of a page body are read
+                "fetch": {
+                    "timeout": 10,
+                    "min_chars": 500,
+                    "max_bytes": 5 * 1024 * 1024
+                },
+                # Extracted page text cache: default TTL, per-domain TTLs (subdomains match) and total compressed size
+                "page_cache": {
+                    "enabled": True,
+                    "path": "data/page_cache.db",
+                    "ttl_seconds": 86400,
+                    "domain_ttls": {},
+                    "max_bytes": 268435456
+                },
+                # PDF extraction: download cap, bytes kept in memory before spooling to disk, character budget
+                # for research, and processes for full-text extraction
+                "pdf": {
+                    "max_bytes": 52428800,
+                    "spool_bytes": 8388608,
+                    "max_chars": 5000,
+                    "workers": None
+                },
+                # research_steps: URLs scraped concurrently, the minimum text for a page to win the race,
+                # and the concurrency cap when deep_scrape fetches every result
+                "scrape_race": {
+                    "width": 3,
+                    "min_chars": 400,
+                    "deep_scrape_concurrency": 4
+                },
+                # Browser scrape profiles: request types to abort (image, font, media, stylesheet, ...),
+                # tracker blocking, wait_until (domcontentloaded, load, networkidle or selector) and timeout
+                "scrape_profiles": {
+                    "default": {
+                        "block_resources": ["image", "font", "media"],
+                        "block_trackers": True,
+                        "wait_until": "domcontentloaded",
+                        "timeout": 12
+                    },
+                    "spa": {
+                        "block_resources": ["image", "font", "media"],
+                        "block_trackers": True,
+                        "wait_until": "networkidle",
+                        "timeout": 15
+                    },
+                    "full": {
+                        "block_resources": [],
+                        "block_trackers": False,
+                        "wait_until": "networkidle",
+                        "timeout": 12
+                    }
+                },
+                # domain -> profile name; subdomains match too, e.g. {"example.com": "spa"}
+                "scrape_profile_overrides": {},
+                # Shared Chromium for scraping: pages per pool, and pages served before a context is recreated
+                "browser_pool": {
+                    "size": 4,
+                    "max_pages_per_context": 50,
+                    "headless": True,
+                    "checkout_timeout": 30,
+                    "launch_args": []
+                },
+                "cache": {
+                    "exact_path": "data/search_cache.db",
+                    "semantic_enabled": True,
+                    "semantic_threshold": 0.92,
+                    "collection": "search_cache",
+                    "ttl_seconds": 604800,
+                    "max_entries": 5000,
+                    "compaction_interval": 3600,
+                    "delete_batch_size": 256
+                }
             }
         }
         with open(self.config_path, 'w') as f:
@@ -0,0 +1,142 @@
+import os
+import json
+import logging
+from typing import List, Union
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ONNX_MODEL_FILE = 'model.onnx'
+ONNX_QUANTIZED_MODEL_FILE = 'model_quantized.onnx'
+
+
+class OnnxEmbeddingModel:
+    """
+    Sentence embedding model running an ONNX export through onnxruntime on the CPU.
+    Mirrors the parts of SentenceTransformer the knowledge base uses (encode, tokenizer,
+    max_seq_length) and reproduces its mean pooling and normalization, so the vectors
+    have the same dimensions and match the PyTorch model to within export precision.
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = False, max_seq_length: int = None,
+                 normalize: bool = None, num_threads: int = None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        file_name = ONNX_QUANTIZED_MODEL_FILE if quantized else ONNX_MODEL_FILE
+        model_path = os.path.join(model_dir, file_name)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"No ONNX export at {model_path}; create one with export_onnx()")
+        settings = self._read_settings(model_dir)
+        self.model_dir = model_dir
+        self.quantized = quantized
+        self.max_seq_length = max_seq_length or settings.get('max_seq_length', 256)
+        self.normalize = settings.get('normalize', True) if normalize is None else normalize
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self._session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self._input_names = {node.name for node in self._session.get_inputs()}
+
+    @staticmethod
+    def _read_settings(model_dir: str) -> dict:
+        """max_seq_length and normalization as recorded in the sentence-transformers files of the export."""
+        settings = {}
+        config_path = os.path.join(model_dir, 'sentence_bert_config.json')
+        if os.path.exists(config_path):
+            with open(config_path) as f:
+                settings['max_seq_length'] = json.load(f).get('max_seq_length')
+        modules_path = os.path.join(model_dir, 'modules.json')
+        if os.path.exists(modules_path):
+            with open(modules_path) as f:
+                settings['normalize'] = any(module.get('type', '').endswith('Normalize') for module in json.load(f))
+        return {key: value for key, value in settings.items() if value is not None}
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._session.get_outputs()[0].shape[-1]
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        # Sort by length so each batch pads to a similar size, as SentenceTransformer does
+        order = np.argsort([-len(text) for text in texts])
+        embeddings = [None] * len(texts)
+        for start in range(0, len(texts), batch_size):
+            batch = [texts[i] for i in order[start:start + batch_size]]
+            for i, vector in zip(order[start:start + batch_size], self._encode_batch(batch)):
+                embeddings[i] = vector
+        result = np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
+        return result[0] if single else result
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        features = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_seq_length, return_tensors='np')
+        inputs = {name: features[name].astype(np.int64) for name in self._input_names if name in features}
+        if 'token_type_ids' in self._input_names and 'token_type_ids' not in inputs:
+            inputs['token_type_ids'] = np.zeros_like(features['input_ids'], dtype=np.int64)
+        token_embeddings = self._session.run(None, inputs)[0]
+        mask = features['attention_mask'][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = True) -> str:
+    """
+    Export a SentenceTransformer's transformer to output_dir/model.onnx (plus the tokenizer and
+    sentence-transformers config), and optionally a dynamically int8-quantized model_quantized.onnx.
+    Needs torch and sentence-transformers; only the export does, not OnnxEmbeddingModel.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name, device='cpu')
+    model.save(output_dir)
+    transformer = model[0].auto_model.eval()
+    dummy = model.tokenizer(['An example sentence'], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in dummy]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer, tuple(dummy[name] for name in input_names), model_path,
+            input_names=input_names, output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes, opset_version=14
+        )
+    logger.info(f"[EmbeddingBackends] Exported '{model_name}' to {model_path}")
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantized_path = os.path.join(output_dir, ONNX_QUANTIZED_MODEL_FILE)
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+        logger.info(f"[EmbeddingBackends] Wrote int8 model to {quantized_path}")
+    return output_dir
+
+
+def load_embedding_model(model_name: str, backend: str = 'torch', onnx_path: str = None, quantized: bool = False,
+                         fallback_to_torch: bool = True, num_threads: int = None):
+    """Load model_name with the 'torch' (SentenceTransformer) or 'onnx' backend."""
+    if backend == 'onnx':
+        model_dir = onnx_path or os.path.join('models', 'onnx', model_name.replace('/', '_'))
+        try:
+            model = OnnxEmbeddingModel(model_dir, quantized=quantized, num_threads=num_threads)
+            logger.info(f"[EmbeddingBackends] Loaded ONNX{' int8' if quantized else ''} model from {model_dir}")
+            return model
+        except Exception as e:
+            if not fallback_to_torch:
+                raise
+            logger.warning(f"[EmbeddingBackends] ONNX backend unavailable ({e}), falling back to PyTorch")
+    elif backend != 'torch':
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Export a sentence-transformers model to ONNX')
+    parser.add_argument('model_name')
+    parser.add_argument('output_dir')
+    parser.add_argument('--no-quantize', action='store_true', help='skip the int8 model')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    export_onnx(args.model_name, args.output_dir, quantize=not args.no_quantize)
@@ -0,0 +1,105 @@
+"""
+Compare embedding backends on a fixed corpus: throughput, load time, and cosine agreement
+with the PyTorch SentenceTransformer.
+
+    python -m src.core.embedding_benchmark --onnx-path models/onnx/all-MiniLM-L6-v2
+"""
+import time
+import argparse
+from typing import Dict, List
+import numpy as np
+from src.core.config import Config
+from src.core.embedding_backends import load_embedding_model
+
+_SENTENCES = [
+    "Retrieval-augmented generation grounds model answers in documents fetched at query time.",
+    "Qdrant stores vectors with payloads and supports filtered approximate nearest neighbour search.",
+    "The quarterly report shows revenue growth driven by subscription renewals in Europe.",
+    "Mean pooling averages token embeddings, weighted by the attention mask, into one sentence vector.",
+    "Photosynthesis converts light energy into chemical energy stored in glucose.",
+    "A bounded queue applies backpressure when producers outpace the consumer.",
+    "def fibonacci(n): return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)",
+    "The committee postponed the vote until the impact assessment is published.",
+    "Int8 dynamic quantization stores weights as 8-bit integers and dequantizes activations on the fly.",
+    "Short query",
+    "How do I configure connection pooling for HTTP requests in Python?",
+    "Climate models project higher variability in regional precipitation over the next decades.",
+]
+
+
+def benchmark_corpus(size: int = 512) -> List[str]:
+    """Deterministic corpus of mixed-length texts built from the fixed sentences."""
+    corpus = []
+    for i in range(size):
+        count = 1 + i % 4
+        corpus.append(' '.join(_SENTENCES[(i + j) % len(_SENTENCES)] for j in range(count)))
+    return corpus
+
+
+def run_backend(model, corpus: List[str], batch_size: int, repeats: int) -> Dict:
+    model.encode(corpus[:batch_size], batch_size=batch_size)  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        embeddings = model.encode(corpus, batch_size=batch_size)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {"embeddings": np.asarray(embeddings, dtype=np.float32), "seconds": best, "texts_per_second": len(corpus) / best}
+
+
+def cosine_agreement(reference: np.ndarray, candidate: np.ndarray) -> Dict:
+    """Row-wise cosine similarity between two embedding matrices of the same corpus."""
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosines = (reference * candidate).sum(axis=1)
+    return {"mean": float(cosines.mean()), "min": float(cosines.min())}
+
+
+def main():
+    config = Config()
+    parser = argparse.ArgumentParser(description='Benchmark embedding backends on a fixed corpus')
+    parser.add_argument('--model', default=config.get('embeddings.model_name', 'all-MiniLM-L6-v2'))
+    parser.add_argument('--onnx-path', default=config.get('embeddings.onnx.path'))
+    parser.add_argument('--size', type=int, default=512, help='number of texts in the corpus')
+    parser.add_argument('--batch-size', type=int, default=config.get('qdrant.embed_batch_size', 32))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=config.get('embeddings.onnx.num_threads'))
+    args = parser.parse_args()
+
+    from rich.console import Console
+    from rich.table import Table
+    console = Console()
+    corpus = benchmark_corpus(args.size)
+    backends = [("torch", "torch", False), ("onnx", "onnx", False), ("onnx-int8", "onnx", True)]
+    results = {}
+    for label, backend, quantized in backends:
+        try:
+            start = time.perf_counter()
+            model = load_embedding_model(args.model, backend=backend, onnx_path=args.onnx_path, quantized=quantized,
+                                         fallback_to_torch=False, num_threads=args.threads)
+            load_seconds = time.perf_counter() - start
+        except Exception as e:
+            console.print(f"[yellow]Skipping {label}: {e}[/yellow]")
+            continue
+        results[label] = run_backend(model, corpus, args.batch_size, args.repeats)
+        results[label]["load_seconds"] = load_seconds
+
+    table = Table(title=f"{args.model}: {len(corpus)} texts, batch size {args.batch_size}")
+    for column in ("backend", "load s", "encode s", "texts/s", "dims", "cosine vs torch (mean / min)"):
+        table.add_column(column)
+    reference = results.get("torch")
+    for label, result in results.items():
+        agreement = "-"
+        if reference is not None and label != "torch":
+            if result["embeddings"].shape == reference["embeddings"].shape:
+                cosines = cosine_agreement(reference["embeddings"], result["embeddings"])
+                agreement = f"{cosines['mean']:.4f} / {cosines['min']:.4f}"
+            else:
+                agreement = "dimension mismatch"
+        table.add_row(label, f"{result['load_seconds']:.2f}", f"{result['seconds']:.2f}",
+                      f"{result['texts_per_second']:.1f}", str(result["embeddings"].shape[1]), agreement)
+    console.print(table)
+
+
+if __name__ == '__main__':
+    main()
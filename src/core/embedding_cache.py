@@ -0,0 +1,208 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different spellings of a query share a cache entry."""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class EmbeddingCache:
+    """Thread-safe bounded LRU cache of embeddings keyed by (model name, normalized text)."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model_name: str, text: str) -> Optional[np.ndarray]:
+        key = (model_name, normalize_text(text))
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, model_name: str, text: str, vector: np.ndarray):
+        if self.maxsize <= 0:
+            return
+        key = (model_name, normalize_text(text))
+        vector = np.asarray(vector, dtype=np.float32)
+        # Cached vectors are shared between callers, so guard them against in-place edits
+        vector.setflags(write=False)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+class DiskEmbeddingCache:
+    """
+    Persistent embedding cache for one model, shared across restarts.
+    Vectors live in a fixed-capacity float32 memory-mapped file; a SQLite table maps
+    sha256(model, text) to a slot and tracks last use for LRU eviction once the file is full.
+    Each slot also stores a tag from its key, checked on read, so a slot left half-written by a
+    crashed writer is never returned as another text's embedding.
+    """
+
+    def __init__(self, directory: str, model_name: str, dimensions: int, max_entries: int = 100000):
+        self.model_name = model_name
+        self.dimensions = dimensions
+        self.max_entries = max_entries
+        self.directory = os.path.join(directory, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name))
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # The app, the ingest CLI and the UI may share the directory, so slots are claimed in
+        # IMMEDIATE transactions against the database rather than from per-process state
+        self._conn = sqlite3.connect(os.path.join(self.directory, 'index.db'), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        vectors_path = os.path.join(self.directory, 'vectors.f32')
+        tags_path = os.path.join(self.directory, 'tags.u64')
+        layout = f"{dimensions}x{max_entries}/tagged"
+        with self._transaction():
+            self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    slot INTEGER NOT NULL UNIQUE,
+                    last_used REAL NOT NULL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used)')
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+            if row is None or row[0] != layout or not os.path.exists(vectors_path) or not os.path.exists(tags_path):
+                # New cache, or the dimensions/capacity/file layout changed: start over
+                self._conn.execute('DELETE FROM entries')
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('layout', ?)", (layout,))
+                mode = 'w+'
+            else:
+                mode = 'r+'
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode=mode, shape=(max_entries, dimensions))
+            self._tags = np.memmap(tags_path, dtype=np.uint64, mode=mode, shape=(max_entries,))
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that takes the database lock up front and rolls back on any error."""
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x1f{text}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _tag(key: str) -> int:
+        return int(key[:16], 16)
+
+    def get_many(self, texts: List[str]) -> Dict[int, np.ndarray]:
+        """Return {position in texts: vector} for every text that is cached."""
+        keys = [self._key(text) for text in texts]
+        found = {}
+        # Slot lookup and vector read share one IMMEDIATE transaction: writers in any process fill
+        # slots only while holding that lock, so a slot cannot be evicted and refilled in between
+        with self._lock, self._transaction():
+            slots = {}
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, slot FROM entries WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                slots.update(rows)
+            stale = [key for key, slot in slots.items() if int(self._tags[slot]) != self._tag(key)]
+            if stale:
+                self._conn.executemany('DELETE FROM entries WHERE key = ?', [(key,) for key in stale])
+                for key in stale:
+                    del slots[key]
+            for position, key in enumerate(keys):
+                slot = slots.get(key)
+                if slot is not None:
+                    found[position] = np.array(self._vectors[slot])
+            if slots:
+                now = time.time()
+                self._conn.executemany('UPDATE entries SET last_used = ? WHERE key = ?', [(now, key) for key in slots])
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        return found
+
+    def _claim_slots(self, count: int) -> List[int]:
+        """Never-used slots past the database's MAX(slot), then the least recently used ones. Call inside a transaction."""
+        next_slot = self._conn.execute('SELECT COALESCE(MAX(slot) + 1, 0) FROM entries').fetchone()[0]
+        free = max(0, min(count, self.max_entries - next_slot))
+        slots = list(range(next_slot, next_slot + free))
+        if len(slots) < count:
+            evicted = self._conn.execute(
+                'SELECT slot FROM entries ORDER BY last_used LIMIT ?', (count - len(slots),)
+            ).fetchall()
+            self._conn.executemany('DELETE FROM entries WHERE slot = ?', evicted)
+            slots.extend(slot for (slot,) in evicted)
+        return slots
+
+    def put_many(self, texts: List[str], vectors):
+        """Store vectors for texts, evicting the least recently used entries when full."""
+        entries = {}
+        for text, vector in zip(texts, vectors):
+            entries[self._key(text)] = vector
+        with self._lock, self._transaction():
+            existing = set()
+            keys = list(entries)
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                existing.update(key for (key,) in self._conn.execute(
+                    f"SELECT key FROM entries WHERE key IN ({','.join('?' * len(batch))})", batch
+                ))
+            new_keys = [key for key in keys if key not in existing][:self.max_entries]
+            if not new_keys:
+                return
+            slots = self._claim_slots(len(new_keys))
+            now = time.time()
+            self._conn.executemany(
+                'INSERT INTO entries (key, slot, last_used) VALUES (?, ?, ?)',
+                [(key, slot, now) for key, slot in zip(new_keys, slots)]
+            )
+            # The claim succeeded and no other writer can run until commit, so the slots are ours to fill
+            for key, slot in zip(new_keys, slots):
+                self._vectors[slot] = np.asarray(entries[key], dtype=np.float32)
+                self._tags[slot] = self._tag(key)
+            self._vectors.flush()
+            self._tags.flush()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+            return {"size": size, "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,245 @@
+"""
+Bulk-load a directory of documents (txt, md, pdf, html) into the knowledge base.
+
+    python -m src.core.ingest <dir> [--collection NAME] [--workers N] [--batch-size N]
+
+Files are streamed one at a time through KnowledgeBase.iter_chunks, new chunks are embedded
+by a pool of encoder processes, and each batch is written with one bulk upsert. A JSON checkpoint
+records every file whose chunks are all stored, so an interrupted run resumes where it stopped.
+
+With a Qdrant server the app can keep running during an ingest. The embedded index (no server)
+belongs to one process at a time, so the CLI refuses to start while the app has it open.
+"""
+import os
+import json
+import time
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+import numpy as np
+from src.core.config import Config
+from src.core.knowledge_registry import get_knowledge_base
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ('.txt', '.md', '.markdown', '.pdf', '.html', '.htm')
+
+_worker_model = None
+
+
+def _init_encoder(model_name: str, threads: int):
+    """Load the embedding model once per worker process."""
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from src.core.knowledge_registry import get_embedding_model
+    _worker_model = get_embedding_model(model_name)
+
+
+def _encode_in_worker(texts: List[str], batch_size: int) -> np.ndarray:
+    return np.asarray(_worker_model.encode(texts, batch_size=batch_size), dtype=np.float32)
+
+
+class EncoderPool:
+    """Embeds text across worker processes, each holding its own copy of the model."""
+
+    def __init__(self, model_name: str, workers: int, batch_size: int):
+        self.workers = workers
+        self.batch_size = batch_size
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_encoder, initargs=(model_name, threads))
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        # One contiguous slice per worker keeps the results in order
+        size = max(self.batch_size, -(-len(texts) // self.workers))
+        futures = [
+            self._executor.submit(_encode_in_worker, texts[i:i + size], self.batch_size)
+            for i in range(0, len(texts), size)
+        ]
+        return np.concatenate([future.result() for future in futures])
+
+    def close(self):
+        self._executor.shutdown()
+
+
+def iter_files(root: str, extensions: Iterable[str] = SUPPORTED_EXTENSIONS) -> Iterator[str]:
+    """Supported files under root, in a stable order so checkpoints line up between runs."""
+    extensions = tuple(ext.lower() for ext in extensions)
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.lower().endswith(extensions):
+                yield os.path.join(directory, name)
+
+
+def read_text(path: str) -> Iterable[str]:
+    """Text of a file as an iterable of pieces, so plain text and PDFs are never loaded whole."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.pdf':
+        import PyPDF2
+        def pages():
+            with open(path, 'rb') as f:
+                for page in PyPDF2.PdfReader(f).pages:
+                    yield (page.extract_text() or '') + '\n'
+        return pages()
+    if extension in ('.html', '.htm'):
+        from bs4 import BeautifulSoup
+        with open(path, encoding='utf-8', errors='replace') as f:
+            soup = BeautifulSoup(f, 'html.parser')
+        for element in soup(["script", "style"]):
+            element.decompose()
+        return [soup.get_text(separator='\n')]
+    def lines():
+        with open(path, encoding='utf-8', errors='replace') as f:
+            yield from f
+    return lines()
+
+
+class Checkpoint:
+    """Files already ingested, keyed by path and invalidated when size or mtime change."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.files = json.load(f).get('files', {})
+
+    @staticmethod
+    def _signature(file_path: str) -> Dict:
+        stat = os.stat(file_path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def is_done(self, file_path: str) -> bool:
+        entry = self.files.get(file_path)
+        return entry is not None and all(entry.get(k) == v for k, v in self._signature(file_path).items())
+
+    def mark_done(self, file_path: str, chunks: int):
+        self.files[file_path] = dict(self._signature(file_path), chunks=chunks)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({"files": self.files, "updated_at": time.time()}, f)
+        os.replace(tmp_path, self.path)
+
+
+class BulkIngestor:
+    """Chunks files, embeds new chunks in batches and upserts them, checkpointing completed files."""
+
+    def __init__(self, kb, checkpoint: Checkpoint, batch_size: int = 1024, encoder: Optional[EncoderPool] = None):
+        self.kb = kb
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.encoder = encoder
+        self._pending = []  # (chunk, metadata, chunk index, total chunks)
+        self._pending_files = {}  # file path -> chunk count, for files whose chunks are all in _pending
+        self.stats = {"files": 0, "chunks": 0, "skipped": 0, "failed_files": 0}
+
+    def add_file(self, path: str) -> List[str]:
+        """Queue a file's chunks, flushing once a batch is full; returns the files a failed flush could not store."""
+        metadata = {"type": "document", "source": os.path.abspath(path), "title": os.path.basename(path)}
+        chunks = list(self.kb.iter_chunks(read_text(path)))
+        for i, chunk in enumerate(chunks):
+            self._pending.append((chunk, metadata, i, len(chunks)))
+        self._pending_files[path] = len(chunks)
+        self.stats["files"] += 1
+        if len(self._pending) >= self.batch_size:
+            return self.flush()
+        return []
+
+    def flush(self) -> List[str]:
+        """
+        Embed and store everything pending, then checkpoint the files it came from. If storing fails,
+        those files stay out of the checkpoint, so a resumed run reads them again, and are returned.
+        """
+        pending, self._pending = self._pending, []
+        files, self._pending_files = self._pending_files, {}
+        if pending:
+            try:
+                stats = self.kb.add_chunks(pending, encoder=self.encoder.encode if self.encoder else None)
+            except Exception as e:
+                logger.error(f"[BulkIngestor] Failed to store {len(pending)} chunk(s) from {len(files)} file(s): {e}")
+                self.stats["failed_files"] += len(files)
+                return list(files)
+            self.stats["chunks"] += stats["chunks"] - stats["skipped"]
+            self.stats["skipped"] += stats["skipped"]
+        for path, chunks in files.items():
+            self.checkpoint.mark_done(path, chunks)
+        self.checkpoint.save()
+        return []
+
+
+def main():
+    config = Config()
+    parser = argparse.ArgumentParser(description='Bulk-ingest documents into the knowledge base')
+    parser.add_argument('directory')
+    parser.add_argument('--collection', default=config.get('qdrant.collection_name', 'research_knowledge'))
+    parser.add_argument('--workers', type=int, default=config.get('ingest.workers') or os.cpu_count() or 1,
+                        help='encoder processes (1 encodes in this process)')
+    parser.add_argument('--batch-size', type=int, default=config.get('ingest.batch_size', 1024),
+                        help='chunks per embed/upsert batch and checkpoint')
+    parser.add_argument('--extensions', nargs='+', default=list(SUPPORTED_EXTENSIONS))
+    parser.add_argument('--checkpoint', help='checkpoint file (default: per collection under ingest.checkpoint_dir)')
+    parser.add_argument('--restart', action='store_true', help='ignore the checkpoint and re-read every file')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    from rich.console import Console
+    from rich.progress import Progress, BarColumn, MofNCompleteColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn
+    console = Console()
+    kb = get_knowledge_base(collection_name=args.collection)
+    try:
+        kb.store
+    except RuntimeError as e:
+        console.print(f"[red]{e}[/red]")
+        raise SystemExit(1)
+    checkpoint_path = args.checkpoint or os.path.join(config.get('ingest.checkpoint_dir', 'data/ingest_checkpoints'), f"{args.collection}.json")
+    checkpoint = Checkpoint(checkpoint_path)
+    if args.restart:
+        checkpoint.files = {}
+    files = [path for path in iter_files(args.directory, args.extensions) if not checkpoint.is_done(path)]
+    console.print(f"{len(files)} file(s) to ingest into '{args.collection}' ({len(checkpoint.files)} already done)")
+    if not files:
+        return
+
+    encoder = EncoderPool(kb.model_name, args.workers, kb.embed_batch_size) if args.workers > 1 else None
+    ingestor = BulkIngestor(kb, checkpoint, args.batch_size, encoder)
+    start = time.perf_counter()
+    try:
+        with Progress(TextColumn("{task.description}"), BarColumn(), MofNCompleteColumn(),
+                      TextColumn("{task.fields[chunks]} chunks"), TimeElapsedColumn(), TimeRemainingColumn(),
+                      console=console) as progress:
+            task = progress.add_task("Ingesting", total=len(files), chunks=0)
+            for path in files:
+                try:
+                    unstored = ingestor.add_file(path)
+                except Exception as e:
+                    ingestor.stats["failed_files"] += 1
+                    progress.console.print(f"[red]Failed to read {path}: {e}[/red]")
+                    unstored = []
+                for failed_path in unstored:
+                    progress.console.print(f"[red]Failed to store {failed_path}[/red]")
+                progress.update(task, advance=1, chunks=ingestor.stats["chunks"] + len(ingestor._pending))
+            for failed_path in ingestor.flush():
+                progress.console.print(f"[red]Failed to store {failed_path}[/red]")
+            progress.update(task, chunks=ingestor.stats["chunks"])
+    finally:
+        if encoder:
+            encoder.close()
+    elapsed = time.perf_counter() - start
+    stats = ingestor.stats
+    console.print(
+        f"Stored {stats['chunks']} new chunk(s) from {stats['files']} file(s) in {elapsed:.1f}s "
+        f"({stats['chunks'] / max(elapsed, 1e-9):.0f} chunks/s); {stats['skipped']} already stored, "
+        f"{stats['failed_files']} file(s) failed"
+    )
+
+
+if __name__ == '__main__':
+    main()
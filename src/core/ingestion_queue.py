@@ -0,0 +1,164 @@
+import time
+import queue
+import atexit
+import threading
+import logging
+from typing import Callable, Dict, List, Optional
+from src.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionWorker:
+    """
+    Write-behind knowledge base ingestion on a background thread.
+    Jobs go into a bounded queue; the worker drains up to batch_size jobs at a time, ingests all
+    knowledge jobs for the same KnowledgeBase with one add_knowledge_many call, retries failures
+    with exponential backoff, and flushes the queue at interpreter exit.
+    """
+
+    def __init__(self, max_queue_size: int = None, batch_size: int = None, max_retries: int = None,
+                 retry_backoff: float = None, submit_timeout: float = None):
+        config = Config()
+        self.batch_size = batch_size or config.get('ingestion.batch_size', 16)
+        self.max_retries = max_retries if max_retries is not None else config.get('ingestion.max_retries', 3)
+        self.retry_backoff = retry_backoff or config.get('ingestion.retry_backoff', 1.0)
+        self.submit_timeout = submit_timeout if submit_timeout is not None else config.get('ingestion.submit_timeout', 1.0)
+        self._queue = queue.Queue(maxsize=max_queue_size or config.get('ingestion.max_queue_size', 256))
+        self._stop = threading.Event()
+        self.stats = {"submitted": 0, "ingested": 0, "retries": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="kb-ingestion", daemon=True)
+        self._thread.start()
+
+    def submit_knowledge(self, kb, text: str, metadata: Dict = None):
+        """Queue text for kb.add_knowledge."""
+        self._submit({"kb": kb, "text": text, "metadata": metadata})
+
+    def submit_research_result(self, kb, query: str, answer: str, sources: List[str] = None, session_id: int = None):
+        """Queue a research result, as kb.add_research_result would store it."""
+        self.submit_knowledge(kb, answer, kb.research_metadata(query, sources, session_id))
+
+    def submit_call(self, func: Callable, *args, **kwargs):
+        """Queue any other knowledge base write (e.g. kb.store_report); these are run one by one."""
+        self._submit({"call": func, "args": args, "kwargs": kwargs})
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _submit(self, job: Dict):
+        self._count("submitted")
+        try:
+            self._queue.put(job, timeout=self.submit_timeout)
+        except queue.Full:
+            # Backpressure: rather than drop the write, do it on the caller's thread
+            logger.warning("[IngestionWorker] Queue full, ingesting synchronously")
+            self._process([job])
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def _drain(self) -> Optional[List[Dict]]:
+        try:
+            jobs = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return None
+        while len(jobs) < self.batch_size:
+            try:
+                jobs.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return jobs
+
+    def _run(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            jobs = self._drain()
+            if not jobs:
+                continue
+            try:
+                self._process(jobs)
+            finally:
+                for _ in jobs:
+                    self._queue.task_done()
+
+    def _process(self, jobs: List[Dict]):
+        groups = {}
+        for job in jobs:
+            if "call" in job:
+                self._with_retries(lambda: job["call"](*job["args"], **job["kwargs"]), 1)
+            else:
+                groups.setdefault(id(job["kb"]), []).append(job)
+        for group in groups.values():
+            kb = group[0]["kb"]
+            items = [(job["text"], job["metadata"]) for job in group]
+            self._with_retries(lambda: kb.add_knowledge_many(items), len(items))
+
+    def _with_retries(self, func: Callable, count: int):
+        for attempt in range(self.max_retries + 1):
+            try:
+                func()
+                self._count("ingested", count)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self._count("failed", count)
+                    logger.error(f"[IngestionWorker] Giving up on {count} job(s) after {attempt + 1} attempts: {e}")
+                    return
+                self._count("retries")
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.warning(f"[IngestionWorker] Ingestion failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every queued job has been processed. Returns False on timeout."""
+        if threading.current_thread() is self._thread:
+            # Called from a job (e.g. a queued write that reads back): waiting on ourselves would never finish
+            return not self._queue.unfinished_tasks
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def shutdown(self, timeout: float = None):
+        """Flush outstanding jobs and stop the worker thread."""
+        if timeout is None:
+            timeout = Config().get('ingestion.shutdown_timeout', 30)
+        if not self.flush(timeout):
+            logger.warning(f"[IngestionWorker] {self.pending} ingestion job(s) still pending at shutdown")
+        self._stop.set()
+        self._thread.join(timeout=1)
+
+
+_lock = threading.Lock()
+_worker = None
+
+
+def get_ingestion_worker() -> IngestionWorker:
+    """Process-wide ingestion worker, started on first use and flushed at exit."""
+    global _worker
+    if _worker is None:
+        with _lock:
+            if _worker is None:
+                _worker = IngestionWorker()
+                atexit.register(_worker.shutdown)
+    return _worker
+
+
+def flush_ingestion(timeout: float = None) -> bool:
+    """
+    Wait for queued writes before a read that must see them (read-your-writes). Does nothing if the
+    worker was never started. Returns False on timeout (default ingestion.read_flush_timeout).
+    """
+    worker = _worker
+    if worker is None or not worker.pending:
+        return True
+    if timeout is None:
+        timeout = Config().get('ingestion.read_flush_timeout', 10)
+    if not worker.flush(timeout):
+        logger.warning(f"[IngestionWorker] {worker.pending} ingestion job(s) still pending after {timeout}s, reading anyway")
+        return False
+    return True
@@ -1,22 +1,202 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from sentence_transformers import SentenceTransformer
 import uuid
-from typing import List, Dict, Optional
+import gzip
+import json
+import hashlib
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple, Union
+from collections import deque
 import subprocess
 import os
 import socket
 from src.core.config import Config
+from src.core.knowledge_registry import get_embedding_model, get_query_embedding_cache, get_disk_embedding_cache, resolve_vector_backend
+import numpy as np
+from src.core.vector_store import VectorStore, QdrantStore, EmbeddedVectorStore
+from src.core.bm25_index import BM25Index, reciprocal_rank_fusion
+from src.core.ingestion_queue import flush_ingestion
 import re
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
 
 class KnowledgeBase:
-    def __init__(self, qdrant_url: str = 'http://localhost:6333', collection_name: str = 'research_knowledge'):
-        self.qdrant_client = QdrantClient(url=qdrant_url)
-        self.sentence_transformer = SentenceTransformer('all-MiniLM-L6-v2')
+    def __init__(self, qdrant_url: str = 'http://localhost:6333', collection_name: str = 'research_knowledge',
+                 embed_batch_size: int = None, upsert_batch_size: int = None, embedding_model=None,
+                 backend: str = None, store: VectorStore = None):
+        config = Config()
+        self.qdrant_url = qdrant_url
+        # 'qdrant', 'embedded', or 'auto' (use Qdrant when the server answers, else the embedded index)
+        self.backend = backend or config.get('qdrant.backend', 'auto')
+        self.embedded_path = config.get('qdrant.embedded_path', 'data/vector_index')
+        self.vector_size = config.get('embeddings.dimensions', 384)
+        self._store = store
+        self._store_lock = threading.RLock()
+        # Resolved lazily through the registry so every instance shares one loaded model
+        self._sentence_transformer = embedding_model
+        self.model_name = config.get('embeddings.model_name', 'all-MiniLM-L6-v2')
         self.collection_name = collection_name
-        self.chunk_size = 800  # tokens/chars, adjust for your embedding model
+        # Chunk size in model tokens; None means "as many as the encoder sees" (max_seq_length minus [CLS]/[SEP])
+        self.chunk_size = config.get('embeddings.chunk_tokens')
+        self.chunk_overlap = config.get('embeddings.chunk_overlap_tokens', 32)
+        # Batch sizes for ingestion: one encoder pass over all chunks, then sized upsert requests
+        self.embed_batch_size = embed_batch_size or config.get('qdrant.embed_batch_size', 32)
+        self.upsert_batch_size = upsert_batch_size or config.get('qdrant.upsert_batch_size', 64)
+        self.last_ingest_stats = {}
+        self.query_cache = get_query_embedding_cache()
+        self._disk_cache = None
+        self._disk_cache_resolved = False
+        # 'dense' (vector similarity only) or 'hybrid' (dense + BM25 fused with reciprocal rank fusion)
+        self.search_mode = config.get('qdrant.search_mode', 'hybrid')
+        self._lexical_index = None
+        self._lexical_lock = threading.Lock()
+        self._lexical_building = False
+        self._lexical_attempted_at = float('-inf')
+        self._lexical_pending = None  # (id, text or None for a delete) written while a build scrolls the store
+        # Seconds between background BM25 rebuilds, which pick up other processes' writes (0 disables them)
+        self.lexical_refresh_seconds = config.get('qdrant.lexical_refresh_seconds', 600)
+        self._research_migrated = False
+        # get_relevant_context: MMR candidate oversampling, relevance/diversity trade-off and prompt budget
+        self.mmr_oversample = config.get('qdrant.mmr_oversample', 4)
+        self.mmr_lambda = config.get('qdrant.mmr_lambda', 0.5)
+        self.context_max_chars = config.get('qdrant.context_max_chars', 6000)
+        self.context_max_tokens = config.get('qdrant.context_max_tokens')
         # self._ensure_qdrant_running()  # DISABLED: not compatible with URL-based config
-    
+
+    @property
+    def sentence_transformer(self):
+        if self._sentence_transformer is None:
+            self._sentence_transformer = get_embedding_model(self.model_name)
+        return self._sentence_transformer
+
+    @property
+    def disk_cache(self):
+        """Persistent embedding cache for this model (None when disabled in config)."""
+        if not self._disk_cache_resolved:
+            self._disk_cache = get_disk_embedding_cache(self.model_name)
+            self._disk_cache_resolved = True
+        return self._disk_cache
+
+    def _encode(self, texts: List[str], encoder=None) -> np.ndarray:
+        """
+        Encode texts in batches, serving any already in the persistent embedding cache without the model.
+        encoder, if given, is called with the uncached texts instead of the in-process model (e.g. a worker pool).
+        """
+        if not texts:
+            return np.zeros((0, self.vector_size), dtype=np.float32)
+        cache = self.disk_cache
+        cached = cache.get_many(texts) if cache else {}
+        missing = [i for i in range(len(texts)) if i not in cached]
+        if missing:
+            uncached = [texts[i] for i in missing]
+            if encoder is not None:
+                encoded = encoder(uncached)
+            else:
+                encoded = self.sentence_transformer.encode(uncached, batch_size=self.embed_batch_size)
+            if cache:
+                cache.put_many([texts[i] for i in missing], encoded)
+            cached.update(zip(missing, encoded))
+        return np.asarray([cached[i] for i in range(len(texts))], dtype=np.float32)
+
+    def _encode_query(self, query: str):
+        """Encode a search query, reusing cached embeddings for repeated lookups."""
+        embedding = self.query_cache.get(self.model_name, query)
+        if embedding is None:
+            embedding = self._encode([query])[0]
+            self.query_cache.put(self.model_name, query, embedding)
+        return embedding
+
+    @property
+    def store(self) -> VectorStore:
+        """Storage backend, resolved on first use so constructing a KnowledgeBase never blocks on the network."""
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    backend = self.backend
+                    if backend == 'auto':
+                        backend = resolve_vector_backend(self.qdrant_url)
+                    # Per-collection storage options, e.g. qdrant.collections.research_knowledge.quantization
+                    options = Config().get(f'qdrant.collections.{self.collection_name}', {}) or {}
+                    quantization = options.get('quantization')
+                    store_options = {
+                        "quantization": None if quantization in (None, 'none') else quantization,
+                        "oversampling": options.get('oversampling', 2.0),
+                        "rescore": options.get('rescore', True)
+                    }
+                    if backend == 'qdrant':
+                        store = QdrantStore(self.qdrant_url, self.collection_name, self.vector_size, **store_options)
+                    else:
+                        logger.info(f"[KnowledgeBase] Using embedded vector index at {self.embedded_path} for '{self.collection_name}'")
+                        store = EmbeddedVectorStore(self.embedded_path, self.collection_name, self.vector_size, **store_options)
+                    # Artifact lookups filter on these fields without any vector search
+                    for field in ('session_id', 'kind'):
+                        store.create_payload_index(field)
+                    self._store = store
+        return self._store
+
+    LEXICAL_RETRY_SECONDS = 30
+
+    @property
+    def lexical_index(self) -> Optional[BM25Index]:
+        """
+        BM25 index over stored chunk text, or None until its first build has finished. Builds run on
+        a background thread, so hybrid searches never wait on a scroll of the collection; this
+        process's writes are applied as they happen, and the index is rebuilt every
+        lexical_refresh_seconds to pick up writes from other processes.
+        """
+        with self._lexical_lock:
+            if self._lexical_due(time.monotonic()):
+                self._lexical_building = True
+                self._lexical_attempted_at = time.monotonic()
+                self._lexical_pending = []
+                threading.Thread(target=self._build_lexical_index, name="bm25-index", daemon=True).start()
+            return self._lexical_index
+
+    def _lexical_due(self, now: float) -> bool:
+        if self._lexical_building:
+            return False
+        if self._lexical_index is None:
+            return now - self._lexical_attempted_at >= self.LEXICAL_RETRY_SECONDS
+        return bool(self.lexical_refresh_seconds) and now - self._lexical_attempted_at >= self.lexical_refresh_seconds
+
+    def _build_lexical_index(self):
+        start = time.perf_counter()
+        index = BM25Index()
+        try:
+            for batch in self.store.iter_points(with_vectors=False):
+                for point in batch:
+                    text = point["payload"].get("text")
+                    if text:
+                        index.add(str(point["id"]), text)
+        except Exception as e:
+            logger.warning(f"[KnowledgeBase] Building the BM25 index for '{self.collection_name}' failed: {e}")
+            index = None
+        with self._lexical_lock:
+            if index is not None:
+                # Writes that landed while the store was being scrolled
+                for doc_id, text in self._lexical_pending:
+                    if text is None:
+                        index.remove(doc_id)
+                    else:
+                        index.add(doc_id, text)
+                self._lexical_index = index
+            self._lexical_pending = None
+            self._lexical_building = False
+        if index is not None:
+            logger.info(f"[KnowledgeBase] Built BM25 index over {len(index)} chunks of '{self.collection_name}' in {time.perf_counter() - start:.2f}s")
+
+    def _lexical_apply(self, entries: List[Tuple[str, Optional[str]]]):
+        """Mirror writes into the BM25 index (and into a build in progress): (id, text), or (id, None) for a delete."""
+        with self._lexical_lock:
+            for doc_id, text in entries:
+                if self._lexical_index is not None:
+                    if text is None:
+                        self._lexical_index.remove(doc_id)
+                    else:
+                        self._lexical_index.add(doc_id, text)
+                if self._lexical_pending is not None:
+                    self._lexical_pending.append((doc_id, text))
+
     def _ensure_qdrant_running(self):
         """Ensure Qdrant is running locally using the binary from config.yaml"""
         config = Config()
@@ -29,169 +209,611 @@ class KnowledgeBase:
             print(f"Starting Qdrant from {binary_path}...")
             subprocess.Popen([binary_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     
-    def _ensure_collection(self):
-        """Ensure the collection exists with proper configuration"""
-        collections = self.client.get_collections()
-        collection_names = [col.name for col in collections.collections]
-        
-        if self.collection_name not in collection_names:
-            # Create collection with vector size 384 (all-MiniLM-L6-v2)
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=VectorParams(size=384, distance=Distance.COSINE)
-            )
-    
+    def _content_id(self, *parts: str) -> str:
+        """Deterministic point ID from a hash of (collection, model, content), so repeated content maps to the same point."""
+        digest = hashlib.sha256('\x1f'.join((self.collection_name, self.model_name) + parts).encode('utf-8')).hexdigest()
+        return str(uuid.UUID(hex=digest[:32]))
+
+    def _existing_ids(self, ids: List[str]) -> set:
+        """IDs among `ids` that are already stored, checked with one bulk lookup."""
+        return {str(point["id"]) for point in self.store.retrieve(ids, with_payload=False)}
+
+    def _count_tokens(self, text: str) -> int:
+        """Number of model tokens in text (without special tokens); falls back to words if no tokenizer."""
+        tokenizer = getattr(self.sentence_transformer, 'tokenizer', None)
+        if tokenizer is None:
+            return len(text.split())
+        return len(tokenizer.encode(text, add_special_tokens=False))
+
+    def _max_chunk_tokens(self) -> int:
+        max_seq_length = getattr(self.sentence_transformer, 'max_seq_length', None) or 256
+        limit = max_seq_length - 2
+        return min(self.chunk_size, limit) if self.chunk_size else limit
+
+    @staticmethod
+    def _iter_sentences(source: Union[str, Iterable[str]], max_buffer: int = 20000) -> Iterator[str]:
+        """
+        Lazily yield sentences from a string or an iterable of text pieces (e.g. an open file).
+        Only the unfinished tail of the input is buffered; a tail with no sentence boundary is
+        flushed at whitespace once it exceeds max_buffer characters.
+        """
+        boundary = re.compile(r'(?<=[.!?])\s+')
+        pieces = [source] if isinstance(source, str) else source
+        buffer = ''
+        for piece in pieces:
+            buffer += piece
+            start = 0
+            for match in boundary.finditer(buffer):
+                sentence = buffer[start:match.start()].strip()
+                if sentence:
+                    yield sentence
+                start = match.end()
+            buffer = buffer[start:]
+            while len(buffer) > max_buffer:
+                cut = buffer.rfind(' ', 0, max_buffer)
+                cut = cut if cut > 0 else max_buffer
+                yield buffer[:cut].strip()
+                buffer = buffer[cut:]
+        if buffer.strip():
+            yield buffer.strip()
+
+    def _split_long_sentence(self, sentence: str, max_tokens: int) -> Iterator[str]:
+        """Split a sentence that alone exceeds max_tokens into word runs that fit."""
+        words = []
+        tokens = 0
+        for word in sentence.split():
+            word_tokens = self._count_tokens(word)
+            if words and tokens + word_tokens > max_tokens:
+                yield ' '.join(words)
+                words, tokens = [], 0
+            words.append(word)
+            tokens += word_tokens
+        if words:
+            yield ' '.join(words)
+
+    def iter_chunks(self, source: Union[str, Iterable[str]], chunk_size: int = None, overlap: int = None) -> Iterator[str]:
+        """
+        Stream chunks of at most chunk_size model tokens (default: what the encoder accepts) from text
+        or an iterable of text pieces. Chunks end on sentence boundaries and repeat up to `overlap`
+        tokens of trailing sentences from the previous chunk. No data is lost.
+        """
+        max_tokens = min(chunk_size, self._max_chunk_tokens()) if chunk_size else self._max_chunk_tokens()
+        overlap = self.chunk_overlap if overlap is None else overlap
+        window = deque()  # (sentence, token count) pairs in the current chunk
+        window_tokens = 0
+        fresh = False  # whether the window holds anything not yet emitted
+        for sentence in self._iter_sentences(source):
+            sentence_tokens = self._count_tokens(sentence)
+            parts = [(sentence, sentence_tokens)] if sentence_tokens <= max_tokens else [
+                (part, self._count_tokens(part)) for part in self._split_long_sentence(sentence, max_tokens)
+            ]
+            for part, part_tokens in parts:
+                if window and window_tokens + part_tokens > max_tokens:
+                    if fresh:
+                        yield ' '.join(text for text, _ in window)
+                    # Keep trailing sentences as overlap, as long as they leave room for the new part
+                    kept = deque()
+                    kept_tokens = 0
+                    for text, tokens in reversed(window):
+                        if kept_tokens + tokens > overlap or kept_tokens + tokens + part_tokens > max_tokens:
+                            break
+                        kept.appendleft((text, tokens))
+                        kept_tokens += tokens
+                    window, window_tokens = kept, kept_tokens
+                window.append((part, part_tokens))
+                window_tokens += part_tokens
+                fresh = True
+        if window and fresh:
+            yield ' '.join(text for text, _ in window)
+
     def _chunk_text(self, text: str, chunk_size: int = None) -> List[str]:
+        """Chunk text into a list of token-bounded, sentence-aligned pieces (see iter_chunks)."""
+        return list(self.iter_chunks(text, chunk_size))
+
+    @staticmethod
+    def _chunk_payload(chunk: str, metadata: Optional[Dict], index: int, total: int) -> Dict:
+        return {
+            "text": chunk,
+            "metadata": metadata or {},
+            "chunk_index": index,
+            "total_chunks": total
+        }
+
+    def _prepare_points(self, text: str, metadata: Dict = None) -> Tuple[List[str], List[Dict], Dict]:
+        """Chunk and encode text; returns (IDs of all chunks, points still to be written, ingest stats)."""
+        id_lists, points, stats = self._prepare_points_many([(text, metadata)])
+        return id_lists[0], points, stats
+
+    def _prepare_points_many(self, items: List[Tuple[str, Optional[Dict]]]) -> Tuple[List[List[str]], List[Dict], Dict]:
         """
-        Chunk text into pieces of at most chunk_size (default: self.chunk_size),
-        ending at the last period, and overlap the last complete sentence from the previous chunk.
-        No data is lost.
-        """
-        if chunk_size is None:
-            chunk_size = self.chunk_size
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        chunks = []
-        current_chunk = ''
-        last_sentence = ''
-        for sentence in sentences:
-            if len(current_chunk) + len(sentence) + 1 <= chunk_size:
-                if current_chunk:
-                    current_chunk += ' '
-                current_chunk += sentence
-                last_sentence = sentence
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                # Overlap: start next chunk with last complete sentence
-                current_chunk = last_sentence + ' ' + sentence
-                last_sentence = sentence
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-        # Remove duplicates due to overlap
-        deduped_chunks = []
-        for i, chunk in enumerate(chunks):
-            if i == 0 or chunk != chunks[i-1]:
-                deduped_chunks.append(chunk)
-        return deduped_chunks
+        Chunk and encode several (text, metadata) items together: one existence check and one
+        encoder pass for all of them. Returns (chunk IDs per item, points still to be written, ingest stats).
+        """
+        id_lists = []
+        new_chunks = []  # (chunk index, total chunks, chunk, point id, metadata)
+        all_ids = []
+        chunked = []
+        for text, metadata in items:
+            chunks = self._chunk_text(text)
+            point_ids = [self._content_id(chunk) for chunk in chunks]
+            chunked.append((chunks, point_ids, metadata))
+            id_lists.append(point_ids)
+            all_ids.extend(point_ids)
+        # Chunks already stored (or repeated within this batch) are not encoded again
+        seen = self._existing_ids(list(set(all_ids))) if all_ids else set()
+        for chunks, point_ids, metadata in chunked:
+            for i, (chunk, point_id) in enumerate(zip(chunks, point_ids)):
+                if point_id not in seen:
+                    seen.add(point_id)
+                    new_chunks.append((i, len(chunks), chunk, point_id, metadata))
+        # Encode every new chunk in one vectorized call
+        start = time.perf_counter()
+        embeddings = self._encode([chunk for _, _, chunk, _, _ in new_chunks])
+        encode_time = time.perf_counter() - start
+        points = []
+        for (i, total, chunk, point_id, metadata), embedding in zip(new_chunks, embeddings):
+            points.append({
+                "id": point_id,
+                "vector": embedding.tolist(),
+                "payload": self._chunk_payload(chunk, metadata, i, total)
+            })
+        stats = {
+            "chunks": len(all_ids),
+            "skipped": len(all_ids) - len(points),
+            "encode_seconds": encode_time
+        }
+        return id_lists, points, stats
+
+    def _index_points(self, points: List[Dict]):
+        """Keep the BM25 index in sync with newly written chunk points."""
+        self._lexical_apply([(str(point["id"]), point["payload"]["text"]) for point in points if point["payload"].get("text")])
+
+    def _record_ingest(self, stats: Dict):
+        self.last_ingest_stats = stats
+        logger.info(
+            f"[KnowledgeBase] Ingested {stats['chunks'] - stats['skipped']}/{stats['chunks']} chunks into '{self.collection_name}' "
+            f"({stats['skipped']} already stored): encode {stats['encode_seconds']:.3f}s, "
+            f"{stats['upsert_calls']} upsert call(s) {stats['upsert_seconds']:.3f}s"
+        )
 
     def add_knowledge(self, text: str, metadata: Dict = None) -> List[str]:
         """Add a piece of knowledge to the vector database, chunking if needed. Returns list of point IDs."""
-        chunk_size = self.chunk_size
-        chunks = self._chunk_text(text, chunk_size)
-        point_ids = []
-        for i, chunk in enumerate(chunks):
-            embedding = self.sentence_transformer.encode(chunk).tolist()
-            point_id = str(uuid.uuid4())
-            payload = {
-                "text": chunk,
-                "metadata": metadata or {},
-                "chunk_index": i,
-                "total_chunks": len(chunks)
-            }
-            point = PointStruct(
-                id=point_id,
-                vector=embedding,
-                payload=payload
-            )
-            self.qdrant_client.upsert(
-                collection_name=self.collection_name,
-                points=[point]
-            )
-            point_ids.append(point_id)
-        return point_ids
+        return self.add_knowledge_many([(text, metadata)])[0]
+
+    def add_knowledge_many(self, items: List[Tuple[str, Optional[Dict]]]) -> List[List[str]]:
+        """Add several (text, metadata) items with one encoder pass and batched upserts. Returns point IDs per item."""
+        id_lists, points, stats = self._prepare_points_many(items)
+        if not stats["chunks"]:
+            return id_lists
+        # Upsert in sized batches instead of one request per chunk
+        start = time.perf_counter()
+        upsert_calls = 0
+        for i in range(0, len(points), self.upsert_batch_size):
+            self.store.upsert(points[i:i + self.upsert_batch_size])
+            upsert_calls += 1
+        self._index_points(points)
+        stats.update(upsert_seconds=time.perf_counter() - start, upsert_calls=upsert_calls)
+        self._record_ingest(stats)
+        return id_lists
+
+    def add_chunks(self, chunks: List[Tuple[str, Optional[Dict], int, int]], encoder=None) -> Dict:
+        """
+        Store already-chunked text: (chunk, metadata, chunk index, total chunks) tuples. New chunks are
+        encoded in one pass (with encoder, if given, as in _encode) and written with a single bulk upsert.
+        Returns the ingest stats.
+        """
+        new = []
+        seen = self._existing_ids(list({self._content_id(chunk) for chunk, *_ in chunks})) if chunks else set()
+        for chunk, metadata, index, total in chunks:
+            point_id = self._content_id(chunk)
+            if point_id not in seen:
+                seen.add(point_id)
+                new.append((point_id, chunk, metadata, index, total))
+        start = time.perf_counter()
+        embeddings = self._encode([chunk for _, chunk, *_ in new], encoder=encoder)
+        encode_time = time.perf_counter() - start
+        points = [
+            {"id": point_id, "vector": embedding.tolist(), "payload": self._chunk_payload(chunk, metadata, index, total)}
+            for (point_id, chunk, metadata, index, total), embedding in zip(new, embeddings)
+        ]
+        start = time.perf_counter()
+        batches = [points[i:i + self.upsert_batch_size] for i in range(0, len(points), self.upsert_batch_size)]
+        self.store.bulk_upsert(batches)
+        self._index_points(points)
+        stats = {
+            "chunks": len(chunks),
+            "skipped": len(chunks) - len(points),
+            "encode_seconds": encode_time,
+            "upsert_seconds": time.perf_counter() - start,
+            "upsert_calls": len(batches)
+        }
+        if chunks:
+            self._record_ingest(stats)
+        return stats
+
+    @staticmethod
+    def _format_hit(point: Dict) -> Dict:
+        """Search result: score is always the dense cosine similarity; hybrid hits add the rrf_score they were ranked by."""
+        hit = {
+            "id": point["id"],
+            "text": point["payload"].get("text", ""),
+            "metadata": point["payload"].get("metadata", {}),
+            "score": point["score"]
+        }
+        if "rrf_score" in point:
+            hit["rrf_score"] = point["rrf_score"]
+        return hit
+
+    # Knowledge chunks carry no 'kind'; research, session artifacts and markers in the same collection do
+    CHUNK_FILTER = {"kind": None}
+
+    def _candidate_count(self, limit: int, mode: str) -> int:
+        """Dense candidates to fetch: hybrid mode oversamples so fusion has something to rerank."""
+        return max(limit * 4, 20) if mode == 'hybrid' else limit
     
-    def search_knowledge(self, query: str, limit: int = 5) -> List[Dict]:
+    def search_knowledge(self, query: str, limit: int = 5, mode: str = None) -> List[Dict]:
         """Search for relevant knowledge based on a query"""
+        mode = mode or self.search_mode
         # Generate query embedding
-        query_embedding = self.sentence_transformer.encode(query).tolist()
+        query_embedding = self._encode_query(query)
         
-        # Search in collection
-        search_result = self.qdrant_client.search(
-            collection_name=self.collection_name,
-            query_vector=query_embedding,
-            limit=limit
-        )
+        if mode == 'hybrid':
+            search_result = self._hybrid_search(query, query_embedding, limit)
+        else:
+            search_result = self.store.search(query_embedding, limit=limit, filters=self.CHUNK_FILTER)
         
         # Format results
-        results = []
-        for point in search_result:
-            results.append({
-                "id": point.id,
-                "text": point.payload.get("text", ""),
-                "metadata": point.payload.get("metadata", {}),
-                "score": point.score
-            })
-        
-        return results
+        return [self._format_hit(point) for point in search_result]
+
+    def _fuse(self, query: str, dense_hits: List[Dict], limit: int) -> List[Tuple[str, float]]:
+        """
+        Fuse a dense candidate ranking with the BM25 ranking for query; returns (id, RRF score) pairs.
+        Until the BM25 index is ready this is the dense ranking alone.
+        """
+        rankings = [[str(hit["id"]) for hit in dense_hits]]
+        index = self.lexical_index
+        if index is not None:
+            rankings.append([doc_id for doc_id, _ in index.search(query, limit=max(len(dense_hits), limit))])
+        return reciprocal_rank_fusion(rankings)[:limit]
+
+    @staticmethod
+    def _fused_hits(fused: List[Tuple[str, float]], points: Dict[str, Dict], query_embedding) -> List[Dict]:
+        """
+        Hits in fused order with their RRF score as rrf_score. Points only BM25 found were fetched
+        with their vectors and get their cosine similarity to the query as score, like dense hits.
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query)) or 1.0
+        hits = []
+        for doc_id, rrf_score in fused:
+            point = points.get(doc_id)
+            if point is None:
+                continue
+            if point.get("score") is None and point.get("vector") is not None:
+                vector = np.asarray(point["vector"], dtype=np.float32)
+                point = {**point, "score": float(vector @ query) / ((float(np.linalg.norm(vector)) or 1.0) * query_norm)}
+            hits.append({**point, "rrf_score": rrf_score})
+        return hits
+
+    def _hybrid_search(self, query: str, query_embedding, limit: int, with_vectors: bool = False) -> List[Dict]:
+        """Fuse dense and BM25 candidate rankings; hits are ordered by rrf_score and score stays the cosine similarity."""
+        dense_hits = self.store.search(query_embedding, limit=self._candidate_count(limit, 'hybrid'),
+                                       filters=self.CHUNK_FILTER, with_vectors=with_vectors)
+        fused = self._fuse(query, dense_hits, limit)
+        points = {str(hit["id"]): hit for hit in dense_hits}
+        missing = [doc_id for doc_id, _ in fused if doc_id not in points]
+        points.update((str(point["id"]), point) for point in self.store.retrieve(missing, with_vectors=True))
+        return self._fused_hits(fused, points, query_embedding)
+
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Encode several queries, serving repeats from the LRU and encoding the rest in one batch."""
+        vectors = [self.query_cache.get(self.model_name, query) for query in queries]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = self._encode([queries[i] for i in missing])
+            for i, vector in zip(missing, encoded):
+                self.query_cache.put(self.model_name, queries[i], vector)
+                vectors[i] = vector
+        return np.asarray(vectors, dtype=np.float32)
+
+    def search_many(self, queries: List[str], limit: int = 5, mode: str = None) -> List[List[Dict]]:
+        """Search several queries at once: one batched encode and one batched vector search."""
+        if not queries:
+            return []
+        mode = mode or self.search_mode
+        vectors = self._encode_queries(queries)
+        dense_results = self.store.search_batch(vectors, limit=self._candidate_count(limit, mode), filters=self.CHUNK_FILTER)
+        if mode != 'hybrid':
+            return [[self._format_hit(point) for point in hits] for hits in dense_results]
+        fused_results, points, missing = self._fuse_many(queries, dense_results, limit)
+        points.update((str(point["id"]), point) for point in self.store.retrieve(missing, with_vectors=True))
+        return [
+            [self._format_hit(point) for point in self._fused_hits(fused, points, vector)]
+            for fused, vector in zip(fused_results, vectors)
+        ]
+
+    def _fuse_many(self, queries: List[str], dense_results: List[List[Dict]], limit: int):
+        """Fuse each query's dense hits with BM25; returns (fused rankings, known points by id, ids still to fetch)."""
+        fused_results = [self._fuse(query, hits, limit) for query, hits in zip(queries, dense_results)]
+        points = {str(hit["id"]): hit for hits in dense_results for hit in hits}
+        missing = list({doc_id for fused in fused_results for doc_id, _ in fused if doc_id not in points})
+        return fused_results, points, missing
     
     def add_research_result(self, query: str, answer: str, sources: List[str] = None, session_id: int = None):
         """Add a complete research result to the knowledge base"""
-        metadata = {
+        return self.add_knowledge(answer, self.research_metadata(query, sources, session_id))
+
+    @staticmethod
+    def research_metadata(query: str, sources: List[str] = None, session_id: int = None) -> Dict:
+        return {
             "type": "research_result",
             "query": query,
             "sources": sources or [],
             "session_id": session_id
         }
-        
-        return self.add_knowledge(answer, metadata)
     
-    def get_relevant_context(self, query: str, limit: int = 3) -> str:
-        """Get relevant context from previous research for a query"""
-        results = self.search_knowledge(query, limit)
+    def get_relevant_context(self, query: str, limit: int = 3, max_chars: int = None, max_tokens: int = None) -> str:
+        """
+        Get relevant context from previous research for a query.
+        Picks up to `limit` chunks from an oversampled candidate set with maximal marginal relevance,
+        so near-duplicate chunks give way to distinct ones, and stops adding chunks at the character/token budget.
+        """
+        max_chars = max_chars or self.context_max_chars
+        max_tokens = max_tokens or self.context_max_tokens
+        query_embedding = self._encode_query(query)
+        candidates = limit * self.mmr_oversample
+        if self.search_mode == 'hybrid':
+            hits = self._hybrid_search(query, query_embedding, candidates, with_vectors=True)
+        else:
+            hits = self.store.search(query_embedding, limit=candidates, filters=self.CHUNK_FILTER, with_vectors=True)
+        hits = [hit for hit in hits if hit["payload"].get("text") and hit.get("vector") is not None]
         
-        if not results:
+        if not hits:
             return ""
         
         context_parts = []
-        for result in results:
-            context_parts.append(f"Previous research: {result['text']}")
+        used_chars = 0
+        used_tokens = 0
+        for i in self._mmr_order(query_embedding, np.asarray([hit["vector"] for hit in hits], dtype=np.float32)):
+            part = f"Previous research: {hits[i]['payload']['text']}"
+            part_tokens = self._count_tokens(part) if max_tokens else 0
+            if (max_chars and used_chars + len(part) > max_chars) or (max_tokens and used_tokens + part_tokens > max_tokens):
+                continue
+            context_parts.append(part)
+            used_chars += len(part) + 2
+            used_tokens += part_tokens
+            if len(context_parts) >= limit:
+                break
         
         return "\n\n".join(context_parts)
+
+    def _mmr_order(self, query_embedding, vectors: np.ndarray) -> List[int]:
+        """Order candidate rows by maximal marginal relevance: mmr_lambda * relevance - (1 - mmr_lambda) * redundancy."""
+        def normalize(matrix):
+            norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+            return matrix / np.where(norms == 0, 1.0, norms)
+        vectors = normalize(vectors)
+        relevance = vectors @ normalize(np.asarray(query_embedding, dtype=np.float32))
+        similarity = vectors @ vectors.T
+        redundancy = np.zeros(len(vectors), dtype=np.float32)
+        remaining = np.ones(len(vectors), dtype=bool)
+        order = []
+        while remaining.any():
+            scores = self.mmr_lambda * relevance - (1 - self.mmr_lambda) * redundancy
+            scores[~remaining] = -np.inf
+            pick = int(np.argmax(scores))
+            order.append(pick)
+            remaining[pick] = False
+            redundancy = np.maximum(redundancy, similarity[pick])
+        return order
     
     def delete_knowledge(self, point_id: str):
         """Delete a piece of knowledge from the database"""
-        self.qdrant_client.delete(
-            collection_name=self.collection_name,
-            points_selector=[point_id]
-        )
+        self.store.delete([point_id])
+        self._lexical_apply([(str(point_id), None)])
 
-    def store_research(self, research_data: str, query: str, session_id: str):
-        """Store research data with query and session_id."""
-        embedding = self.sentence_transformer.encode(research_data)
+    SNAPSHOT_FORMAT = 1
+
+    def export_snapshot(self, path: str, vector_dtype: str = 'float32', batch_size: int = 4096) -> Dict:
+        """
+        Write the collection to directory `path`: vectors as one contiguous row-major array file
+        (float32, or int8 with a float32 scale per row), payloads as gzipped JSONL in the same row
+        order, and manifest.json, written last, recording the model, dimensions and point count.
+        """
+        if vector_dtype not in ('float32', 'int8'):
+            raise ValueError(f"Unsupported snapshot vector dtype: {vector_dtype}")
+        os.makedirs(path, exist_ok=True)
+        manifest_path = os.path.join(path, 'manifest.json')
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        files = {"vectors": 'vectors.f32' if vector_dtype == 'float32' else 'vectors.i8', "payloads": 'payloads.jsonl.gz'}
+        if vector_dtype == 'int8':
+            files["scales"] = 'scales.f32'
+        count = 0
+        with open(os.path.join(path, files["vectors"]), 'wb') as vectors_file, \
+                gzip.open(os.path.join(path, files["payloads"]), 'wt', encoding='utf-8') as payloads_file, \
+                open(os.path.join(path, files.get("scales", os.devnull)), 'wb') as scales_file:
+            for batch in self.store.iter_points(batch_size, with_vectors=True):
+                vectors = np.asarray([point["vector"] for point in batch], dtype=np.float32).reshape(len(batch), self.vector_size)
+                if vector_dtype == 'int8':
+                    scales = np.abs(vectors).max(axis=1)
+                    scales = np.where(scales == 0, 1.0, scales).astype(np.float32) / 127
+                    np.round(vectors / scales[:, None]).astype(np.int8).tofile(vectors_file)
+                    scales.tofile(scales_file)
+                else:
+                    vectors.tofile(vectors_file)
+                for point in batch:
+                    payloads_file.write(json.dumps({"id": point["id"], "payload": point["payload"]}) + '\n')
+                count += len(batch)
+        manifest = {
+            "format": self.SNAPSHOT_FORMAT,
+            "model_name": self.model_name,
+            "dimensions": self.vector_size,
+            "count": count,
+            "vector_dtype": vector_dtype,
+            "collection": self.collection_name,
+            "created_at": time.time(),
+            "files": files
+        }
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        logger.info(f"[KnowledgeBase] Exported {count} points from '{self.collection_name}' to {path}")
+        return manifest
+
+    def import_snapshot(self, path: str, batch_size: int = 4096) -> int:
+        """
+        Load a snapshot written by export_snapshot into this collection, streaming vectors from a
+        memory map and payloads line by line in batches. Returns the number of points imported.
+        """
+        with open(os.path.join(path, 'manifest.json')) as f:
+            manifest = json.load(f)
+        if manifest.get("format") != self.SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format: {manifest.get('format')}")
+        if manifest["model_name"] != self.model_name or manifest["dimensions"] != self.vector_size:
+            raise ValueError(
+                f"Snapshot was built with {manifest['model_name']} ({manifest['dimensions']} dims), "
+                f"but this knowledge base uses {self.model_name} ({self.vector_size} dims)"
+            )
+        count, files = manifest["count"], manifest["files"]
+        if count == 0:
+            return 0
+        shape = (count, self.vector_size)
+        if manifest["vector_dtype"] == 'int8':
+            vectors = np.memmap(os.path.join(path, files["vectors"]), dtype=np.int8, mode='r', shape=shape)
+            scales = np.memmap(os.path.join(path, files["scales"]), dtype=np.float32, mode='r', shape=(count,))
+        else:
+            vectors = np.memmap(os.path.join(path, files["vectors"]), dtype=np.float32, mode='r', shape=shape)
+            scales = None
+
+        def batches():
+            for batch in read_batches():
+                yield batch
+                # Resumed once the store has taken the batch
+                self._index_points(batch)
+
+        def read_batches():
+            with gzip.open(os.path.join(path, files["payloads"]), 'rt', encoding='utf-8') as payloads_file:
+                row = 0
+                batch = []
+                for line in payloads_file:
+                    batch.append(json.loads(line))
+                    if len(batch) == batch_size:
+                        yield make_points(row, batch)
+                        row += len(batch)
+                        batch = []
+                if batch:
+                    yield make_points(row, batch)
+
+        def make_points(row: int, entries: List[Dict]) -> List[Dict]:
+            block = np.asarray(vectors[row:row + len(entries)], dtype=np.float32)
+            if scales is not None:
+                block *= scales[row:row + len(entries), None]
+            return [{"id": entry["id"], "vector": vector, "payload": entry["payload"]} for entry, vector in zip(entries, block)]
+
+        imported = self.store.bulk_upsert(batches())
+        logger.info(f"[KnowledgeBase] Imported {imported} points into '{self.collection_name}' from {path}")
+        return imported
+
+    def store_research(self, research_data: str, query: str, session_id: str, kind: str = 'research'):
+        """Store research data with query and session_id. Identical data for the same session is stored once."""
+        point_id = self._content_id(str(session_id), query, research_data)
+        if self._existing_ids([point_id]):
+            return point_id
+        embedding = self._encode([research_data])[0]
         point = {
-            "id": str(uuid.uuid4()),
+            "id": point_id,
             "vector": embedding.tolist(),
-            "payload": {"query": query, "session_id": session_id, "data": research_data}
+            "payload": {"query": query, "session_id": session_id, "kind": kind, "data": research_data}
         }
-        self.qdrant_client.upsert(collection_name=self.collection_name, points=[point])
-
-    def retrieve_research(self, query: str, session_id: str = None, limit: int = 5) -> list:
-        """Retrieve research by query and/or session_id using semantic search."""
-        query_embedding = self.sentence_transformer.encode(query)
-        search_result = self.qdrant_client.search(
-            collection_name=self.collection_name,
-            query_vector=query_embedding.tolist(),
-            limit=limit,
-            query_filter={"must": [{"key": "session_id", "match": {"value": session_id}}]} if session_id else None
-        )
-        return [hit.payload["data"] for hit in search_result]
+        self.store.upsert([point])
+        return point_id
+
+    def _artifact_id(self, kind: str, session_id: str) -> str:
+        return self._content_id('artifact', kind, str(session_id))
+
+    def _placeholder_vector(self) -> List[float]:
+        """Constant unit vector for points that are only ever fetched by key or filter, never by similarity."""
+        vector = [0.0] * self.vector_size
+        vector[0] = 1.0
+        return vector
+
+    def store_artifact(self, kind: str, data: str, session_id: str, query: str = '') -> str:
+        """
+        Store the single artifact of a kind (e.g. 'code', 'report') for a session, replacing any previous one.
+        Artifacts are read back by key, so they get a placeholder vector instead of an embedding.
+        """
+        point = {
+            "id": self._artifact_id(kind, session_id),
+            "vector": self._placeholder_vector(),
+            "payload": {"query": query, "session_id": session_id, "kind": kind, "data": data}
+        }
+        self.store.upsert([point])
+        return point["id"]
+
+    def store_code(self, code: str, session_id: str, query: str = '') -> str:
+        """Store generated code for a session."""
+        return self.store_artifact('code', code, session_id, query)
+
+    def store_report(self, report: str, session_id: str, query: str = '') -> str:
+        """Store the final report for a session."""
+        return self.store_artifact('report', report, session_id, query)
+
+    def retrieve_artifact(self, kind: str, session_id: str) -> str:
+        """
+        Fetch a session artifact by key, falling back to a filtered scroll; no embedding is computed.
+        Artifacts are written through the ingestion queue, so queued writes are flushed first.
+        """
+        flush_ingestion()
+        points = self.store.retrieve([self._artifact_id(kind, session_id)])
+        if not points:
+            points = self.store.scroll(filters={"session_id": session_id, "kind": kind}, limit=1)
+        return points[0]["payload"].get("data", "") if points else ""
+
+    def migrate_legacy_research(self) -> int:
+        """
+        One-off, run at startup: research stored before payloads carried a 'kind' is tagged kind='research'
+        so the kind filter finds it (and chunk searches skip it). The collection is paged through without
+        vectors and only payloads are updated; a marker point records that the migration is done.
+        Returns the number of points tagged.
+        """
+        if self._research_migrated:
+            return 0
+        tagged = 0
+        try:
+            marker_id = self._content_id('migration', 'research-kind')
+            if not self._existing_ids([marker_id]):
+                for batch in self.store.iter_points(batch_size=self.upsert_batch_size * 16, with_vectors=False):
+                    # session_id 'websearch' marks old web search cache blobs, purged by SemanticSearchCache
+                    legacy = [
+                        point["id"] for point in batch
+                        if "kind" not in point["payload"] and "data" in point["payload"]
+                        and point["payload"].get("session_id") not in (None, 'websearch')
+                    ]
+                    self.store.set_payload(legacy, {"kind": "research"})
+                    tagged += len(legacy)
+                self.store.upsert([{"id": marker_id, "vector": self._placeholder_vector(), "payload": {"kind": "migration", "name": "research-kind"}}])
+                logger.info(f"[KnowledgeBase] Tagged {tagged} legacy research point(s) in '{self.collection_name}' with kind='research'")
+        except Exception as e:
+            logger.warning(f"[KnowledgeBase] Migrating legacy research in '{self.collection_name}' failed: {e}")
+            return tagged
+        self._research_migrated = True
+        return tagged
+
+    def retrieve_research(self, query: str = None, session_id: str = None, limit: int = 5) -> list:
+        """Retrieve research by query and/or session_id; semantic search when a query is given, else a filtered scroll."""
+        filters = {"kind": "research"}
+        if session_id:
+            filters["session_id"] = session_id
+        if not query:
+            search_result = self.store.scroll(filters=filters, limit=limit)
+        else:
+            search_result = self.store.search(self._encode_query(query), limit=limit, filters=filters)
+        return [hit["payload"]["data"] for hit in search_result]
 
     def retrieve_code(self, session_id: str) -> str:
         """Retrieve code by session_id."""
-        search_result = self.qdrant_client.search(
-            collection_name=self.collection_name,
-            query_vector=self.sentence_transformer.encode("Python code").tolist(),
-            limit=1,
-            query_filter={"must": [{"key": "session_id", "match": {"value": session_id}}]}
-        )
-        return search_result[0].payload["data"] if search_result else ""
+        return self.retrieve_artifact('code', session_id)
 
     def retrieve_report(self, session_id: str) -> str:
         """Retrieve report by session_id."""
-        search_result = self.qdrant_client.search(
-            collection_name=self.collection_name,
-            query_vector=self.sentence_transformer.encode("report").tolist(),
-            limit=1,
-            query_filter={"must": [{"key": "session_id", "match": {"value": session_id}}]}
-        )
-        return search_result[0].payload["data"] if search_result else "" 
\ No newline at end of file
+        return self.retrieve_artifact('report', session_id)
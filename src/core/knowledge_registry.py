@@ -0,0 +1,120 @@
+import socket
+import threading
+import logging
+from typing import Dict, Tuple
+from urllib.parse import urlparse
+from src.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+
+_lock = threading.RLock()
+_models: Dict[str, object] = {}
+_knowledge_bases: Dict[Tuple[str, str], object] = {}
+_query_cache = None
+_disk_caches: Dict[str, object] = {}
+_vector_backends: Dict[str, str] = {}
+
+
+def get_embedding_model(model_name: str = None):
+    """Return the process-wide embedding model, loading it on first use with the configured backend."""
+    config = Config()
+    model_name = model_name or config.get('embeddings.model_name', DEFAULT_EMBEDDING_MODEL)
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+    with _lock:
+        # Another thread may have finished loading while we waited for the lock
+        if model_name not in _models:
+            from src.core.embedding_backends import load_embedding_model
+            backend = config.get('embeddings.backend', 'torch')
+            logger.info(f"[KnowledgeRegistry] Loading embedding model '{model_name}' ({backend})")
+            _models[model_name] = load_embedding_model(
+                model_name,
+                backend=backend,
+                onnx_path=config.get('embeddings.onnx.path'),
+                quantized=config.get('embeddings.onnx.quantized', False),
+                fallback_to_torch=config.get('embeddings.onnx.fallback_to_torch', True),
+                num_threads=config.get('embeddings.onnx.num_threads')
+            )
+        return _models[model_name]
+
+
+def get_knowledge_base(qdrant_url: str = None, collection_name: str = None):
+    """Return the shared KnowledgeBase for (qdrant_url, collection_name), creating it on first use."""
+    config = Config()
+    qdrant_url = qdrant_url or config.get('qdrant.url', 'http://localhost:6333')
+    collection_name = collection_name or config.get('qdrant.collection_name', 'research_knowledge')
+    key = (qdrant_url, collection_name)
+    kb = _knowledge_bases.get(key)
+    if kb is not None:
+        return kb
+    with _lock:
+        if key not in _knowledge_bases:
+            from src.core.knowledge_base import KnowledgeBase
+            _knowledge_bases[key] = KnowledgeBase(qdrant_url=qdrant_url, collection_name=collection_name)
+        return _knowledge_bases[key]
+
+
+def _qdrant_reachable(qdrant_url: str, timeout: float = 1.0) -> bool:
+    """Check whether a Qdrant server is listening at qdrant_url."""
+    parsed = urlparse(qdrant_url)
+    try:
+        with socket.create_connection((parsed.hostname or 'localhost', parsed.port or 6333), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def resolve_vector_backend(qdrant_url: str) -> str:
+    """
+    Backend for qdrant.backend 'auto': 'qdrant' when the server answers, else 'embedded'. Probed once
+    per URL per process, so every collection (research knowledge, search cache, ...) uses the same one.
+    """
+    backend = _vector_backends.get(qdrant_url)
+    if backend is not None:
+        return backend
+    with _lock:
+        if qdrant_url not in _vector_backends:
+            if _qdrant_reachable(qdrant_url):
+                _vector_backends[qdrant_url] = 'qdrant'
+            else:
+                logger.warning(
+                    f"[KnowledgeRegistry] No Qdrant server at {qdrant_url}; this process writes to the embedded "
+                    f"vector index instead, which a Qdrant-backed run will not see (set qdrant.backend to pin one)"
+                )
+                _vector_backends[qdrant_url] = 'embedded'
+        return _vector_backends[qdrant_url]
+
+
+def get_query_embedding_cache():
+    """Return the process-wide LRU cache of query embeddings."""
+    global _query_cache
+    if _query_cache is None:
+        with _lock:
+            if _query_cache is None:
+                from src.core.embedding_cache import EmbeddingCache
+                _query_cache = EmbeddingCache(maxsize=Config().get('embeddings.query_cache_size', 1024))
+    return _query_cache
+
+
+def get_disk_embedding_cache(model_name: str = None):
+    """Return the persistent embedding cache for a model, or None when disabled in config."""
+    config = Config()
+    if not config.get('embeddings.disk_cache.enabled', True):
+        return None
+    model_name = model_name or config.get('embeddings.model_name', DEFAULT_EMBEDDING_MODEL)
+    cache = _disk_caches.get(model_name)
+    if cache is not None:
+        return cache
+    with _lock:
+        if model_name not in _disk_caches:
+            from src.core.embedding_cache import DiskEmbeddingCache
+            _disk_caches[model_name] = DiskEmbeddingCache(
+                directory=config.get('embeddings.disk_cache.path', 'data/embedding_cache'),
+                model_name=model_name,
+                dimensions=config.get('embeddings.dimensions', 384),
+                max_entries=config.get('embeddings.disk_cache.max_entries', 100000)
+            )
+        return _disk_caches[model_name]
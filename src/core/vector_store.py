@@ -0,0 +1,808 @@
+import os
+import json
+import threading
+import logging
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Number of set bits in every possible byte, for Hamming distances over packed binary codes
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+
+def _payload_value(payload: Dict, key: str):
+    """Resolve a dotted payload key such as 'metadata.type'."""
+    value = payload
+    for part in key.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+class VectorStore:
+    """
+    Storage backend used by KnowledgeBase.
+    Points are dicts with 'id', 'vector' and 'payload'; hits additionally carry a 'score'.
+    Filters are dicts mapping (optionally dotted) payload keys to the exact value they must match;
+    a value of None matches points that do not have the key.
+    """
+
+    def upsert(self, points: List[Dict]):
+        raise NotImplementedError
+
+    def set_payload(self, ids: List[str], payload: Dict):
+        """Merge payload keys into existing points without rewriting their vectors."""
+        points = self.retrieve(ids, with_vectors=True)
+        self.upsert([{"id": point["id"], "vector": point["vector"], "payload": {**point["payload"], **payload}} for point in points])
+
+    def search(self, vector, limit: int = 5, filters: Dict = None, with_vectors: bool = False) -> List[Dict]:
+        raise NotImplementedError
+
+    def search_batch(self, vectors, limit: int = 5, filters: Dict = None, with_vectors: bool = False) -> List[List[Dict]]:
+        """Run several searches; backends override this to issue a single request."""
+        return [self.search(vector, limit, filters, with_vectors) for vector in vectors]
+
+    def retrieve(self, ids: List[str], with_vectors: bool = False, with_payload: bool = True) -> List[Dict]:
+        raise NotImplementedError
+
+    def scroll(self, filters: Dict = None, limit: int = None, with_vectors: bool = False) -> List[Dict]:
+        raise NotImplementedError
+
+    def delete(self, ids: List[str]):
+        raise NotImplementedError
+
+    def create_payload_index(self, field: str):
+        """Index a payload field for fast exact-match filtering; a no-op where unsupported."""
+
+    def iter_points(self, batch_size: int = 1024, with_vectors: bool = True) -> Iterator[List[Dict]]:
+        """Yield every point in batches; backends override this to page through storage."""
+        points = self.scroll(with_vectors=with_vectors)
+        for i in range(0, len(points), batch_size):
+            yield points[i:i + batch_size]
+
+    def bulk_upsert(self, batches: Iterable[List[Dict]]) -> int:
+        """Write a stream of point batches; backends override this with a faster bulk path. Returns the count."""
+        count = 0
+        for batch in batches:
+            self.upsert(batch)
+            count += len(batch)
+        return count
+
+
+class QdrantStore(VectorStore):
+    """VectorStore backed by a Qdrant server."""
+
+    def __init__(self, url: str, collection_name: str, vector_size: int = 384,
+                 quantization: str = None, oversampling: float = 2.0, rescore: bool = True):
+        from qdrant_client import QdrantClient
+        self.client = QdrantClient(url=url)
+        self.collection_name = collection_name
+        self.vector_size = vector_size
+        self.quantization = quantization
+        self.oversampling = oversampling
+        self.rescore = rescore
+        self._ensure_collection()
+
+    def _quantization_config(self):
+        from qdrant_client.models import (
+            ScalarQuantization, ScalarQuantizationConfig, ScalarType, BinaryQuantization, BinaryQuantizationConfig
+        )
+        if self.quantization == 'int8':
+            return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True))
+        if self.quantization == 'binary':
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        return None
+
+    def _ensure_collection(self):
+        """Ensure the collection exists with proper configuration"""
+        from qdrant_client.models import Distance, VectorParams, VectorParamsDiff
+        collections = self.client.get_collections()
+        collection_names = [col.name for col in collections.collections]
+        quantization_config = self._quantization_config()
+        if self.collection_name not in collection_names:
+            # With quantization the quantized copies stay in RAM and the originals move to disk for rescoring
+            self.client.create_collection(
+                collection_name=self.collection_name,
+                vectors_config=VectorParams(
+                    size=self.vector_size,
+                    distance=Distance.COSINE,
+                    on_disk=quantization_config is not None
+                ),
+                quantization_config=quantization_config
+            )
+        elif quantization_config is not None:
+            info = self.client.get_collection(self.collection_name)
+            vectors = info.config.params.vectors
+            # Only the unnamed vector this store writes can be moved; named-vector collections are left alone
+            move_to_disk = isinstance(vectors, VectorParams) and not vectors.on_disk
+            if info.config.quantization_config is None or move_to_disk:
+                # An existing collection keeps its originals in RAM until they are moved to disk as well
+                try:
+                    self.client.update_collection(
+                        collection_name=self.collection_name,
+                        vectors_config={"": VectorParamsDiff(on_disk=True)} if move_to_disk else None,
+                        quantization_config=quantization_config if info.config.quantization_config is None else None
+                    )
+                    logger.info(f"[QdrantStore] Enabled {self.quantization} quantization on '{self.collection_name}'"
+                                f"{' and moved its original vectors to disk' if move_to_disk else ''}")
+                except Exception as e:
+                    logger.warning(f"[QdrantStore] Could not reconfigure '{self.collection_name}' for {self.quantization} "
+                                   f"quantization ({e}); recreate the collection to keep the original vectors on disk")
+
+    def search_params(self):
+        if not self.quantization:
+            return None
+        from qdrant_client.models import SearchParams, QuantizationSearchParams
+        return SearchParams(quantization=QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling))
+
+    def create_payload_index(self, field: str):
+        from qdrant_client.models import PayloadSchemaType
+        info = self.client.get_collection(self.collection_name)
+        if field not in (info.payload_schema or {}):
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field,
+                field_schema=PayloadSchemaType.KEYWORD
+            )
+
+    def to_filter(self, filters: Optional[Dict]):
+        if not filters:
+            return None
+        from qdrant_client.models import Filter, FieldCondition, MatchValue, IsEmptyCondition, PayloadField
+        return Filter(must=[
+            IsEmptyCondition(is_empty=PayloadField(key=key)) if value is None
+            else FieldCondition(key=key, match=MatchValue(value=value))
+            for key, value in filters.items()
+        ])
+
+    @staticmethod
+    def to_dict(point, with_vectors: bool = False) -> Dict:
+        result = {"id": point.id, "payload": point.payload or {}, "score": getattr(point, 'score', None)}
+        if with_vectors:
+            result["vector"] = point.vector
+        return result
+
+    @staticmethod
+    def to_point_structs(points: List[Dict]) -> list:
+        from qdrant_client.models import PointStruct
+        return [PointStruct(id=p["id"], vector=list(map(float, p["vector"])), payload=p["payload"]) for p in points]
+
+    def upsert(self, points: List[Dict]):
+        self.client.upsert(collection_name=self.collection_name, points=self.to_point_structs(points))
+
+    def set_payload(self, ids: List[str], payload: Dict):
+        if ids:
+            self.client.set_payload(collection_name=self.collection_name, payload=payload, points=list(ids))
+
+    def search(self, vector, limit: int = 5, filters: Dict = None, with_vectors: bool = False) -> List[Dict]:
+        hits = self.client.query_points(
+            collection_name=self.collection_name,
+            query=list(map(float, vector)),
+            limit=limit,
+            query_filter=self.to_filter(filters),
+            search_params=self.search_params(),
+            with_vectors=with_vectors
+        ).points
+        return [self.to_dict(hit, with_vectors) for hit in hits]
+
+    def search_requests(self, vectors, limit: int, filters: Dict = None, with_vectors: bool = False) -> list:
+        """QueryRequest objects for a batched search (shared with the async client)."""
+        from qdrant_client.models import QueryRequest
+        return [
+            QueryRequest(
+                query=list(map(float, vector)),
+                limit=limit,
+                filter=self.to_filter(filters),
+                params=self.search_params(),
+                with_payload=True,
+                with_vector=with_vectors
+            )
+            for vector in vectors
+        ]
+
+    def search_batch(self, vectors, limit: int = 5, filters: Dict = None, with_vectors: bool = False) -> List[List[Dict]]:
+        if len(vectors) == 0:
+            return []
+        responses = self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=self.search_requests(vectors, limit, filters, with_vectors)
+        )
+        return [[self.to_dict(hit, with_vectors) for hit in response.points] for response in responses]
+
+    def retrieve(self, ids: List[str], with_vectors: bool = False, with_payload: bool = True) -> List[Dict]:
+        if not ids:
+            return []
+        points = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=list(ids),
+            with_vectors=with_vectors,
+            with_payload=with_payload
+        )
+        return [self.to_dict(point, with_vectors) for point in points]
+
+    def scroll(self, filters: Dict = None, limit: int = None, with_vectors: bool = False) -> List[Dict]:
+        results = []
+        offset = None
+        page_size = min(limit, 256) if limit else 256
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=self.to_filter(filters),
+                limit=page_size,
+                offset=offset,
+                with_vectors=with_vectors
+            )
+            results.extend(self.to_dict(point, with_vectors) for point in points)
+            if offset is None or (limit and len(results) >= limit):
+                break
+        return results[:limit] if limit else results
+
+    def delete(self, ids: List[str]):
+        if not ids:
+            return
+        self.client.delete(collection_name=self.collection_name, points_selector=list(ids))
+
+    def iter_points(self, batch_size: int = 1024, with_vectors: bool = True) -> Iterator[List[Dict]]:
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_vectors=with_vectors
+            )
+            if points:
+                yield [self.to_dict(point, with_vectors) for point in points]
+            if offset is None:
+                break
+
+    def bulk_upsert(self, batches: Iterable[List[Dict]]) -> int:
+        count = 0
+        previous = None
+        for batch in batches:
+            if previous:
+                # wait=False lets Qdrant apply one batch while the next is being read; only the last one is awaited
+                self.client.upsert(collection_name=self.collection_name, points=self.to_point_structs(previous), wait=False)
+            previous = batch
+            count += len(batch)
+        if previous:
+            self.client.upsert(collection_name=self.collection_name, points=self.to_point_structs(previous), wait=True)
+        return count
+
+
+def _lock_directory(directory: str):
+    """Take an exclusive, non-blocking lock on directory/.lock and return the open lock file."""
+    os.makedirs(directory, exist_ok=True)
+    lock_file = open(os.path.join(directory, '.lock'), 'a+')
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        raise RuntimeError(
+            f"Embedded vector index {directory} is open in another process; stop it or run a Qdrant server "
+            f"so several processes can share the collection"
+        )
+    return lock_file
+
+
+class _OverlayRows:
+    """
+    Float vectors of a quantized collection, indexed like an array: base rows stay memory-mapped from
+    vectors.npy and only rows written since the last compaction (new points and replaced vectors) are
+    held in an in-RAM tail. Row i is base[source[i]] when source[i] >= 0, else tail[-source[i] - 1].
+    """
+
+    def __init__(self, base: np.ndarray):
+        self.base = base
+        self.source = np.arange(len(base), dtype=np.int64)
+        self.tail = np.empty((0, base.shape[1]), dtype=np.float32)
+        self.tail_rows = 0
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def __getitem__(self, rows) -> np.ndarray:
+        source = self.source[rows]
+        if np.ndim(source) == 0:
+            return self.base[source] if source >= 0 else self.tail[-source - 1]
+        result = np.empty((len(source), self.base.shape[1]), dtype=np.float32)
+        in_base = source >= 0
+        result[in_base] = self.base[source[in_base]]
+        result[~in_base] = self.tail[-source[~in_base] - 1]
+        return result
+
+    def _add_to_tail(self, vectors: np.ndarray) -> np.ndarray:
+        """Append vectors to the tail (amortized O(1)); returns their source references."""
+        count = self.tail_rows + len(vectors)
+        if count > len(self.tail):
+            tail = np.empty((max(count, 2 * len(self.tail), 1024), self.base.shape[1]), dtype=np.float32)
+            tail[:self.tail_rows] = self.tail[:self.tail_rows]
+            self.tail = tail
+        self.tail[self.tail_rows:count] = vectors
+        references = -np.arange(self.tail_rows, count, dtype=np.int64) - 1
+        self.tail_rows = count
+        return references
+
+    def append(self, vectors: np.ndarray):
+        self.source = np.concatenate([self.source, self._add_to_tail(vectors)])
+
+    def replace(self, rows: List[int], vectors: np.ndarray):
+        # Base rows are never written: the new vector goes to the tail and the row points at it
+        self.source[rows] = self._add_to_tail(vectors)
+
+    def keep(self, mask: np.ndarray):
+        self.source = self.source[mask]
+
+    def snapshot(self) -> '_OverlayRows':
+        """A copy that later writes and deletes do not affect (base and tail rows are never overwritten)."""
+        rows = _OverlayRows.__new__(_OverlayRows)
+        rows.base, rows.tail, rows.tail_rows = self.base, self.tail, self.tail_rows
+        rows.source = self.source.copy()
+        return rows
+
+
+class EmbeddedVectorStore(VectorStore):
+    """
+    In-process VectorStore: a flat cosine index over a NumPy matrix with exact-match payload filtering.
+    Each collection is persisted under <path>/<collection_name>/ as vectors.npy plus points.json.
+    Writes are appended to a log (log.f32 for vectors, log.jsonl for ids, payloads, payload updates and deletes) that is
+    replayed on load and folded into the base files once it outgrows a fraction of the collection.
+    Only one process may open a collection: the directory is locked for the lifetime of the store,
+    and a second process gets a RuntimeError instead of overwriting the first one's writes.
+
+    With quantization ('int8' or 'binary') only compact codes are held in RAM: the first pass scores
+    codes for limit * oversampling candidates, which are then rescored against the float vectors,
+    memory-mapped from vectors.npy (rows written since the last compaction stay in RAM, see _OverlayRows).
+    """
+
+    # The log is compacted once it holds more than max(COMPACT_MIN_ROWS, COMPACT_RATIO * points) entries
+    COMPACT_MIN_ROWS = 4096
+    COMPACT_RATIO = 0.25
+    # Rows per block when quantizing or compacting, so neither holds a second full float matrix in RAM
+    BLOCK_ROWS = 65536
+
+    def __init__(self, path: str, collection_name: str, vector_size: int = 384,
+                 quantization: str = None, oversampling: float = 2.0, rescore: bool = True):
+        self.collection_name = collection_name
+        self.vector_size = vector_size
+        self.quantization = quantization
+        self.oversampling = oversampling
+        self.rescore = rescore
+        self._codes = None
+        self._scales = None
+        self.directory = os.path.join(path, collection_name)
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._payloads: List[Dict] = []
+        self._rows: Dict[str, int] = {}
+        self._vectors = np.zeros((0, vector_size), dtype=np.float32)
+        # In-RAM array with spare rows that _vectors is a view of, so appends are amortized O(1)
+        self._buffer: Optional[np.ndarray] = None
+        self._columns: Dict[str, np.ndarray] = {}
+        # field -> value -> ids, for fields registered with create_payload_index
+        self._payload_indexes: Dict[str, Dict[object, set]] = {}
+        self._log_rows = 0  # vector rows in log.f32
+        self._log_size = 0  # upserted rows plus deleted ids since the last compaction
+        self._log_vectors_file = None
+        self._log_ops_file = None
+        self._lock_file = _lock_directory(self.directory)
+        self._load()
+
+    def _vectors_path(self) -> str:
+        return os.path.join(self.directory, 'vectors.npy')
+
+    def _points_path(self) -> str:
+        return os.path.join(self.directory, 'points.json')
+
+    def _log_vectors_path(self) -> str:
+        return os.path.join(self.directory, 'log.f32')
+
+    def _log_ops_path(self) -> str:
+        return os.path.join(self.directory, 'log.jsonl')
+
+    def _load(self):
+        if os.path.exists(self._points_path()):
+            with open(self._points_path(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._ids = data.get('ids', [])
+            self._payloads = data.get('payloads', [])
+            if self.quantization:
+                self._vectors = _OverlayRows(np.load(self._vectors_path(), mmap_mode='r'))
+            else:
+                self._vectors = np.load(self._vectors_path()).astype(np.float32, copy=False)
+            self._rows = {point_id: row for row, point_id in enumerate(self._ids)}
+        elif self.quantization:
+            self._vectors = _OverlayRows(self._vectors)
+        self._update_codes()
+        replayed, clean = self._replay_log()
+        if not clean:
+            logger.warning(f"[EmbeddedVectorStore] Dropping an incomplete write at the end of the log in {self.directory}")
+            self._persist()
+        if self._ids:
+            logger.info(f"[EmbeddedVectorStore] Loaded {len(self._ids)} points from {self.directory} ({replayed} logged writes replayed)")
+
+    def _replay_log(self) -> Tuple[int, bool]:
+        """Apply the logged writes on top of the base files; returns (writes applied, whether the log ended cleanly)."""
+        vectors = np.zeros(0, dtype=np.float32)
+        if os.path.exists(self._log_vectors_path()):
+            vectors = np.fromfile(self._log_vectors_path(), dtype=np.float32)
+        clean = len(vectors) % self.vector_size == 0
+        total_rows = len(vectors) // self.vector_size
+        vectors = vectors[:total_rows * self.vector_size].reshape(total_rows, self.vector_size)
+        applied = 0
+        if os.path.exists(self._log_ops_path()):
+            with open(self._log_ops_path(), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        op = json.loads(line) if line.endswith('\n') else None
+                    except ValueError:
+                        op = None
+                    if op is None or (op["op"] == "upsert" and self._log_rows + len(op["ids"]) > total_rows):
+                        clean = False
+                        break
+                    if op["op"] == "upsert":
+                        count = len(op["ids"])
+                        self._apply_upsert(op["ids"], op["payloads"], vectors[self._log_rows:self._log_rows + count])
+                        self._log_rows += count
+                        self._log_size += count
+                    elif op["op"] == "set_payload":
+                        self._apply_set_payload(op["ids"], op["payload"])
+                        self._log_size += len(op["ids"])
+                    else:
+                        self._apply_delete(op["ids"])
+                        self._log_size += len(op["ids"])
+                    applied += 1
+        # Vectors written without their log entry belong to an interrupted write
+        return applied, clean and self._log_rows == total_rows
+
+    def _persist(self):
+        """Compact: write the whole collection to the base files atomically (temp files, then rename) and clear the log."""
+        os.makedirs(self.directory, exist_ok=True)
+        vectors_tmp = self._vectors_path() + '.tmp'
+        points_tmp = self._points_path() + '.tmp'
+        # Written block by block: with quantization most rows are read from the memory map being replaced
+        out = np.lib.format.open_memmap(vectors_tmp, mode='w+', dtype=np.float32, shape=(len(self._ids), self.vector_size))
+        for start in range(0, len(self._ids), self.BLOCK_ROWS):
+            out[start:start + self.BLOCK_ROWS] = self._vectors[start:start + self.BLOCK_ROWS]
+        out.flush()
+        del out
+        with open(points_tmp, 'w', encoding='utf-8') as f:
+            json.dump({'ids': self._ids, 'payloads': self._payloads}, f)
+        os.replace(vectors_tmp, self._vectors_path())
+        os.replace(points_tmp, self._points_path())
+        # A crash before the log is removed is harmless: replaying it over the new base files gives the same points
+        self._close_log()
+        for log_path in (self._log_vectors_path(), self._log_ops_path()):
+            if os.path.exists(log_path):
+                os.remove(log_path)
+        self._log_rows = 0
+        self._log_size = 0
+        if self.quantization:
+            # Drop the in-RAM tail; rescoring reads the persisted file through a memory map
+            self._vectors = _OverlayRows(np.load(self._vectors_path(), mmap_mode='r'))
+
+    def _append_log(self, op: Dict, vectors: np.ndarray = None):
+        """Append one write to the log: its vectors first, then the entry that makes them count."""
+        if self._log_ops_file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._log_vectors_file = open(self._log_vectors_path(), 'ab')
+            self._log_ops_file = open(self._log_ops_path(), 'a', encoding='utf-8')
+        if vectors is not None and len(vectors):
+            self._log_vectors_file.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            self._log_vectors_file.flush()
+            self._log_rows += len(vectors)
+        self._log_ops_file.write(json.dumps(op) + '\n')
+        self._log_ops_file.flush()
+        self._log_size += len(op["ids"])
+
+    def _maybe_compact(self):
+        if self._log_size > max(self.COMPACT_MIN_ROWS, int(len(self._ids) * self.COMPACT_RATIO)):
+            logger.info(f"[EmbeddedVectorStore] Compacting {self._log_size} logged writes into {self.directory}")
+            self._persist()
+
+    def _close_log(self):
+        for log_file in (self._log_vectors_file, self._log_ops_file):
+            if log_file is not None:
+                log_file.close()
+        self._log_vectors_file = None
+        self._log_ops_file = None
+
+    def _quantize(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Quantized codes for vectors: int8 with a per-vector scale, or packed sign bits."""
+        if self.quantization == 'int8':
+            scales = np.abs(vectors).max(axis=1) if len(vectors) else np.zeros(0, dtype=np.float32)
+            scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+            return np.round(vectors / scales[:, None] * 127).astype(np.int8), scales / 127
+        return np.packbits(vectors > 0, axis=1), None
+
+    def _update_codes(self, start: int = None, changed: List[int] = ()):
+        """Recompute quantized codes: for all rows, or for the changed rows plus the rows appended from `start` on."""
+        if not self.quantization:
+            return
+        if start is None or self._codes is None:
+            blocks = [self._quantize(self._vectors[i:i + self.BLOCK_ROWS])
+                      for i in range(0, max(len(self._vectors), 1), self.BLOCK_ROWS)]
+            self._codes = np.concatenate([codes for codes, _ in blocks])
+            self._scales = np.concatenate([scales for _, scales in blocks]) if self.quantization == 'int8' else None
+            return
+        if changed:
+            codes, scales = self._quantize(self._vectors[changed])
+            self._codes[changed] = codes
+            if scales is not None:
+                self._scales[changed] = scales
+        if start < len(self._vectors):
+            codes, scales = self._quantize(self._vectors[start:])
+            self._codes = np.concatenate([self._codes[:start], codes])
+            if scales is not None:
+                self._scales = np.concatenate([self._scales[:start], scales])
+
+    def _approximate_scores(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """First-pass scores from the quantized codes (higher is more similar)."""
+        if self.quantization == 'int8':
+            return (self._codes[rows].astype(np.float32) @ query) * self._scales[rows]
+        query_bits = np.packbits(query > 0)
+        distances = _POPCOUNT[np.bitwise_xor(self._codes[rows], query_bits)].sum(axis=1)
+        return -distances.astype(np.float32)
+
+    def _reserve(self, extra: int):
+        """Make _vectors (unquantized) a writable in-RAM view with room for `extra` more rows."""
+        count = len(self._vectors)
+        if self._buffer is None or count + extra > len(self._buffer):
+            buffer = np.empty((max(count + extra, 2 * count, 1024), self.vector_size), dtype=np.float32)
+            buffer[:count] = self._vectors
+            self._buffer = buffer
+            self._vectors = buffer[:count]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _column(self, key: str) -> np.ndarray:
+        """Payload values for one key across all rows, cached until the next mutation."""
+        column = self._columns.get(key)
+        if column is None:
+            column = np.empty(len(self._payloads), dtype=object)
+            column[:] = [_payload_value(payload, key) for payload in self._payloads]
+            self._columns[key] = column
+        return column
+
+    def create_payload_index(self, field: str):
+        with self._lock:
+            if field in self._payload_indexes:
+                return
+            index = self._payload_indexes[field] = {}
+            for point_id, payload in zip(self._ids, self._payloads):
+                value = _payload_value(payload, field)
+                if isinstance(value, (str, int, float, bool)):
+                    index.setdefault(value, set()).add(point_id)
+
+    def _index_update(self, point_id: str, payload: Dict, add: bool):
+        for field, index in self._payload_indexes.items():
+            value = _payload_value(payload, field)
+            if not isinstance(value, (str, int, float, bool)):
+                continue
+            if add:
+                index.setdefault(value, set()).add(point_id)
+            elif value in index:
+                index[value].discard(point_id)
+                if not index[value]:
+                    del index[value]
+
+    def _matches(self, key: str, value) -> np.ndarray:
+        """Boolean mask over all rows of points whose payload key equals value (None: the key is missing)."""
+        if value is None and key in self._payload_indexes:
+            # Every scalar value of an indexed field is in its index, so the rest of the rows lack the key
+            mask = np.ones(len(self._ids), dtype=bool)
+            for ids in self._payload_indexes[key].values():
+                mask[[self._rows[point_id] for point_id in ids]] = False
+            return mask
+        column = self._column(key)
+        if value is None:
+            return np.fromiter((item is None for item in column), dtype=bool, count=len(column))
+        return column == value
+
+    def _filter_rows(self, filters: Optional[Dict]) -> Optional[np.ndarray]:
+        """Sorted row numbers matching filters (None means all rows); indexed fields are resolved by key lookup."""
+        if not filters:
+            return None
+        indexed = [key for key, value in filters.items() if key in self._payload_indexes and value is not None]
+        if indexed:
+            ids = None
+            for key in indexed:
+                matches = self._payload_indexes[key].get(filters[key], set())
+                ids = matches if ids is None else ids & matches
+            rows = np.array(sorted(self._rows[point_id] for point_id in ids), dtype=np.int64)
+            for key, value in filters.items():
+                if key not in indexed and rows.size:
+                    rows = rows[self._matches(key, value)[rows]]
+            return rows
+        mask = np.ones(len(self._ids), dtype=bool)
+        for key, value in filters.items():
+            mask &= self._matches(key, value)
+        return np.flatnonzero(mask)
+
+    def _point(self, row: int, with_vectors: bool, score: float = None) -> Dict:
+        result = {"id": self._ids[row], "payload": self._payloads[row], "score": score}
+        if with_vectors:
+            result["vector"] = self._vectors[row].tolist()
+        return result
+
+    def _apply_upsert(self, ids: List[str], payloads: List[Dict], vectors: np.ndarray):
+        """Insert or replace points in memory; ids are unique and vectors already normalized."""
+        changed = []
+        new_rows = []
+        for point_id, payload, vector in zip(ids, payloads, vectors):
+            row = self._rows.get(point_id)
+            if row is None:
+                self._rows[point_id] = len(self._ids)
+                self._ids.append(point_id)
+                self._payloads.append(payload)
+                new_rows.append(vector)
+            else:
+                self._index_update(point_id, self._payloads[row], add=False)
+                self._payloads[row] = payload
+                changed.append((row, vector))
+            self._index_update(point_id, payload, add=True)
+        start = len(self._vectors)
+        if self.quantization:
+            if changed:
+                self._vectors.replace([row for row, _ in changed], np.asarray([vector for _, vector in changed]))
+            if new_rows:
+                self._vectors.append(np.asarray(new_rows))
+        else:
+            self._reserve(len(new_rows))
+            for row, vector in changed:
+                self._vectors[row] = vector
+            if new_rows:
+                self._buffer[start:start + len(new_rows)] = new_rows
+                self._vectors = self._buffer[:start + len(new_rows)]
+        self._update_codes(start, [row for row, _ in changed])
+        self._columns.clear()
+
+    def _write_points(self, points: List[Dict]):
+        """Log and apply one batch of points; the last write of a repeated id wins."""
+        latest = {point["id"]: point for point in points}
+        ids = list(latest)
+        payloads = [latest[point_id]["payload"] for point_id in ids]
+        vectors = self._normalize(np.asarray([latest[point_id]["vector"] for point_id in ids], dtype=np.float32))
+        self._append_log({"op": "upsert", "ids": ids, "payloads": payloads}, vectors)
+        self._apply_upsert(ids, payloads, vectors)
+
+    def upsert(self, points: List[Dict]):
+        if not points:
+            return
+        with self._lock:
+            self._write_points(points)
+            self._maybe_compact()
+
+    def search(self, vector, limit: int = 5, filters: Dict = None, with_vectors: bool = False) -> List[Dict]:
+        query = self._normalize(np.asarray(vector, dtype=np.float32))
+        with self._lock:
+            if not self._ids:
+                return []
+            rows = self._filter_rows(filters)
+            if rows is None:
+                rows = np.arange(len(self._ids))
+            if rows.size == 0:
+                return []
+            if self.quantization:
+                scores = self._approximate_scores(rows, query)
+                candidates = min(rows.size, max(limit, int(limit * self.oversampling)))
+                top = np.argpartition(-scores, candidates - 1)[:candidates]
+                rows = rows[np.sort(top)]
+                scores = self._vectors[rows] @ query if self.rescore else scores[np.sort(top)]
+            else:
+                scores = self._vectors[rows] @ query
+            k = min(limit, rows.size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [self._point(int(rows[i]), with_vectors, float(scores[i])) for i in top]
+
+    def retrieve(self, ids: List[str], with_vectors: bool = False, with_payload: bool = True) -> List[Dict]:
+        with self._lock:
+            return [self._point(self._rows[point_id], with_vectors) for point_id in ids if point_id in self._rows]
+
+    def scroll(self, filters: Dict = None, limit: int = None, with_vectors: bool = False) -> List[Dict]:
+        with self._lock:
+            rows = self._filter_rows(filters)
+            if rows is None:
+                rows = range(len(self._ids))
+            results = []
+            for row in rows:
+                results.append(self._point(int(row), with_vectors))
+                if limit and len(results) >= limit:
+                    break
+            return results
+
+    def iter_points(self, batch_size: int = 1024, with_vectors: bool = True) -> Iterator[List[Dict]]:
+        with self._lock:
+            ids, payloads = list(self._ids), list(self._payloads)
+            vectors = self._vectors.snapshot() if self.quantization else self._vectors
+        for start in range(0, len(ids), batch_size):
+            block = np.asarray(vectors[start:start + batch_size]) if with_vectors else None
+            batch = []
+            for offset, (point_id, payload) in enumerate(zip(ids[start:start + batch_size], payloads[start:start + batch_size])):
+                point = {"id": point_id, "payload": payload}
+                if with_vectors:
+                    point["vector"] = block[offset]
+                batch.append(point)
+            yield batch
+
+    def bulk_upsert(self, batches: Iterable[List[Dict]]) -> int:
+        """Log every batch, then compact at most once at the end instead of after each batch."""
+        count = 0
+        with self._lock:
+            for batch in batches:
+                if batch:
+                    self._write_points(batch)
+                    count += len(batch)
+            self._maybe_compact()
+        return count
+
+    def _apply_delete(self, ids: Iterable[str]):
+        rows = sorted({self._rows[point_id] for point_id in ids if point_id in self._rows})
+        if not rows:
+            return
+        for row in rows:
+            self._index_update(self._ids[row], self._payloads[row], add=False)
+        keep = np.ones(len(self._ids), dtype=bool)
+        keep[rows] = False
+        if self.quantization:
+            self._vectors.keep(keep)
+            self._codes = self._codes[keep]
+            if self._scales is not None:
+                self._scales = self._scales[keep]
+        else:
+            self._vectors = self._vectors[keep]
+            self._buffer = None
+        self._ids = [point_id for point_id, kept in zip(self._ids, keep) if kept]
+        self._payloads = [payload for payload, kept in zip(self._payloads, keep) if kept]
+        self._rows = {point_id: row for row, point_id in enumerate(self._ids)}
+        self._columns.clear()
+
+    def _apply_set_payload(self, ids: Iterable[str], payload: Dict):
+        for point_id in ids:
+            row = self._rows.get(point_id)
+            if row is None:
+                continue
+            self._index_update(point_id, self._payloads[row], add=False)
+            self._payloads[row] = {**self._payloads[row], **payload}
+            self._index_update(point_id, self._payloads[row], add=True)
+        self._columns.clear()
+
+    def set_payload(self, ids: List[str], payload: Dict):
+        """Logged like any write, but with no vector rows."""
+        with self._lock:
+            ids = [point_id for point_id in dict.fromkeys(ids) if point_id in self._rows]
+            if not ids:
+                return
+            self._append_log({"op": "set_payload", "ids": ids, "payload": payload})
+            self._apply_set_payload(ids, payload)
+            self._maybe_compact()
+
+    def delete(self, ids: Iterable[str]):
+        with self._lock:
+            ids = [point_id for point_id in dict.fromkeys(ids) if point_id in self._rows]
+            if not ids:
+                return
+            self._append_log({"op": "delete", "ids": ids})
+            self._apply_delete(ids)
+            self._maybe_compact()
+
+    def close(self):
+        """Close the log and release the directory lock so another process (or store instance) can open the collection."""
+        with self._lock:
+            self._close_log()
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
@@ -7,7 +7,7 @@ from swarm import Swarm
 from src.core.agent_registry import AGENTS
 from src.core.config import Config
 from src.core.database import Database
-from src.core.knowledge_base import KnowledgeBase
+from src.core.knowledge_registry import get_knowledge_base
 from src.services.azure_client import AzureOpenAIClient
 from rich.console import Console
 from rich.panel import Panel
@@ -154,7 +154,9 @@ def main():
         api_version=config.get('azure_openai.api_version'),
         deployment_name=config.get('azure_openai.deployment_name')
     )
-    knowledge_base = KnowledgeBase(qdrant_url='http://localhost:6333', collection_name='research_knowledge')
+    knowledge_base = get_knowledge_base()
+    # One-off data migration; a no-op lookup once the collection has been migrated
+    knowledge_base.migrate_legacy_research()
     # You must provide actual agent instances for runner/coder, etc. Here we use AGENTS registry as a placeholder
     agents = AGENTS  # Should be a dict like {'runner': ..., 'coder': ...}
     interaction_agent = InteractionAgent(agents, knowledge_base, azure_client)
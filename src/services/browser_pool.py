@@ -0,0 +1,258 @@
+import asyncio
+import atexit
+import threading
+import time
+import logging
+from concurrent.futures import CancelledError
+from typing import Awaitable, Callable, Dict, Optional
+from src.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class _Slot:
+    """One reusable browser context with a single open page."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.context = None
+        self.page = None
+        self.uses = 0
+        self.browser_generation = -1
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium shared by all scrapes.
+    Playwright runs on its own event loop thread, so callers on any thread use the blocking
+    run()/get_content() facade. The pool holds `size` contexts with one page each: checkout hands
+    out a free page, return puts it back, and a context is recycled after max_pages_per_context
+    pages or as soon as it looks unhealthy. If the browser crashes it is relaunched on the next checkout.
+    """
+
+    def __init__(self, size: int = None, max_pages_per_context: int = None, headless: bool = None,
+                 checkout_timeout: float = None, launch_args: list = None):
+        config = Config()
+        self.size = size or config.get('web_search.browser_pool.size', 4)
+        self.max_pages_per_context = max_pages_per_context or config.get('web_search.browser_pool.max_pages_per_context', 50)
+        self.headless = config.get('web_search.browser_pool.headless', True) if headless is None else headless
+        self.checkout_timeout = checkout_timeout or config.get('web_search.browser_pool.checkout_timeout', 30)
+        self.launch_args = launch_args if launch_args is not None else config.get('web_search.browser_pool.launch_args', [])
+        self.stats = {"pages": 0, "browser_launches": 0, "context_recycles": 0, "crashes": 0, "blocked_requests": 0}
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._playwright = None
+        self._browser = None
+        self._browser_generation = 0
+        self._browser_lock = None
+        self._free = None
+
+    # Event loop thread
+
+    def _ensure_started(self):
+        if self._loop is not None:
+            return
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name="browser-pool", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            asyncio.run_coroutine_threadsafe(self._init_slots(), loop).result()
+
+    async def _init_slots(self):
+        self._browser_lock = asyncio.Lock()
+        self._free = asyncio.Queue()
+        for index in range(self.size):
+            self._free.put_nowait(_Slot(index))
+
+    # Browser and context lifecycle (loop thread only)
+
+    async def _ensure_browser(self):
+        async with self._browser_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+            if self._browser is not None:
+                self.stats["crashes"] += 1
+                logger.warning("[BrowserPool] Browser disconnected, relaunching")
+            if self._playwright is None:
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless, args=self.launch_args)
+            self._browser_generation += 1
+            self.stats["browser_launches"] += 1
+            logger.info(f"[BrowserPool] Launched Chromium (generation {self._browser_generation})")
+            return self._browser
+
+    async def _close_slot(self, slot: _Slot):
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass  # Already gone with a crashed browser
+        slot.context = None
+        slot.page = None
+        slot.uses = 0
+
+    def _healthy(self, slot: _Slot) -> bool:
+        return (
+            slot.page is not None
+            and not slot.page.is_closed()
+            and slot.browser_generation == self._browser_generation
+            and self._browser is not None
+            and self._browser.is_connected()
+            and slot.uses < self.max_pages_per_context
+        )
+
+    async def checkout(self) -> _Slot:
+        """Take a free slot, (re)creating its context if it is new, unhealthy or used up."""
+        slot = await asyncio.wait_for(self._free.get(), timeout=self.checkout_timeout)
+        try:
+            browser = await self._ensure_browser()
+            if not self._healthy(slot):
+                if slot.context is not None:
+                    self.stats["context_recycles"] += 1
+                await self._close_slot(slot)
+                slot.context = await browser.new_context()
+                slot.page = await slot.context.new_page()
+                slot.browser_generation = self._browser_generation
+            slot.uses += 1
+            return slot
+        except BaseException:
+            await self._close_slot(slot)
+            self._free.put_nowait(slot)
+            raise
+
+    async def checkin(self, slot: _Slot, broken: bool = False):
+        """Return a slot to the pool; a broken one is closed and rebuilt on its next checkout."""
+        if broken:
+            await self._close_slot(slot)
+        else:
+            try:
+                # Drop request routes installed by the previous user
+                await slot.page.unroute_all()
+            except Exception:
+                await self._close_slot(slot)
+        self._free.put_nowait(slot)
+
+    async def _run(self, func: Callable[[object], Awaitable], timeout: float):
+        slot = await self.checkout()
+        broken = False
+        try:
+            self.stats["pages"] += 1
+            return await asyncio.wait_for(func(slot.page), timeout=timeout)
+        except BaseException:
+            # A timed-out or failed page may be stuck mid-navigation or belong to a dead browser
+            broken = True
+            raise
+        finally:
+            await self.checkin(slot, broken)
+
+    # Blocking facade for callers on other threads
+
+    def run(self, func: Callable[[object], Awaitable], timeout: float = 60, cancel: threading.Event = None):
+        """
+        Run `await func(page)` with a pooled page and return its result (blocking). Once `cancel` is set
+        the pooled coroutine is cancelled, its page recycled and its slot freed, and CancelledError is raised.
+        """
+        self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(self._run(func, timeout), self._loop)
+        deadline = time.monotonic() + timeout + self.checkout_timeout + 5
+        if cancel is not None:
+            while not future.done() and time.monotonic() < deadline:
+                if cancel.wait(0.05):
+                    future.cancel()
+                    raise CancelledError("browser page load cancelled")
+        return future.result(max(0.0, deadline - time.monotonic()))
+
+    def get_content(self, url: str, profile=None, timeout: float = 12, wait_until: str = 'networkidle',
+                    cancel: threading.Event = None) -> str:
+        """
+        Navigate a pooled page to url and return the rendered HTML. A ScrapeProfile, if given,
+        decides which requests are aborted, the wait condition and the timeout. If the wait
+        condition is not met in time, whatever has rendered by then is returned. Setting
+        `cancel` abandons the load (see run).
+        """
+        if profile is not None:
+            timeout, wait_until = profile.timeout, profile.wait_until
+
+        async def block(route):
+            if profile.blocks(route.request.resource_type, route.request.url):
+                self.stats["blocked_requests"] += 1
+                await route.abort()
+            else:
+                await route.continue_()
+
+        async def fetch(page):
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            if profile is not None and (profile.block_resources or profile.block_domains):
+                await page.route("**/*", block)
+            page.set_default_timeout(timeout * 1000)
+            await page.goto(url, wait_until='domcontentloaded')
+            remaining = max(0.1, deadline - loop.time()) * 1000
+            try:
+                if wait_until == 'selector':
+                    await page.wait_for_selector(profile.selector, timeout=remaining)
+                elif wait_until != 'domcontentloaded':
+                    await page.wait_for_load_state(wait_until, timeout=remaining)
+            except Exception as e:
+                logger.info(f"[BrowserPool] {wait_until} not reached for {url} ({e.__class__.__name__}), using the page as rendered")
+            return await page.content()
+        return self.run(fetch, timeout=timeout + 5, cancel=cancel)
+
+    def health(self) -> Dict:
+        return dict(
+            self.stats,
+            started=self._loop is not None,
+            browser_connected=bool(self._browser and self._browser.is_connected()),
+            free_slots=self._free.qsize() if self._free is not None else self.size
+        )
+
+    async def _shutdown(self):
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._browser = None
+        self._playwright = None
+
+    def close(self):
+        """Close the browser and stop the event loop thread."""
+        if self._loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(10)
+        except Exception as e:
+            logger.warning(f"[BrowserPool] Error while closing browser: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+
+_lock = threading.Lock()
+_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Process-wide browser pool; Chromium starts on the first scrape and closes at exit."""
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = BrowserPool()
+                atexit.register(_pool.close)
+    return _pool
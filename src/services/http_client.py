@@ -0,0 +1,124 @@
+import threading
+import logging
+from typing import Dict
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClient:
+    """
+    Shared HTTP client for all web I/O: one requests.Session whose adapters keep a keep-alive
+    connection pool per host, so repeat requests to a search provider or site skip the TCP/TLS
+    handshake. Sessions and urllib3 pools are safe to share between threads. Requests get a
+    default timeout and accept compressed responses; connection-level failures are retried.
+    """
+
+    def __init__(self, pool_connections: int = None, pool_maxsize: int = None, timeout: float = None,
+                 max_retries: int = None, user_agent: str = None):
+        config = Config()
+        self.pool_connections = pool_connections or config.get('web_search.http.pool_connections', 32)
+        self.pool_maxsize = pool_maxsize or config.get('web_search.http.pool_maxsize', 32)
+        self.timeout = timeout or config.get('web_search.http.timeout', 30)
+        max_retries = max_retries if max_retries is not None else config.get('web_search.http.max_retries', 2)
+        self.session = requests.Session()
+        # Retry only failures where the request never reached the server, plus idempotent 502/503/504s
+        retry = Retry(total=max_retries, connect=max_retries, read=0, status=max_retries,
+                      status_forcelist=(502, 503, 504), allowed_methods=frozenset({'GET', 'HEAD'}),
+                      backoff_factor=0.3, raise_on_status=False)
+        self._adapters = []
+        for prefix in ('http://', 'https://'):
+            adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize, max_retries=retry)
+            self.session.mount(prefix, adapter)
+            self._adapters.append(adapter)
+        self.session.headers['Accept-Encoding'] = _accept_encoding()
+        if user_agent:
+            self.session.headers['User-Agent'] = user_agent
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        with self._lock:
+            self._requests += 1
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self._errors += 1
+            raise
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def stats(self) -> Dict:
+        """
+        Request and connection counters. Per-host numbers come from the live urllib3 pools:
+        connections_opened counts new TCP connections, so reused = pool requests - connections opened.
+        Hosts whose pool was evicted (beyond pool_connections) drop out of the per-host figures.
+        """
+        hosts = {}
+        for adapter in self._adapters:
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = f"{pool.scheme}://{pool.host}:{pool.port}"
+                hosts[host] = {
+                    "requests": pool.num_requests,
+                    "connections_opened": pool.num_connections,
+                    "reused": max(0, pool.num_requests - pool.num_connections)
+                }
+        with self._lock:
+            requests_made, errors = self._requests, self._errors
+        pool_requests = sum(host["requests"] for host in hosts.values())
+        opened = sum(host["connections_opened"] for host in hosts.values())
+        return {
+            "requests": requests_made,
+            "errors": errors,
+            "connections_opened": opened,
+            "reused": max(0, pool_requests - opened),
+            "reuse_ratio": round((pool_requests - opened) / pool_requests, 3) if pool_requests else 0.0,
+            "hosts": hosts
+        }
+
+    def close(self):
+        self.session.close()
+
+
+def _accept_encoding() -> str:
+    """gzip/deflate always; brotli and zstd when urllib3 can decode them."""
+    encodings = ['gzip', 'deflate']
+    try:
+        import brotli  # noqa: F401
+        encodings.append('br')
+    except ImportError:
+        pass
+    try:
+        import zstandard  # noqa: F401
+        encodings.append('zstd')
+    except ImportError:
+        pass
+    return ', '.join(encodings)
+
+
+_lock = threading.Lock()
+_client = None
+
+
+def get_http_client() -> HttpClient:
+    """Process-wide pooled HTTP client."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
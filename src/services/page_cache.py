@@ -0,0 +1,153 @@
+import os
+import time
+import zlib
+import sqlite3
+import threading
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from src.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class PageCache:
+    """
+    URL-keyed cache of extracted page text, zlib-compressed in SQLite together with the response
+    metadata needed to revalidate it (ETag, Last-Modified, content type). Entries are fresh for a
+    per-domain TTL; stale entries are kept so callers can revalidate them with a conditional request.
+    Total compressed size is capped, evicting the least recently used pages first.
+    """
+
+    def __init__(self, db_path: str = None, ttl_seconds: int = None, domain_ttls: Dict[str, int] = None,
+                 max_bytes: int = None):
+        config = Config()
+        self.db_path = db_path or config.get('web_search.page_cache.path', 'data/page_cache.db')
+        self.ttl_seconds = ttl_seconds or config.get('web_search.page_cache.ttl_seconds', 86400)
+        self.domain_ttls = domain_ttls if domain_ttls is not None else (config.get('web_search.page_cache.domain_ttls', {}) or {})
+        self.max_bytes = max_bytes or config.get('web_search.page_cache.max_bytes', 256 * 1024 * 1024)
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "evictions": 0}
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                domain TEXT NOT NULL,
+                text BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                status INTEGER,
+                tier TEXT,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_pages_last_used ON pages (last_used)')
+        self._conn.commit()
+
+    def ttl_for(self, url: str) -> int:
+        """TTL for url: the most specific domain_ttls entry matching its host (subdomains included), else ttl_seconds."""
+        host = (urlparse(url).hostname or '').lower()
+        for domain in sorted(self.domain_ttls, key=len, reverse=True):
+            if host == domain or host.endswith('.' + domain):
+                return self.domain_ttls[domain]
+        return self.ttl_seconds
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Cached entry for url (with 'text' and a 'fresh' flag), or None. Stale entries are returned for revalidation."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT text, etag, last_modified, content_type, status, tier, fetched_at, expires_at FROM pages WHERE url = ?',
+                (url,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            now = time.time()
+            self._conn.execute('UPDATE pages SET last_used = ? WHERE url = ?', (now, url))
+            self._conn.commit()
+        text, etag, last_modified, content_type, status, tier, fetched_at, expires_at = row
+        fresh = now < expires_at
+        if fresh:
+            self.stats["hits"] += 1
+        return {
+            "text": zlib.decompress(text).decode('utf-8'),
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": content_type,
+            "status": status,
+            "tier": tier,
+            "fetched_at": fetched_at,
+            "fresh": fresh
+        }
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict:
+        """If-None-Match / If-Modified-Since headers to revalidate a cached entry."""
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, text: str, headers: Dict = None, status: int = None, tier: str = None):
+        """Cache extracted text for url with the validators from the response headers."""
+        if not text:
+            return
+        headers = headers or {}
+        blob = zlib.compress(text.encode('utf-8'), 6)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages (url, domain, text, size, etag, last_modified, content_type, status, tier, '
+                'fetched_at, expires_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, (urlparse(url).hostname or '').lower(), blob, len(blob), headers.get('ETag'),
+                 headers.get('Last-Modified'), headers.get('Content-Type'), status, tier,
+                 now, now + self.ttl_for(url), now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, url: str):
+        """Mark a revalidated (304 Not Modified) entry fresh for another TTL."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('UPDATE pages SET expires_at = ?, last_used = ? WHERE url = ?', (now + self.ttl_for(url), now, url))
+            self._conn.commit()
+        self.stats["revalidated"] += 1
+
+    def _evict(self):
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        doomed = []
+        for url, size in self._conn.execute('SELECT url, size FROM pages ORDER BY last_used'):
+            doomed.append((url,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany('DELETE FROM pages WHERE url = ?', doomed)
+        self.stats["evictions"] += len(doomed)
+
+
+_lock = threading.Lock()
+_page_cache = None
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """Process-wide page cache, or None when web_search.page_cache.enabled is off."""
+    global _page_cache
+    if not Config().get('web_search.page_cache.enabled', True):
+        return None
+    if _page_cache is None:
+        with _lock:
+            if _page_cache is None:
+                _page_cache = PageCache()
+    return _page_cache
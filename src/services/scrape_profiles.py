@@ -0,0 +1,93 @@
+from typing import Dict, List
+from urllib.parse import urlparse
+from src.core.config import Config
+
+# Hosts of common ad, analytics and tracking scripts, blocked by profiles with block_trackers
+TRACKER_DOMAINS = [
+    'google-analytics.com', 'googletagmanager.com', 'googlesyndication.com', 'doubleclick.net',
+    'adservice.google.com', 'facebook.net', 'connect.facebook.net', 'scorecardresearch.com',
+    'hotjar.com', 'segment.io', 'segment.com', 'mixpanel.com', 'newrelic.com', 'nr-data.net',
+    'taboola.com', 'outbrain.com', 'criteo.com', 'amazon-adsystem.com', 'quantserve.com', 'chartbeat.com'
+]
+
+DEFAULT_PROFILES = {
+    # Block heavy assets and trackers; the text is there once the DOM is parsed
+    "default": {
+        "block_resources": ["image", "font", "media"],
+        "block_trackers": True,
+        "wait_until": "domcontentloaded",
+        "timeout": 12
+    },
+    # Client-rendered apps: give scripts time to fetch and render the content
+    "spa": {
+        "block_resources": ["image", "font", "media"],
+        "block_trackers": True,
+        "wait_until": "networkidle",
+        "timeout": 15
+    },
+    # The old behaviour: load everything and wait for the network to go quiet
+    "full": {
+        "block_resources": [],
+        "block_trackers": False,
+        "wait_until": "networkidle",
+        "timeout": 12
+    }
+}
+
+
+class ScrapeProfile:
+    """How the browser loads a page: which requests to abort, what to wait for, and for how long."""
+
+    WAIT_CONDITIONS = ('domcontentloaded', 'load', 'networkidle', 'selector')
+
+    def __init__(self, name: str, block_resources: List[str] = None, block_trackers: bool = True,
+                 block_domains: List[str] = None, wait_until: str = 'domcontentloaded',
+                 selector: str = None, timeout: float = 12):
+        if wait_until not in self.WAIT_CONDITIONS:
+            raise ValueError(f"Scrape profile '{name}': unknown wait condition '{wait_until}'")
+        if wait_until == 'selector' and not selector:
+            raise ValueError(f"Scrape profile '{name}': wait_until 'selector' needs a selector")
+        self.name = name
+        self.block_resources = set(block_resources or [])
+        self.block_domains = list(block_domains or []) + (TRACKER_DOMAINS if block_trackers else [])
+        self.wait_until = wait_until
+        self.selector = selector
+        self.timeout = timeout
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        """Whether a request of this resource type to url should be aborted."""
+        if resource_type in self.block_resources:
+            return True
+        return bool(self.block_domains) and _matches_domain(urlparse(url).hostname or '', self.block_domains)
+
+
+def _matches_domain(host: str, domains: List[str]) -> bool:
+    """Whether host is one of domains or a subdomain of one."""
+    host = host.lower()
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+def load_scrape_profiles() -> Dict[str, ScrapeProfile]:
+    """Built-in profiles, overridden or extended by web_search.scrape_profiles in config.yaml."""
+    configured = Config().get('web_search.scrape_profiles', {}) or {}
+    profiles = {}
+    for name in set(DEFAULT_PROFILES) | set(configured):
+        settings = dict(DEFAULT_PROFILES.get(name, DEFAULT_PROFILES['default']))
+        settings.update(configured.get(name) or {})
+        profiles[name] = ScrapeProfile(name, **settings)
+    return profiles
+
+
+def load_scrape_profile_overrides() -> Dict[str, str]:
+    """web_search.scrape_profile_overrides from config.yaml: domain -> profile name, domains lowercased."""
+    overrides = Config().get('web_search.scrape_profile_overrides', {}) or {}
+    return {domain.lower(): name for domain, name in overrides.items()}
+
+
+def profile_for_url(url: str, profiles: Dict[str, ScrapeProfile], overrides: Dict[str, str]) -> ScrapeProfile:
+    """The profile mapped to url's domain (most specific match wins) in overrides, else 'default'."""
+    host = (urlparse(url).hostname or '').lower()
+    for domain in sorted(overrides, key=len, reverse=True):
+        if _matches_domain(host, [domain]):
+            return profiles.get(overrides[domain], profiles['default'])
+    return profiles['default']
@@ -0,0 +1,87 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from src.core.config import Config
+
+config = Config()
+logger = logging.getLogger(__name__)
+
+
+def _scrape_one(service, url, cancel: threading.Event = None):
+    try:
+        return service.scrape_url(url, cancel=cancel) or ''
+    except Exception as e:
+        logger.warning(f"Scrape failed for {url}: {e}")
+        return ''
+
+
+def scrape_race(service, results, width=None, min_chars=None):
+    """
+    Scrape ranked results with up to `width` in flight at once, starting the next URL whenever one
+    fails, and keep the first page with at least min_chars characters. The rest are cancelled: scrapes
+    not started yet never run, and running ones abandon their browser page (freeing its pool slot)
+    or stop before reaching the browser. A static HTTP fetch already under way still finishes, bounded
+    by web_search.fetch.timeout. If no page clears the threshold, the longest non-empty one is used.
+    Returns (scraped_results, scraping_status, char_counts).
+    """
+    width = width or config.get('web_search.scrape_race.width', 3)
+    min_chars = min_chars if min_chars is not None else config.get('web_search.scrape_race.min_chars', 400)
+    candidates = [r for r in results if r.get('link', '')]
+    outcomes = {}  # url -> content ('' for failures)
+    winner = None
+    queue = iter(candidates)
+    cancel = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=width)
+    running = {}
+    try:
+        for r in islice(queue, width):
+            running[executor.submit(_scrape_one, service, r['link'], cancel)] = r
+        while running and winner is None:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                r = running.pop(future)
+                outcomes[r['link']] = future.result()
+                if winner is None and len(outcomes[r['link']]) >= min_chars:
+                    winner = r
+            if winner is None:
+                for r in islice(queue, len(done)):
+                    running[executor.submit(_scrape_one, service, r['link'], cancel)] = r
+    finally:
+        # Stop the losers still loading instead of letting them hold browser slots until they time out
+        cancel.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    cancelled = {r['link'] for r in running.values()}
+    if winner is None:
+        scraped = [r for r in candidates if outcomes.get(r['link'])]
+        winner = max(scraped, key=lambda r: len(outcomes[r['link']]), default=None)
+    scraped_results, scraping_status, char_counts = [], [], []
+    for r in candidates:
+        url = r['link']
+        if url not in outcomes:
+            scraping_status.append({'url': url, 'status': 'cancelled' if url in cancelled else 'skipped'})
+            continue
+        content = outcomes[url]
+        if r is winner:
+            scraped_results.append({'title': r.get('title', ''), 'url': url, 'content': content})
+        scraping_status.append({'url': url, 'status': 'success' if content else 'fail'})
+        char_counts.append({'url': url, 'chars': len(content)})
+    return scraped_results, scraping_status, char_counts
+
+
+def scrape_all(service, results, max_concurrency=None):
+    """Scrape every ranked result concurrently (at most max_concurrency at once), keeping ranked order."""
+    max_concurrency = max_concurrency or config.get('web_search.scrape_race.deep_scrape_concurrency', 4)
+    candidates = [r for r in results if r.get('link', '')]
+    scraped_results, scraping_status, char_counts = [], [], []
+    if not candidates:
+        return scraped_results, scraping_status, char_counts
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(candidates))) as executor:
+        contents = list(executor.map(lambda r: _scrape_one(service, r['link']), candidates))
+    for r, content in zip(candidates, contents):
+        url = r['link']
+        if content:
+            scraped_results.append({'title': r.get('title', ''), 'url': url, 'content': content})
+        scraping_status.append({'url': url, 'status': 'success' if content else 'fail'})
+        char_counts.append({'url': url, 'chars': len(content)})
+    return scraped_results, scraping_status, char_counts
@@ -0,0 +1,238 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+import logging
+from typing import List, Optional
+from src.core.config import Config
+from src.core.knowledge_registry import get_knowledge_base
+from src.core.query_sanitizer import sanitize_query
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticSearchCache:
+    """
+    Web search results cached as vectors in a dedicated collection (web_search.cache.collection),
+    so they never mix with research knowledge. Entries carry a created_at timestamp, expire after
+    ttl_seconds, and a background compaction job deletes expired points and trims the collection
+    to max_entries, oldest first, in batches.
+    """
+
+    KIND = 'search_results'
+
+    def __init__(self, collection_name: str = None, ttl_seconds: int = None, max_entries: int = None,
+                 compaction_interval: int = None, delete_batch_size: int = None, threshold: float = None):
+        config = Config()
+        # Minimum cosine similarity between the new query and a cached one for the hit to count
+        self.threshold = threshold if threshold is not None else config.get('web_search.cache.semantic_threshold', 0.92)
+        self.collection_name = collection_name or config.get('web_search.cache.collection', 'search_cache')
+        self.ttl_seconds = ttl_seconds or config.get('web_search.cache.ttl_seconds', 7 * 24 * 3600)
+        self.max_entries = max_entries or config.get('web_search.cache.max_entries', 5000)
+        self.compaction_interval = compaction_interval or config.get('web_search.cache.compaction_interval', 3600)
+        self.delete_batch_size = delete_batch_size or config.get('web_search.cache.delete_batch_size', 256)
+        self.kb = get_knowledge_base(collection_name=self.collection_name)
+        self._legacy_purged = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _is_fresh(self, payload: dict, now: float = None) -> bool:
+        return (now or time.time()) - payload.get('created_at', 0) <= self.ttl_seconds
+
+    def get(self, query: str, session_id: str = None) -> Optional[List]:
+        """Cached results for the nearest cached query, or None if it is stale or not similar enough."""
+        filters = {"kind": self.KIND}
+        if session_id:
+            filters["session_id"] = session_id
+        hits = self.kb.store.search(self.kb._encode_query(query), limit=1, filters=filters)
+        if not hits or hits[0]["score"] < self.threshold or not self._is_fresh(hits[0]["payload"]):
+            return None
+        return json.loads(hits[0]["payload"]["data"])
+
+    def put(self, query: str, results: List, session_id: str = None):
+        """Cache results for a query; caching the same query again replaces the entry and resets its age."""
+        session_id = session_id or "websearch"
+        point = {
+            "id": self.kb._content_id(self.KIND, session_id, query),
+            "vector": self.kb._encode_query(query).tolist(),
+            "payload": {
+                "query": query,
+                "session_id": session_id,
+                "kind": self.KIND,
+                "data": json.dumps(results),
+                "created_at": time.time()
+            }
+        }
+        self.kb.store.upsert([point])
+
+    def purge_legacy_entries(self) -> int:
+        """
+        Delete search results cached by older versions in the research collection, under session_id
+        'websearch' and without a kind. Returns the number deleted.
+        """
+        research = get_knowledge_base(collection_name=Config().get('qdrant.collection_name', 'research_knowledge'))
+        if research.collection_name == self.collection_name:
+            return 0
+        doomed = [
+            point["id"] for point in research.store.scroll(filters={"session_id": "websearch"})
+            if "kind" not in point["payload"]
+        ]
+        for i in range(0, len(doomed), self.delete_batch_size):
+            research.store.delete(doomed[i:i + self.delete_batch_size])
+        if doomed:
+            logger.info(f"[SearchCache] Removed {len(doomed)} legacy search result entries from '{research.collection_name}'")
+        return len(doomed)
+
+    def compact(self) -> int:
+        """
+        Delete expired entries, then the oldest ones beyond max_entries. The first run also purges
+        legacy entries from the research collection. Returns the number deleted.
+        """
+        deleted = 0
+        if not self._legacy_purged:
+            deleted += self.purge_legacy_entries()
+            self._legacy_purged = True
+        now = time.time()
+        entries = [
+            (point["payload"].get("created_at", 0), point["id"])
+            for point in self.kb.store.scroll(filters={"kind": self.KIND})
+        ]
+        expired = [point_id for created_at, point_id in entries if now - created_at > self.ttl_seconds]
+        live = sorted(entry for entry in entries if now - entry[0] <= self.ttl_seconds)
+        overflow = [point_id for _, point_id in live[:max(0, len(live) - self.max_entries)]]
+        doomed = expired + overflow
+        for i in range(0, len(doomed), self.delete_batch_size):
+            self.kb.store.delete(doomed[i:i + self.delete_batch_size])
+        if doomed:
+            logger.info(f"[SearchCache] Compaction removed {len(expired)} expired and {len(overflow)} overflow entries")
+        return deleted + len(doomed)
+
+    def _compaction_loop(self):
+        while not self._stop.wait(self.compaction_interval):
+            try:
+                self.compact()
+            except Exception as e:
+                logger.warning(f"[SearchCache] Compaction failed: {e}")
+
+    def start_compaction(self):
+        """Run compact() every compaction_interval seconds on a daemon thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._compaction_loop, name="search-cache-compaction", daemon=True)
+            self._thread.start()
+
+    def stop_compaction(self):
+        self._stop.set()
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: sanitized, lowercased, whitespace collapsed."""
+    return re.sub(r'\s+', ' ', sanitize_query(query).lower()).strip()
+
+
+class ExactSearchCache:
+    """SQLite cache of search results keyed by (session, normalized query), with a TTL."""
+
+    def __init__(self, db_path: str = None, ttl_seconds: int = None):
+        config = Config()
+        self.db_path = db_path or config.get('web_search.cache.exact_path', 'data/search_cache.db')
+        self.ttl_seconds = ttl_seconds or config.get('web_search.cache.ttl_seconds', 7 * 24 * 3600)
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS search_results (
+                session_id TEXT NOT NULL,
+                query_key TEXT NOT NULL,
+                results TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (query_key, session_id)
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_search_results_created ON search_results (created_at)')
+        self._conn.commit()
+
+    def get(self, query: str, session_id: str = None) -> Optional[List]:
+        key = normalize_query(query)
+        if not key:
+            return None
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            if session_id:
+                row = self._conn.execute(
+                    'SELECT results FROM search_results WHERE query_key = ? AND session_id = ? AND created_at >= ?',
+                    (key, session_id, cutoff)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    'SELECT results FROM search_results WHERE query_key = ? AND created_at >= ? ORDER BY created_at DESC LIMIT 1',
+                    (key, cutoff)
+                ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, query: str, results: List, session_id: str = None):
+        key = normalize_query(query)
+        if not key:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO search_results (session_id, query_key, results, created_at) VALUES (?, ?, ?, ?)',
+                (session_id or "websearch", key, json.dumps(results), now)
+            )
+            # Expired rows are purged as new ones arrive
+            self._conn.execute('DELETE FROM search_results WHERE created_at < ?', (now - self.ttl_seconds,))
+            self._conn.commit()
+
+
+class TieredSearchCache:
+    """
+    Two-tier search result cache: an exact-match SQLite lookup first, then (optionally) the
+    semantic tier, which only answers above its similarity threshold. Semantic hits are copied
+    into the exact tier so the next identical query skips the embedding.
+    """
+
+    def __init__(self, exact: ExactSearchCache, semantic: SemanticSearchCache = None):
+        self.exact = exact
+        self.semantic = semantic
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+    def get(self, query: str, session_id: str = None) -> Optional[List]:
+        results = self.exact.get(query, session_id)
+        if results is not None:
+            self.stats["exact_hits"] += 1
+            return results
+        if self.semantic is not None:
+            results = self.semantic.get(query, session_id)
+            if results is not None:
+                self.stats["semantic_hits"] += 1
+                self.exact.put(query, results, session_id)
+                return results
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, query: str, results: List, session_id: str = None):
+        self.exact.put(query, results, session_id)
+        if self.semantic is not None:
+            self.semantic.put(query, results, session_id)
+
+
+_lock = threading.Lock()
+_search_cache = None
+
+
+def get_search_cache() -> TieredSearchCache:
+    """Process-wide tiered search cache; the semantic tier (and its compaction job) only if enabled."""
+    global _search_cache
+    if _search_cache is None:
+        with _lock:
+            if _search_cache is None:
+                semantic = None
+                if Config().get('web_search.cache.semantic_enabled', True):
+                    semantic = SemanticSearchCache()
+                    semantic.start_compaction()
+                _search_cache = TieredSearchCache(ExactSearchCache(), semantic)
+    return _search_cache
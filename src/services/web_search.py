@@ -1,24 +1,66 @@
 from duckduckgo_search import DDGS
-from playwright.sync_api import sync_playwright
 import time
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from bs4 import BeautifulSoup
 import re
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import requests
-import io
 import PyPDF2
+import tempfile
+from concurrent.futures import CancelledError, ProcessPoolExecutor
 import os
 import random
-import json
+import threading
+from collections import OrderedDict
 from src.core.query_sanitizer import sanitize_query
 import logging
-from src.core.knowledge_base import KnowledgeBase
+from src.services.search_cache import get_search_cache
+from src.services.browser_pool import get_browser_pool
+from src.services.scrape_profiles import load_scrape_profiles, load_scrape_profile_overrides, profile_for_url
+from src.services.page_cache import PageCache, get_page_cache
+from src.services.http_client import get_http_client
 from src.core.config import Config
 config = Config()
 
 logger = logging.getLogger(__name__)
 
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = 'lxml'
+except ImportError:
+    _HTML_PARSER = 'html.parser'
+
+def _extract_pdf_pages(pdf_file, max_chars: int = None, start: int = 0, stop: int = None) -> str:
+    """Text of pages [start, stop) of a PDF, stopping early once max_chars characters have been extracted."""
+    reader = PyPDF2.PdfReader(pdf_file, strict=False)
+    parts = []
+    total = 0
+    for index in range(start, len(reader.pages) if stop is None else min(stop, len(reader.pages))):
+        text = reader.pages[index].extract_text() or ''
+        parts.append(text)
+        total += len(text) + 1
+        if max_chars and total >= max_chars:
+            break
+    return "\n".join(parts)
+
+
+def _extract_pdf_range(path: str, start: int, stop: int) -> str:
+    with open(path, 'rb') as pdf_file:
+        return _extract_pdf_pages(pdf_file, start=start, stop=stop)
+
+
+def _extract_pdf_parallel(path: str, workers: int) -> str:
+    """Full text of a PDF on disk, extracted in page ranges across a process pool."""
+    with open(path, 'rb') as pdf_file:
+        page_count = len(PyPDF2.PdfReader(pdf_file, strict=False).pages)
+    if page_count < workers * 4:
+        return _extract_pdf_range(path, 0, page_count)
+    step = -(-page_count // workers)
+    starts = list(range(0, page_count, step))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = executor.map(_extract_pdf_range, [path] * len(starts), starts, [start + step for start in starts])
+        return "\n".join(parts)
+
 class GoogleSearchAPI:
     def __init__(self, api_key, cse_id, max_results=5, timeout=30):
         self.api_key = api_key
@@ -32,7 +74,7 @@ class GoogleSearchAPI:
             f"&key={self.api_key}&cx={self.cse_id}&num={self.max_results}"
         )
         try:
-            resp = requests.get(url, timeout=self.timeout)
+            resp = get_http_client().get(url, timeout=self.timeout)
             resp.raise_for_status()
             data = resp.json()
             results = []
@@ -52,7 +94,9 @@ class WebSearchService:
     def __init__(self, max_results: int = 5, timeout: int = 30):
         self.max_results = max_results
         self.timeout = timeout
-        self.scrape_timeout = 12  # seconds for Playwright scraping
+        # Named browser load settings (blocked resources, wait condition, timeout), chosen per domain
+        self.scrape_profiles = load_scrape_profiles()
+        self.scrape_profile_overrides = load_scrape_profile_overrides()
         self.ddgs = DDGS()
         self.tavily_api_key = os.getenv('TAVILY_API_KEY')
         self.user_agents = [
@@ -66,25 +110,45 @@ class WebSearchService:
         self.google_api_key = os.getenv('GOOGLE_API_KEY')
         self.google_cse_id = os.getenv('GOOGLE_CSE_ID')
         self.google_search = GoogleSearchAPI(self.google_api_key, self.google_cse_id, self.max_results, self.timeout)
-        # Initialize knowledge base for caching
-        self.kb = KnowledgeBase(
-            qdrant_url=config.get('qdrant.url', 'http://localhost:6333'),
-            collection_name=config.get('qdrant.collection_name', 'research_knowledge')
-        )
+        # Exact-match SQLite cache in front of the semantic (vector) cache, both with TTL-based expiry
+        self.search_cache = get_search_cache()
+        # Shared Chromium with reusable pages, started on the first scrape
+        self.browser_pool = get_browser_pool()
+        # All web I/O (search APIs, static pages, PDFs) shares one pooled keep-alive HTTP client
+        self.http = get_http_client()
+        # Static fetch tier: good enough when it yields min_static_chars of text
+        self.fetch_timeout = config.get('web_search.fetch.timeout', 10)
+        self.min_static_chars = config.get('web_search.fetch.min_chars', 500)
+        self.max_static_bytes = config.get('web_search.fetch.max_bytes', 5 * 1024 * 1024)
+        # PDF extraction: download cap, in-memory spool size, character budget and full-text worker processes
+        self.pdf_max_bytes = config.get('web_search.pdf.max_bytes', 50 * 1024 * 1024)
+        self.pdf_spool_bytes = config.get('web_search.pdf.spool_bytes', 8 * 1024 * 1024)
+        self.pdf_max_chars = config.get('web_search.pdf.max_chars', 5000)
+        self.pdf_workers = config.get('web_search.pdf.workers') or 1
+        # Extracted page text by URL, revalidated with ETag/Last-Modified once stale
+        self.page_cache = get_page_cache()
+        # url -> {"tier", "seconds", "chars", ...} for the most recent scrapes
+        self.scrape_stats = OrderedDict()
+        self.scrape_tier_counts = {}
+        self._stats_lock = threading.Lock()
+        # Log HTTP connection reuse and tier counts once every this many scrapes (0 disables)
+        self.stats_log_interval = config.get('web_search.http.stats_log_interval', 50)
+        self._scrape_count = 0
     
     def get_cached_results(self, query: str, session_id: str = None) -> list:
-        cached = self.kb.retrieve_research(query, session_id=session_id, limit=1)
+        try:
+            cached = self.search_cache.get(query, session_id=session_id)
+        except Exception as e:
+            logger.warning(f"[WebSearchService] Failed to read cached results: {e}")
+            return []
         if cached:
             logger.info(f"[WebSearchService] Using cached search results for query: '{query}'")
-            try:
-                return json.loads(cached[0]) if isinstance(cached[0], str) else cached[0]
-            except Exception:
-                return cached[0]
+            return cached
         return []
 
     def cache_results(self, query: str, results: list, session_id: str = None):
         try:
-            self.kb.store_research(json.dumps(results), query, session_id or "websearch")
+            self.search_cache.put(query, results, session_id)
         except Exception as e:
             logger.warning(f"[WebSearchService] Failed to cache results: {e}")
 
@@ -97,7 +161,7 @@ class WebSearchService:
         headers = {"Authorization": f"Bearer {self.tavily_api_key}"}
         payload = {"query": query, "max_results": self.max_results}
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=self.timeout)
+            response = self.http.post(url, json=payload, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
             # Normalize Tavily results to DuckDuckGo format
@@ -169,67 +233,277 @@ class WebSearchService:
         self.cache_results(clean_query, google_results, session_id)
         return google_results
     
-    def extract_pdf_text(self, url: str) -> str:
-        """Download and extract text from a PDF URL using PyPDF2"""
+    def extract_pdf_text(self, url: str, full_text: bool = False) -> str:
+        """
+        Download a PDF and extract its text with PyPDF2.
+        The download is streamed into a spooled temp file and cut off at pdf_max_bytes. Pages are
+        extracted lazily until pdf_max_chars is reached, unless full_text is set (e.g. for ingestion),
+        in which case large PDFs are split across pdf_workers processes.
+        """
+        return self._extract_pdf(url, full_text)[0]
+
+    def _extract_pdf(self, url: str, full_text: bool = False, response=None) -> Tuple[str, str]:
+        """
+        extract_pdf_text, also returning how the text was served: 'cache', 'revalidated' or 'pdf'.
+        response is an open streamed GET of url (a static fetch that turned out to be a PDF) to read
+        instead of downloading the file again; it is closed here.
+        """
+        cache_key = f"{url}#full" if full_text else url
+        cached = None
+        if response is None:
+            cached = self.page_cache.get(cache_key) if self.page_cache else None
+            if cached and cached["fresh"]:
+                return cached["text"], 'cache'
+        parallel = full_text and self.pdf_workers > 1
         try:
-            response = requests.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            with io.BytesIO(response.content) as pdf_file:
-                reader = PyPDF2.PdfReader(pdf_file)
-                text = "\n".join(page.extract_text() or '' for page in reader.pages)
+            if response is None:
+                response = self.http.get(url, headers=PageCache.conditional_headers(cached), timeout=self.timeout, stream=True)
+            with response:
+                if response.status_code == 304 and cached:
+                    self.page_cache.touch(cache_key)
+                    return cached["text"], 'revalidated'
+                response.raise_for_status()
+                # Process workers need a real file to open; otherwise small PDFs never leave memory
+                if parallel:
+                    pdf_file = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+                else:
+                    pdf_file = tempfile.SpooledTemporaryFile(max_size=self.pdf_spool_bytes)
+                with pdf_file:
+                    self._download_pdf(url, response, pdf_file)
+                    if parallel:
+                        pdf_file.close()
+                        try:
+                            text = _extract_pdf_parallel(pdf_file.name, self.pdf_workers)
+                        finally:
+                            os.unlink(pdf_file.name)
+                    else:
+                        text = _extract_pdf_pages(pdf_file, None if full_text else self.pdf_max_chars)
             # Limit text length
-            if len(text) > 5000:
-                text = text[:5000] + "..."
-            return text
+            if not full_text and len(text) > self.pdf_max_chars:
+                text = text[:self.pdf_max_chars] + "..."
+            if self.page_cache:
+                self.page_cache.put(cache_key, text, response.headers, response.status_code, 'pdf')
+            return text, 'pdf'
         except Exception as e:
             logger.error(f"PDF extraction error for {url}: {e}")
-            return ""
+            return "", 'pdf'
+
+    def _download_pdf(self, url: str, response, pdf_file):
+        """Stream the response body into pdf_file, stopping at pdf_max_bytes."""
+        size = 0
+        for block in response.iter_content(chunk_size=64 * 1024):
+            if size + len(block) > self.pdf_max_bytes:
+                # Bounds download cost; a cut-off file is parsed non-strictly and may yield nothing
+                logger.warning(f"[WebSearchService] PDF {url} exceeds {self.pdf_max_bytes} bytes, truncating download")
+                pdf_file.write(block[:self.pdf_max_bytes - size])
+                break
+            pdf_file.write(block)
+            size += len(block)
+        pdf_file.flush()
+        pdf_file.seek(0)
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=2, min=2, max=8), retry=retry_if_exception_type(Exception))
-    def scrape_url(self, url: str) -> str:
-        """Scrape content from a URL using Playwright or extract PDF if applicable. Returns empty string on failure."""
+    def scrape_url(self, url: str, cancel: threading.Event = None) -> str:
+        """
+        Scrape content from a URL. Returns empty string on failure, or once `cancel` is set (another
+        scrape in a race won): the browser tier is then skipped or its page load abandoned.
+        Fresh pages come from the page cache and stale ones are revalidated with a conditional GET.
+        PDFs go to extract_pdf_text; other pages are first fetched with a plain HTTP GET, and only
+        rendered in the browser pool when the static HTML has too little text or is a JavaScript shell,
+        the request was refused (401, 403, 429) or failed at the network level. Other error statuses give "".
+        """
+        start = time.perf_counter()
         # PDF/ArXiv handling
         if url.lower().endswith('.pdf') or 'arxiv.org' in url.lower():
-            return self.extract_pdf_text(url)
+            text, tier = self._extract_pdf(url)
+            self._record_scrape(url, tier, start, text)
+            return text
+        cached = self.page_cache.get(url) if self.page_cache else None
+        if cached and cached["fresh"]:
+            self._record_scrape(url, 'cache', start, cached["text"])
+            return cached["text"]
+        reason = None
+        response = None
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-                page.set_default_timeout(self.scrape_timeout * 1000)
-                
-                # Navigate to the page
-                page.goto(url)
-                
-                # Wait for content to load
-                page.wait_for_load_state('networkidle')
-                
-                # Get the page content
-                content = page.content()
-                
-                browser.close()
-                
-                # Extract text content
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # Remove script and style elements
-                for script in soup(["script", "style"]):
-                    script.decompose()
-                
-                # Get text and clean it
-                text = soup.get_text()
-                lines = (line.strip() for line in text.splitlines())
-                chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                text = ' '.join(chunk for chunk in chunks if chunk)
-                
-                # Limit text length
-                if len(text) > 5000:
-                    text = text[:5000] + "..."
-                
+            text, reason, response = self._fetch_static(url, cached)
+            if reason == 'not modified':
+                self.page_cache.touch(url)
+                self._record_scrape(url, 'revalidated', start, text)
+                return text
+            if reason is None:
+                self._cache_page(url, text, response, 'http')
+                self._record_scrape(url, 'http', start, text)
+                return text
+            if reason == 'pdf':
+                # The static response is still open: its body is the PDF
+                text, tier = self._extract_pdf(url, response=response)
+                self._record_scrape(url, tier, start, text)
                 return text
-                
+            if reason == 'unavailable':
+                # A missing or broken page renders no better in a browser
+                self._record_scrape(url, 'http', start, '', error=f"HTTP {response.status_code}")
+                return ""
+            if reason == 'unsupported':
+                self._record_scrape(url, 'http', start, '', error=f"unsupported content type {response.headers.get('Content-Type')}")
+                return ""
+        except Exception as e:
+            reason = f"http error: {e}"
+        if cancel is not None and cancel.is_set():
+            self._record_scrape(url, 'http', start, '', reason, error='cancelled')
+            return ""
+        try:
+            # Pooled long-lived browser: no Chromium launch per URL
+            profile = profile_for_url(url, self.scrape_profiles, self.scrape_profile_overrides)
+            content = self.browser_pool.get_content(url, profile=profile, cancel=cancel)
+            text = self._html_to_text(content)
+            # The static response's validators still apply: the rendered page comes from the same HTML
+            self._cache_page(url, text, response, 'browser')
+            self._record_scrape(url, 'browser', start, text, reason, profile=profile.name)
+            return text
+        except CancelledError:
+            self._record_scrape(url, 'browser', start, '', reason, error='cancelled')
+            return ""
         except Exception as e:
             logger.error(f"[WebSearchService] Scraping error for {url}: {e}")
+            self._record_scrape(url, 'browser', start, '', reason, error=str(e))
             return ""  # Never raise, just return empty string
+
+    def _cache_page(self, url: str, text: str, response, tier: str):
+        if self.page_cache:
+            headers = response.headers if response is not None else None
+            status = response.status_code if response is not None else None
+            self.page_cache.put(url, text, headers, status, tier)
+
+    def _fetch_static(self, url: str, cached: Dict = None):
+        """
+        Plain HTTP GET of url, conditional when there is a stale cached copy. Returns (text, reason, response):
+        reason is None when the static page is good enough, 'not modified' when the cached text is still
+        valid, 'pdf' for a PDF response, 'unavailable' for an error status a browser would not get past
+        (404, 410, 5xx, ...), 'unsupported' for a body that is not text, or otherwise why the page needs
+        the browser. The body is streamed and read only up to max_static_bytes; the response is closed
+        on return, except for a PDF, whose body is left for _extract_pdf to read.
+        """
+        headers = {"User-Agent": random.choice(self.user_agents)}
+        headers.update(PageCache.conditional_headers(cached))
+        response = self.http.get(url, headers=headers, timeout=self.fetch_timeout, stream=True)
+        content_type = response.headers.get('Content-Type', '').lower()
+        if response.status_code < 300 and 'application/pdf' in content_type:
+            return '', 'pdf', response
+        with response:
+            if response.status_code == 304 and cached:
+                return cached["text"], 'not modified', response
+            if response.status_code in self._BROWSER_STATUSES:
+                return '', f"HTTP {response.status_code}", response
+            if response.status_code >= 400:
+                return '', 'unavailable', response
+            if content_type and not any(kind in content_type for kind in ('text/', 'html', 'xml', 'json')):
+                return '', 'unsupported', response
+            html = self._read_body(url, response)
+        if 'html' not in content_type and content_type.startswith('text/'):
+            text = ' '.join(html.split())
+            return (text[:5000] + "...") if len(text) > 5000 else text, None, response
+        text = self._html_to_text(html)
+        if self._looks_like_js_shell(html, text):
+            return text, 'javascript shell', response
+        if len(text) < self.min_static_chars:
+            return text, f"only {len(text)} chars of static text", response
+        return text, None, response
+
+    def _read_body(self, url: str, response) -> str:
+        """Decoded body of a streamed response, cut off at max_static_bytes."""
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > self.max_static_bytes:
+            logger.info(f"[WebSearchService] {url} is {length} bytes, reading the first {self.max_static_bytes}")
+        body = bytearray()
+        for block in response.iter_content(chunk_size=64 * 1024):
+            body += block[:self.max_static_bytes - len(body)]
+            if len(body) >= self.max_static_bytes:
+                break
+        try:
+            return body.decode(response.encoding or 'utf-8', errors='replace')
+        except LookupError:
+            return body.decode('utf-8', errors='replace')
+
+    # Statuses bot protection and rate limiting answer plain clients with; a real browser may still get the page
+    _BROWSER_STATUSES = (401, 403, 429)
+
+    _JS_SHELL_MARKERS = re.compile(
+        r'<div[^>]+id=["\'](?:root|app|__next|__nuxt)["\'][^>]*>\s*</div>'
+        r'|<app-root[^>]*>\s*</app-root>'
+        r'|(?:enable|requires?) javascript',
+        re.IGNORECASE
+    )
+
+    def _looks_like_js_shell(self, html: str, text: str) -> bool:
+        """Whether the static HTML is a client-rendered shell: an empty app mount point or a 'please enable JavaScript' page."""
+        if len(text) >= self.min_static_chars * 4:
+            return False
+        return bool(self._JS_SHELL_MARKERS.search(html))
+
+    def _record_scrape(self, url: str, tier: str, start: float, text: str, fallback_reason: str = None,
+                       error: str = None, profile: str = None):
+        """Record which tier served a URL ('cache', 'revalidated', 'http', 'browser' or 'pdf'), how long it took and how much text it got."""
+        entry = {"tier": tier, "seconds": round(time.perf_counter() - start, 3), "chars": len(text)}
+        if fallback_reason:
+            entry["fallback_reason"] = fallback_reason
+        if error:
+            entry["error"] = error
+        if profile:
+            entry["profile"] = profile
+        with self._stats_lock:
+            self.scrape_stats[url] = entry
+            self.scrape_stats.move_to_end(url)
+            while len(self.scrape_stats) > 1000:
+                self.scrape_stats.popitem(last=False)
+            self.scrape_tier_counts[tier] = self.scrape_tier_counts.get(tier, 0) + 1
+            self._scrape_count += 1
+            log_stats = self.stats_log_interval and self._scrape_count % self.stats_log_interval == 0
+        logger.info(f"[WebSearchService] Scraped {url} via {tier} in {entry['seconds']}s ({entry['chars']} chars)")
+        if log_stats:
+            self._log_connection_stats()
+
+    def _log_connection_stats(self):
+        http = self.http.stats()
+        with self._stats_lock:
+            tiers = dict(self.scrape_tier_counts)
+        logger.info(
+            f"[WebSearchService] HTTP connections: {http['reused']}/{http['requests']} requests reused a connection "
+            f"({http['reuse_ratio']:.0%}), {http['connections_opened']} opened, {http['errors']} errors; scrape tiers {tiers}"
+        )
+
+    def health(self) -> Dict:
+        """Scrape tier counts plus the shared HTTP client, browser pool and page cache counters."""
+        with self._stats_lock:
+            tiers = dict(self.scrape_tier_counts)
+            scrapes = self._scrape_count
+        return {
+            "scrapes": scrapes,
+            "scrape_tiers": tiers,
+            "http": self.http.stats(),
+            "browser_pool": self.browser_pool.health(),
+            "page_cache": dict(self.page_cache.stats) if self.page_cache else None
+        }
+
+    @staticmethod
+    def _html_to_text(content: str, max_chars: int = 5000) -> str:
+        """Visible text of an HTML document, whitespace-collapsed and truncated to max_chars."""
+        soup = BeautifulSoup(content, _HTML_PARSER)
+        
+        # Remove script and style elements
+        for script in soup(["script", "style"]):
+            script.decompose()
+        
+        # Get text and clean it
+        text = soup.get_text()
+        lines = (line.strip() for line in text.splitlines())
+        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+        text = ' '.join(chunk for chunk in chunks if chunk)
+        
+        # Limit text length
+        if len(text) > max_chars:
+            text = text[:max_chars] + "..."
+        
+        return text
     
     def search_and_scrape(self, query: str) -> List[Dict]:
         """Search for a query, get up to max_results ranked URLs, and scrape them in order. Only use snippets if all scraping fails."""
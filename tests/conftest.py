@@ -0,0 +1,44 @@
+import hashlib
+import re
+import numpy as np
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    """Run each test in its own directory, so Config() writes its default config.yaml and data/ there."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class HashingModel:
+    """Deterministic bag-of-words encoder standing in for the sentence-transformer in tests."""
+
+    max_seq_length = 64
+    tokenizer = None
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+        self.calls = 0
+
+    def encode(self, texts, batch_size: int = 32, **kwargs):
+        self.calls += 1
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r'\w+', text.lower()):
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dimensions] += 1.0
+        return vectors
+
+
+@pytest.fixture
+def model():
+    return HashingModel()
+
+
+@pytest.fixture
+def kb(model):
+    from src.core.knowledge_base import KnowledgeBase
+    knowledge_base = KnowledgeBase(collection_name='test_knowledge', embedding_model=model, backend='embedded')
+    yield knowledge_base
+    if knowledge_base._store is not None:
+        knowledge_base._store.close()
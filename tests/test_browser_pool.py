@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import CancelledError
+import pytest
+from src.services.browser_pool import BrowserPool
+
+
+class FakePage:
+    def is_closed(self):
+        return False
+
+    async def unroute_all(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    def is_connected(self):
+        return True
+
+    async def new_context(self):
+        self.contexts.append(FakeContext())
+        return self.contexts[-1]
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = BrowserPool(size=1, checkout_timeout=5)
+    browser = FakeBrowser()
+
+    async def ensure_browser():
+        pool._browser = browser
+        return browser
+
+    monkeypatch.setattr(pool, '_ensure_browser', ensure_browser)
+    yield pool
+    pool.close()
+
+
+def test_cancel_abandons_a_running_page_and_frees_its_slot(pool):
+    cancel = threading.Event()
+    started = threading.Event()
+
+    async def slow(page):
+        started.set()
+        await asyncio.sleep(30)
+
+    threading.Thread(target=lambda: started.wait(5) and cancel.set()).start()
+    begin = time.monotonic()
+    with pytest.raises(CancelledError):
+        pool.run(slow, timeout=30, cancel=cancel)
+    assert time.monotonic() - begin < 5
+
+    async def quick(page):
+        return "done"
+
+    # The single slot is back, with a fresh context in place of the abandoned one
+    assert pool.run(quick, timeout=5) == "done"
+    assert [context.closed for context in pool._browser.contexts] == [True, False]
+    assert pool.health()["free_slots"] == 1
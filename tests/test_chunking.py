@@ -0,0 +1,59 @@
+import pytest
+from src.core.knowledge_base import KnowledgeBase
+
+
+def sentences(count, words=5):
+    return [' '.join(f"s{i}w{j}" for j in range(words - 1)) + f" end{i}." for i in range(count)]
+
+
+def test_chunks_respect_the_token_limit_and_lose_nothing(kb):
+    text = ' '.join(sentences(40))
+    chunks = list(kb.iter_chunks(text, chunk_size=22, overlap=0))
+    # The test model has no tokenizer, so tokens are words
+    assert all(len(chunk.split()) <= 22 for chunk in chunks)
+    assert ' '.join(chunks).split() == text.split()
+    # Chunks end on sentence boundaries
+    assert all(chunk.endswith('.') for chunk in chunks)
+
+
+def test_default_limit_is_what_the_encoder_accepts(kb, model):
+    chunks = list(kb.iter_chunks(' '.join(sentences(100)), overlap=0))
+    assert max(len(chunk.split()) for chunk in chunks) <= model.max_seq_length - 2
+
+
+def test_consecutive_chunks_overlap_by_whole_trailing_sentences(kb):
+    chunks = list(kb.iter_chunks(' '.join(sentences(20)), chunk_size=20, overlap=5))
+    assert len(chunks) > 2
+    for previous, current in zip(chunks, chunks[1:]):
+        last_sentence = previous.split('. ')[-1]
+        assert current.startswith(last_sentence.rstrip('.'))
+        assert len(current.split()) <= 20
+
+
+def test_over_long_sentences_are_split_into_word_runs(kb):
+    sentence = ' '.join(f"word{i}" for i in range(95)) + '.'
+    chunks = list(kb.iter_chunks(sentence, chunk_size=20, overlap=0))
+    assert [len(chunk.split()) for chunk in chunks] == [20, 20, 20, 20, 15]
+    assert ' '.join(chunks) == sentence
+
+
+def test_streamed_pieces_give_the_same_chunks_as_one_string(kb):
+    text = ' '.join(sentences(30, words=7)) + ' ' + ' '.join(f"tail{i}" for i in range(50))
+    # Pieces cut mid-word and mid-sentence, as reading a file in blocks would
+    pieces = [text[i:i + 13] for i in range(0, len(text), 13)]
+    assert list(kb.iter_chunks(iter(pieces), chunk_size=25, overlap=6)) == list(kb.iter_chunks(text, chunk_size=25, overlap=6))
+
+
+def test_a_buffer_without_sentence_boundaries_is_flushed_at_whitespace():
+    words = [f"w{i:03d}" for i in range(200)]
+    pieces = [' '.join(words[i:i + 10]) + ' ' for i in range(0, 200, 10)]
+    flushed = list(KnowledgeBase._iter_sentences(pieces, max_buffer=60))
+    assert len(flushed) > 1
+    assert all(len(piece) <= 60 for piece in flushed)
+    # No word is cut in half or dropped
+    assert ' '.join(flushed).split() == words
+
+
+@pytest.mark.parametrize('text', ['', '   ', '\n\n'])
+def test_blank_text_gives_no_chunks(kb, text):
+    assert list(kb.iter_chunks(text)) == []
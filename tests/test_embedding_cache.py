@@ -0,0 +1,53 @@
+import numpy as np
+from src.core.embedding_cache import DiskEmbeddingCache
+
+
+def vectors_for(texts, dimensions=4):
+    return [np.full(dimensions, float(len(text)), dtype=np.float32) for text in texts]
+
+
+def test_round_trip_and_reopen(tmp_path):
+    cache = DiskEmbeddingCache(str(tmp_path), 'model', 4, max_entries=8)
+    cache.put_many(['a', 'bb'], vectors_for(['a', 'bb']))
+    reopened = DiskEmbeddingCache(str(tmp_path), 'model', 4, max_entries=8)
+    found = reopened.get_many(['bb', 'missing', 'a'])
+    assert sorted(found) == [0, 2]
+    assert np.allclose(found[0], 2.0) and np.allclose(found[2], 1.0)
+
+
+def test_instances_sharing_a_directory_claim_distinct_slots(tmp_path):
+    first = DiskEmbeddingCache(str(tmp_path), 'model', 4, max_entries=8)
+    second = DiskEmbeddingCache(str(tmp_path), 'model', 4, max_entries=8)
+    # Interleaved writes from two "processes" must not reuse each other's slots
+    first.put_many(['a'], vectors_for(['a']))
+    second.put_many(['bbb'], vectors_for(['bbb']))
+    first.put_many(['cc'], vectors_for(['cc']))
+    for cache in (first, second):
+        found = cache.get_many(['a', 'cc', 'bbb'])
+        assert [float(found[i][0]) for i in range(3)] == [1.0, 2.0, 3.0]
+
+
+def test_lru_eviction_across_instances(tmp_path):
+    first = DiskEmbeddingCache(str(tmp_path), 'model', 4, max_entries=2)
+    second = DiskEmbeddingCache(str(tmp_path), 'model', 4, max_entries=2)
+    first.put_many(['a', 'bb'], vectors_for(['a', 'bb']))
+    second.get_many(['a'])
+    # Full: the least recently used entry ('bb') gives up its slot
+    second.put_many(['ccc'], vectors_for(['ccc']))
+    found = first.get_many(['a', 'bb', 'ccc'])
+    assert sorted(found) == [0, 2]
+    assert np.allclose(found[0], 1.0) and np.allclose(found[2], 3.0)
+    assert first.stats()["size"] == 2
+
+
+def test_a_slot_overwritten_without_its_entry_reads_as_a_miss(tmp_path):
+    cache = DiskEmbeddingCache(str(tmp_path), 'model', 4, max_entries=2)
+    cache.put_many(['a'], vectors_for(['a']))
+    slot = cache._conn.execute('SELECT slot FROM entries').fetchone()[0]
+    # A writer that crashed after filling the slot but before committing its claim
+    cache._vectors[slot] = 9.0
+    cache._tags[slot] = cache._tag(cache._key('other'))
+    reopened = DiskEmbeddingCache(str(tmp_path), 'model', 4, max_entries=2)
+    assert reopened.get_many(['a']) == {}
+    assert reopened.stats()["size"] == 0
+
@@ -0,0 +1,62 @@
+from src.core.ingest import BulkIngestor, Checkpoint
+
+
+def test_bulk_ingest_writes_each_flush_with_one_bulk_upsert(kb, tmp_path, monkeypatch):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    for i in range(3):
+        (docs / f'doc{i}.txt').write_text(' '.join(f"Sentence {i} number {n} about topic {n % 5}." for n in range(40)))
+    upserts = []
+    monkeypatch.setattr(kb.store, 'upsert', lambda points: upserts.append(len(points)))
+    bulk_calls = []
+    original = kb.store.bulk_upsert
+    monkeypatch.setattr(kb.store, 'bulk_upsert', lambda batches: bulk_calls.append(1) or original(batches))
+
+    checkpoint = Checkpoint(str(tmp_path / 'checkpoint.json'))
+    ingestor = BulkIngestor(kb, checkpoint, batch_size=10000)
+    for path in sorted(docs.iterdir()):
+        ingestor.add_file(str(path))
+    ingestor.flush()
+
+    assert upserts == []
+    assert bulk_calls == [1]
+    assert ingestor.stats["chunks"] > 0
+    assert ingestor.stats["chunks"] == len(kb.store.scroll(limit=10000))
+    assert all(checkpoint.is_done(str(path)) for path in docs.iterdir())
+
+
+def test_add_chunks_skips_stored_and_repeated_chunks(kb, model):
+    chunks = [("alpha beta", {"source": "a"}, 0, 2), ("gamma delta", {"source": "a"}, 1, 2), ("alpha beta", None, 0, 1)]
+    stats = kb.add_chunks(chunks)
+    assert (stats["chunks"], stats["skipped"]) == (3, 1)
+    stats = kb.add_chunks(chunks)
+    assert (stats["chunks"], stats["skipped"]) == (3, 3)
+    hits = kb.search_knowledge("gamma delta", limit=1, mode='dense')
+    assert hits[0]["text"] == "gamma delta"
+
+
+def test_failed_flush_keeps_its_files_out_of_the_checkpoint(kb, tmp_path, monkeypatch):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    for name in ('a', 'b', 'c'):
+        (docs / f'{name}.txt').write_text(f"Document {name} has one sentence.")
+    original = kb.store.bulk_upsert
+    failures = [RuntimeError("store unavailable")]
+
+    def bulk_upsert(batches):
+        if failures:
+            raise failures.pop()
+        return original(batches)
+
+    monkeypatch.setattr(kb.store, 'bulk_upsert', bulk_upsert)
+    checkpoint = Checkpoint(str(tmp_path / 'checkpoint.json'))
+    ingestor = BulkIngestor(kb, checkpoint, batch_size=2)
+    assert ingestor.add_file(str(docs / 'a.txt')) == []
+    assert ingestor.add_file(str(docs / 'b.txt')) == [str(docs / 'a.txt'), str(docs / 'b.txt')]
+    assert ingestor.add_file(str(docs / 'c.txt')) == []
+    assert ingestor.flush() == []
+
+    resumed = Checkpoint(checkpoint.path)
+    assert [resumed.is_done(str(docs / f'{name}.txt')) for name in ('a', 'b', 'c')] == [False, False, True]
+    assert ingestor.stats["failed_files"] == 2
+    assert [point["payload"]["text"] for point in kb.store.scroll(limit=10)] == ["Document c has one sentence."]
@@ -0,0 +1,37 @@
+import time
+from src.core.ingestion_queue import IngestionWorker, get_ingestion_worker
+
+
+def test_worker_batches_knowledge_jobs_per_knowledge_base(kb):
+    worker = IngestionWorker(batch_size=8)
+    for i in range(5):
+        worker.submit_knowledge(kb, f"Fact number {i} about vectors.", {"n": i})
+    assert worker.flush(timeout=10)
+    worker.shutdown(timeout=1)
+    assert worker.stats["ingested"] == 5 and worker.stats["failed"] == 0
+    assert len(kb.store.scroll()) == 5
+
+
+def test_artifact_reads_wait_for_queued_writes(kb):
+    worker = get_ingestion_worker()
+
+    def slow_store(code, session_id):
+        time.sleep(0.3)
+        kb.store_code(code, session_id)
+
+    worker.submit_call(slow_store, "print('hi')", "session-7")
+    assert kb.retrieve_code("session-7") == "print('hi')"
+
+
+def test_failed_calls_are_retried_then_counted(kb):
+    worker = IngestionWorker(max_retries=1, retry_backoff=0.01)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        raise RuntimeError("store unavailable")
+
+    worker.submit_call(flaky)
+    assert worker.flush(timeout=10)
+    worker.shutdown(timeout=1)
+    assert len(attempts) == 2 and worker.stats["failed"] == 1
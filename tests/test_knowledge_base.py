@@ -0,0 +1,151 @@
+import numpy as np
+import pytest
+
+
+def test_artifacts_are_stored_without_embedding(kb, model):
+    kb.store  # resolve the store before counting encoder calls
+    calls = model.calls
+    kb.store_code("print('hello')", "session-1")
+    kb.store_report("# Report", "session-1")
+    assert model.calls == calls
+    assert kb.retrieve_code("session-1") == "print('hello')"
+    assert kb.retrieve_report("session-1") == "# Report"
+    kb.store_code("print('again')", "session-1")
+    assert kb.retrieve_code("session-1") == "print('again')"
+
+
+def test_legacy_research_is_tagged_by_the_startup_migration(kb, model, monkeypatch):
+    legacy_vector = model.encode(["old findings about vectors"])[0].tolist()
+    kb.store.upsert([
+        {"id": "00000000-0000-0000-0000-000000000001", "vector": legacy_vector,
+         "payload": {"query": "vectors", "session_id": "old-session", "data": "old findings about vectors"}},
+        {"id": "00000000-0000-0000-0000-000000000002", "vector": legacy_vector,
+         "payload": {"query": "vectors", "session_id": "websearch", "data": '{"results": []}'}},
+    ])
+    kb.store_research("new findings", "vectors", "new-session")
+    # Reads never scan the collection themselves
+    monkeypatch.setattr(kb.store, 'iter_points', lambda *args, **kwargs: pytest.fail("read triggered a scan"))
+    assert kb.retrieve_research(session_id="old-session") == []
+    monkeypatch.undo()
+
+    assert kb.migrate_legacy_research() == 1
+    assert kb.retrieve_research(session_id="old-session") == ["old findings about vectors"]
+    assert kb.retrieve_research(session_id="websearch") == []
+    assert "old findings about vectors" in kb.retrieve_research(query="findings about vectors", limit=5)
+    # The migration runs once per collection, not on every start
+    kb._research_migrated = False
+    kb.store.upsert([{"id": "00000000-0000-0000-0000-000000000003", "vector": legacy_vector,
+                      "payload": {"query": "late", "session_id": "late-session", "data": "late"}}])
+    assert kb.migrate_legacy_research() == 0
+    assert kb.retrieve_research(session_id="late-session") == []
+
+
+@pytest.mark.parametrize('mode', ['dense', 'hybrid'])
+def test_chunk_searches_skip_research_artifacts_and_markers(kb, mode):
+    kb.add_knowledge("Vector databases store embeddings for similarity search.")
+    kb.store_research("research notes on vector databases", "vector databases", "session-1")
+    kb.store_code("print('vector databases')", "session-1")
+    kb.migrate_legacy_research()
+    for hits in (kb.search_knowledge("vector databases", limit=10, mode=mode),
+                 kb.search_many(["vector databases"], limit=10, mode=mode)[0]):
+        assert [hit["text"] for hit in hits] == ["Vector databases store embeddings for similarity search."]
+
+
+def wait_for_lexical_index(kb, timeout=5.0):
+    import time
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if kb.lexical_index is not None and not kb._lexical_building:
+            return kb.lexical_index
+        time.sleep(0.01)
+    raise AssertionError("BM25 index was not built")
+
+
+def test_hybrid_search_does_not_wait_for_the_lexical_index(kb, monkeypatch):
+    import threading
+    kb.add_knowledge_many([("Qdrant filters payloads.", None), ("BM25 scores terms.", None)])
+    release = threading.Event()
+    iter_points = kb.store.iter_points
+
+    def slow_iter_points(*args, **kwargs):
+        release.wait(5)
+        return iter_points(*args, **kwargs)
+
+    monkeypatch.setattr(kb.store, 'iter_points', slow_iter_points)
+    # Dense-only while the index builds, and the score is still the cosine similarity
+    hits = kb.search_knowledge("Qdrant filters payloads.", limit=2)
+    assert hits[0]["text"] == "Qdrant filters payloads."
+    assert hits[0]["score"] > 0.99 and hits[0]["rrf_score"] < 0.1
+    # A write during the build reaches the finished index
+    kb.add_knowledge("Zebra stripes confuse flies.")
+    release.set()
+    index = wait_for_lexical_index(kb)
+    assert len(index) == 3 and index.search("zebra")
+
+
+def test_lexical_only_hits_get_a_dense_score(kb, model):
+    texts = [f"Filler sentence number {i} about nothing." for i in range(30)] + ["The sigma_sq parameter."]
+    kb.add_knowledge_many([(text, None) for text in texts])
+    wait_for_lexical_index(kb)
+    hits = kb.search_knowledge("sigma_sq", limit=3)
+    match = next(hit for hit in hits if "sigma_sq" in hit["text"])
+    query = model.encode(["sigma_sq"])[0]
+    vector = model.encode([match["text"]])[0]
+    expected = float(query @ vector / ((query @ query) ** 0.5 * (vector @ vector) ** 0.5))
+    assert abs(match["score"] - expected) < 1e-5
+
+
+def test_lexical_index_is_rebuilt_to_see_other_writers(kb, model, monkeypatch):
+    kb.add_knowledge("Local chunk.")
+    wait_for_lexical_index(kb)
+    # Another process's write goes straight to the store, bypassing this process's index
+    kb.store.upsert([{"id": "00000000-0000-0000-0000-0000000000aa", "vector": model.encode(["remote"])[0].tolist(),
+                      "payload": {"text": "Remote chunk about walruses."}}])
+    assert not kb.lexical_index.search("walruses")
+    kb._lexical_attempted_at -= kb.lexical_refresh_seconds
+    kb.lexical_index  # starts the refresh
+    assert wait_for_lexical_index(kb).search("walruses")
+
+
+def test_auto_backend_is_probed_once_per_process(model, monkeypatch, caplog):
+    from src.core import knowledge_registry
+    from src.core.knowledge_base import KnowledgeBase
+    probes = []
+    monkeypatch.setattr(knowledge_registry, '_vector_backends', {})
+    monkeypatch.setattr(knowledge_registry, '_qdrant_reachable', lambda url: probes.append(url) or False)
+    stores = []
+    with caplog.at_level('WARNING', logger=knowledge_registry.__name__):
+        for name in ('research_knowledge', 'search_cache'):
+            stores.append(KnowledgeBase(qdrant_url='http://qdrant:6333', collection_name=name, embedding_model=model, backend='auto').store)
+    assert probes == ['http://qdrant:6333']
+    assert all(type(store).__name__ == 'EmbeddedVectorStore' for store in stores)
+    assert len([r for r in caplog.records if 'No Qdrant server' in r.message]) == 1
+    for store in stores:
+        store.close()
+
+
+def test_mmr_order_prefers_distinct_candidates_over_near_duplicates(kb):
+    query = np.array([1.0, 0.0, 0.0])
+    vectors = np.array([[0.9, 0.1, 0.0], [0.9, 0.1, 0.0], [0.6, 0.0, 0.8]], dtype=np.float32)
+    kb.mmr_lambda = 1.0
+    assert kb._mmr_order(query, vectors) == [0, 1, 2]
+    kb.mmr_lambda = 0.5
+    assert kb._mmr_order(query, vectors) == [0, 2, 1]
+
+
+def test_relevant_context_is_diverse_and_fits_the_budget(kb):
+    kb.search_mode = 'dense'
+    kb.add_knowledge_many([
+        ("Qdrant stores vectors for search.", None),
+        ("Qdrant stores vectors for search quickly.", None),
+        ("Vectors power semantic search in Qdrant and other engines like it.", None),
+    ])
+    kb.mmr_lambda = 1.0
+    assert "Vectors power semantic search" not in kb.get_relevant_context("qdrant vectors search", limit=2, max_chars=1000)
+    kb.mmr_lambda = 0.5
+    context = kb.get_relevant_context("qdrant vectors search", limit=2, max_chars=1000)
+    parts = context.split("\n\n")
+    assert len(parts) == 2
+    assert "Vectors power semantic search" in context
+    budget = len(parts[0]) + 5
+    assert kb.get_relevant_context("qdrant vectors search", limit=3, max_chars=budget).count("Previous research:") == 1
@@ -0,0 +1,25 @@
+import yaml
+from src.services.scrape_profiles import load_scrape_profiles, load_scrape_profile_overrides, profile_for_url
+
+
+def test_most_specific_override_wins():
+    profiles = load_scrape_profiles()
+    overrides = {"example.com": "spa", "docs.example.com": "full"}
+    assert profile_for_url("https://app.example.com/x", profiles, overrides).name == "spa"
+    assert profile_for_url("https://api.docs.example.com/x", profiles, overrides).name == "full"
+    assert profile_for_url("https://notexample.com/", profiles, overrides).name == "default"
+    assert profile_for_url("https://example.com/", profiles, {"example.com": "missing"}).name == "default"
+
+
+def test_overrides_and_profiles_come_from_config(isolated_cwd):
+    load_scrape_profiles()  # writes the default config.yaml
+    path = isolated_cwd / 'config.yaml'
+    config = yaml.safe_load(path.read_text())
+    config['web_search']['scrape_profile_overrides'] = {"Example.COM": "slow"}
+    config['web_search']['scrape_profiles']['slow'] = {"wait_until": "load", "timeout": 30}
+    path.write_text(yaml.dump(config))
+    profiles, overrides = load_scrape_profiles(), load_scrape_profile_overrides()
+    assert overrides == {"example.com": "slow"}
+    profile = profile_for_url("https://www.example.com/", profiles, overrides)
+    assert (profile.name, profile.wait_until, profile.timeout) == ("slow", "load", 30)
+    assert profile.blocks("image", "https://www.example.com/a.png")
@@ -0,0 +1,71 @@
+import threading
+import time
+from src.services.scrape_race import scrape_race, scrape_all
+
+
+class FakeService:
+    """Serves `pages` (url -> text) after `delays` (url -> seconds); a cancelled scrape returns early."""
+
+    def __init__(self, pages, delays=None):
+        self.pages = pages
+        self.delays = delays or {}
+        self.cancelled = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def scrape_url(self, url, cancel=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            delay = self.delays.get(url, 0)
+            if cancel is not None and cancel.wait(delay):
+                self.cancelled.append(url)
+                return ""
+            if cancel is None:
+                time.sleep(delay)
+            return self.pages.get(url, "")
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def results(*urls):
+    return [{'link': url, 'title': url} for url in urls]
+
+
+def test_race_keeps_the_first_good_page_and_cancels_running_losers():
+    service = FakeService(
+        {'slow': "s" * 1000, 'dead': "", 'good': "g" * 500, 'late': "l" * 1000},
+        {'slow': 10, 'good': 0.1, 'late': 1}
+    )
+    begin = time.monotonic()
+    scraped, status, _ = scrape_race(service, results('slow', 'dead', 'good', 'late', 'never'), width=3, min_chars=400)
+    assert [r['url'] for r in scraped] == ['good']
+    assert {s['url']: s['status'] for s in status} == {
+        'slow': 'cancelled', 'dead': 'fail', 'good': 'success', 'late': 'cancelled', 'never': 'skipped'
+    }
+    # The slow loser stops as soon as the race is decided instead of running out its delay
+    deadline = time.monotonic() + 2
+    while 'slow' not in service.cancelled and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert 'slow' in service.cancelled
+    assert time.monotonic() - begin < 5
+
+
+def test_race_falls_back_to_the_longest_page():
+    service = FakeService({'a': "short", 'b': "a bit longer", 'c': ""})
+    scraped, _, counts = scrape_race(service, results('a', 'b', 'c'), width=2, min_chars=400)
+    assert [r['url'] for r in scraped] == ['b']
+    assert sorted(c['url'] for c in counts) == ['a', 'b', 'c']
+
+
+def test_scrape_all_keeps_ranked_order_under_the_concurrency_cap():
+    urls = [f"u{i}" for i in range(8)]
+    service = FakeService({url: f"text {url}" for url in urls if url != 'u3'},
+                          {url: 0.05 * (8 - i) for i, url in enumerate(urls)})
+    scraped, status, _ = scrape_all(service, results(*urls), max_concurrency=3)
+    assert [r['url'] for r in scraped] == [url for url in urls if url != 'u3']
+    assert [s['status'] for s in status] == ['success'] * 3 + ['fail'] + ['success'] * 4
+    assert service.max_active == 3
@@ -0,0 +1,89 @@
+import pytest
+from src.core.knowledge_base import KnowledgeBase
+from src.services import search_cache
+
+
+@pytest.fixture
+def knowledge_bases(model, monkeypatch):
+    bases = {}
+
+    def get_knowledge_base(collection_name='research_knowledge', **kwargs):
+        if collection_name not in bases:
+            bases[collection_name] = KnowledgeBase(collection_name=collection_name, embedding_model=model, backend='embedded')
+        return bases[collection_name]
+
+    monkeypatch.setattr(search_cache, 'get_knowledge_base', get_knowledge_base)
+    yield get_knowledge_base
+    for kb in bases.values():
+        if kb._store is not None:
+            kb._store.close()
+
+
+def test_semantic_cache_round_trip_and_expiry(knowledge_bases):
+    cache = search_cache.SemanticSearchCache(ttl_seconds=60, threshold=0.9)
+    cache.put("python asyncio tutorial", [{"title": "asyncio"}])
+    assert cache.get("python asyncio tutorial") == [{"title": "asyncio"}]
+    assert cache.get("completely different words") is None
+    cache.ttl_seconds = -1
+    assert cache.get("python asyncio tutorial") is None
+    assert cache.compact() == 1
+
+
+def test_first_compaction_purges_legacy_entries_from_the_research_collection(knowledge_bases, model):
+    research = knowledge_bases('research_knowledge')
+    vector = model.encode(["legacy"])[0].tolist()
+    research.store.upsert([
+        {"id": "00000000-0000-0000-0000-000000000001", "vector": vector,
+         "payload": {"query": "q", "session_id": "websearch", "data": "[]"}},
+        {"id": "00000000-0000-0000-0000-000000000002", "vector": vector,
+         "payload": {"query": "q", "session_id": "session-1", "kind": "research", "data": "notes"}},
+    ])
+    cache = search_cache.SemanticSearchCache()
+    cache.put("fresh query", [], session_id=None)
+    assert cache.compact() == 1
+    assert [point["payload"]["data"] for point in research.store.scroll()] == ["notes"]
+    assert len(cache.kb.store.scroll()) == 1
+    # Later runs only do the regular TTL/size compaction
+    research.store.upsert([{"id": "00000000-0000-0000-0000-000000000003", "vector": vector,
+                            "payload": {"query": "q", "session_id": "websearch", "data": "[]"}}])
+    assert cache.compact() == 0
+
+
+def test_exact_cache_matches_normalized_queries_per_session(tmp_path, monkeypatch):
+    cache = search_cache.ExactSearchCache(str(tmp_path / 'search.db'), ttl_seconds=60)
+    cache.put("Python   asyncio Tutorial", [{"title": "asyncio"}], session_id="s1")
+    assert cache.get("python asyncio tutorial", session_id="s1") == [{"title": "asyncio"}]
+    assert cache.get("python asyncio tutorial", session_id="s2") is None
+    # Without a session the newest entry for the query is used
+    assert cache.get("PYTHON ASYNCIO TUTORIAL") == [{"title": "asyncio"}]
+    now = search_cache.time.time()
+    monkeypatch.setattr(search_cache.time, 'time', lambda: now + 61)
+    assert cache.get("python asyncio tutorial", session_id="s1") is None
+
+
+class RecordingSemanticTier:
+    def __init__(self, answers):
+        self.answers = answers
+        self.lookups = []
+        self.stored = []
+
+    def get(self, query, session_id=None):
+        self.lookups.append(query)
+        return self.answers.get(query)
+
+    def put(self, query, results, session_id=None):
+        self.stored.append(query)
+
+
+def test_tiered_cache_promotes_semantic_hits_to_the_exact_tier(tmp_path):
+    semantic = RecordingSemanticTier({"asyncio guide": [{"title": "guide"}]})
+    cache = search_cache.TieredSearchCache(search_cache.ExactSearchCache(str(tmp_path / 'search.db')), semantic)
+    assert cache.get("asyncio guide") == [{"title": "guide"}]
+    # The second lookup is answered by the exact tier without reaching the semantic one
+    assert cache.get("Asyncio  guide") == [{"title": "guide"}]
+    assert semantic.lookups == ["asyncio guide"]
+    assert cache.get("unknown") is None
+    cache.put("new query", [{"title": "new"}])
+    assert semantic.stored == ["new query"]
+    assert cache.get("new query") == [{"title": "new"}]
+    assert cache.stats == {"exact_hits": 2, "semantic_hits": 1, "misses": 1}
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+
+def ingest(kb):
+    kb.add_knowledge_many([
+        ("Qdrant stores vectors. It supports payload filters.", {"source": "a"}),
+        ("BM25 ranks documents by term frequency. Fusion combines rankings.", {"source": "b"}),
+    ])
+    kb.store_research("raw research notes", "what is qdrant", "session-1")
+
+
+@pytest.mark.parametrize('vector_dtype', ['float32', 'int8'])
+def test_snapshot_round_trip(kb, model, tmp_path, vector_dtype):
+    from src.core.knowledge_base import KnowledgeBase
+    ingest(kb)
+    manifest = kb.export_snapshot(str(tmp_path / 'snapshot'), vector_dtype=vector_dtype, batch_size=2)
+    originals = {point["id"]: point for batch in kb.store.iter_points(with_vectors=True) for point in batch}
+    assert manifest["count"] == len(originals)
+
+    target = KnowledgeBase(collection_name='restored', embedding_model=model, backend='embedded')
+    try:
+        assert target.import_snapshot(str(tmp_path / 'snapshot'), batch_size=2) == len(originals)
+        restored = {point["id"]: point for batch in target.store.iter_points(with_vectors=True) for point in batch}
+        assert restored.keys() == originals.keys()
+        for point_id, point in originals.items():
+            assert restored[point_id]["payload"] == point["payload"]
+            original = np.asarray(point["vector"], dtype=np.float32)
+            vector = np.asarray(restored[point_id]["vector"], dtype=np.float32)
+            if vector_dtype == 'float32':
+                # The embedded store renormalises on upsert, so only float rounding is allowed
+                assert np.allclose(vector, original, rtol=0, atol=1e-6)
+            else:
+                # int8 rounds each component to within half a step of its row's scale (max |v| / 127)
+                assert np.abs(vector - original).max() <= np.abs(original).max() / 254 * 1.01
+                assert float(vector @ original) / (np.linalg.norm(vector) * np.linalg.norm(original)) > 0.9999
+        assert target.retrieve_research(session_id="session-1") == ["raw research notes"]
+        for query in ("qdrant payload filters", "bm25 term frequency"):
+            assert [hit["id"] for hit in target.search_knowledge(query, mode='dense')] == \
+                [hit["id"] for hit in kb.search_knowledge(query, mode='dense')]
+        if vector_dtype == 'int8':
+            vectors_file = tmp_path / 'snapshot' / manifest["files"]["vectors"]
+            assert vectors_file.stat().st_size == len(originals) * kb.vector_size
+    finally:
+        target.store.close()
+
+
+def test_import_rejects_a_different_model(kb, tmp_path):
+    ingest(kb)
+    kb.export_snapshot(str(tmp_path / 'snapshot'))
+    kb.model_name = 'another-model'
+    with pytest.raises(ValueError):
+        kb.import_snapshot(str(tmp_path / 'snapshot'))
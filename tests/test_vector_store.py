@@ -0,0 +1,180 @@
+import os
+import numpy as np
+import pytest
+from src.core.vector_store import EmbeddedVectorStore
+
+
+def make_points(count, dimensions=8, seed=0, prefix='p'):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, dimensions)).astype(np.float32)
+    return [
+        {"id": f"{prefix}{i}", "vector": vectors[i].tolist(),
+         "payload": {"text": f"point {i}", "kind": "even" if i % 2 == 0 else "odd", "metadata": {"group": i % 3}}}
+        for i in range(count)
+    ]
+
+
+def open_store(tmp_path, **options):
+    return EmbeddedVectorStore(str(tmp_path), 'points', vector_size=8, **options)
+
+
+def test_embedded_store_refuses_a_second_owner(tmp_path):
+    store = open_store(tmp_path)
+    with pytest.raises(RuntimeError):
+        open_store(tmp_path)
+    store.close()
+    open_store(tmp_path).close()
+
+
+def test_filters_on_indexed_plain_and_dotted_fields(tmp_path):
+    store = open_store(tmp_path)
+    store.create_payload_index('kind')
+    points = make_points(12)
+    store.upsert(points)
+    assert {p["id"] for p in store.scroll(filters={"kind": "even"})} == {f"p{i}" for i in range(0, 12, 2)}
+    assert {p["id"] for p in store.scroll(filters={"kind": "odd", "metadata.group": 0})} == {"p3", "p9"}
+    hits = store.search(points[4]["vector"], limit=3, filters={"kind": "even"})
+    assert hits[0]["id"] == "p4" and hits[0]["score"] == pytest.approx(1.0, abs=1e-5)
+    assert all(hit["payload"]["kind"] == "even" for hit in hits)
+    # Replacing a payload moves the point between index buckets
+    store.upsert([{**points[4], "payload": {**points[4]["payload"], "kind": "odd"}}])
+    assert "p4" not in {p["id"] for p in store.scroll(filters={"kind": "even"})}
+    store.close()
+
+
+def test_small_writes_go_to_the_log_and_survive_reopening(tmp_path):
+    store = open_store(tmp_path)
+    points = make_points(10)
+    for point in points:
+        store.upsert([point])
+    store.delete(["p1", "p2"])
+    store.upsert([{**points[3], "payload": {"text": "replaced"}}])
+    # Nothing was compacted: the base files were never rewritten
+    assert not os.path.exists(os.path.join(store.directory, 'vectors.npy'))
+    store.close()
+
+    reopened = open_store(tmp_path)
+    assert len(reopened.scroll()) == 8
+    assert reopened.retrieve(["p1", "p2"]) == []
+    assert reopened.retrieve(["p3"])[0]["payload"] == {"text": "replaced"}
+    assert reopened.search(points[7]["vector"], limit=1)[0]["id"] == "p7"
+    reopened.close()
+
+
+def test_compaction_folds_the_log_into_the_base_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(EmbeddedVectorStore, 'COMPACT_MIN_ROWS', 5)
+    store = open_store(tmp_path)
+    store.bulk_upsert([make_points(6)[:3], make_points(6)[3:]])
+    assert os.path.exists(os.path.join(store.directory, 'vectors.npy'))
+    assert not os.path.exists(os.path.join(store.directory, 'log.jsonl'))
+    store.upsert(make_points(1, seed=1, prefix='q'))
+    store.close()
+    reopened = open_store(tmp_path)
+    assert sorted(p["id"] for p in reopened.scroll()) == ["p0", "p1", "p2", "p3", "p4", "p5", "q0"]
+    reopened.close()
+
+
+def test_torn_log_tail_is_dropped_on_load(tmp_path):
+    store = open_store(tmp_path)
+    store.upsert(make_points(3))
+    store.close()
+    with open(os.path.join(tmp_path, 'points', 'log.f32'), 'ab') as f:
+        f.write(np.ones(8, dtype=np.float32).tobytes())
+    with open(os.path.join(tmp_path, 'points', 'log.jsonl'), 'a') as f:
+        f.write('{"op": "upsert", "ids": ["torn"')
+    reopened = open_store(tmp_path)
+    assert sorted(p["id"] for p in reopened.scroll()) == ["p0", "p1", "p2"]
+    reopened.upsert(make_points(1, seed=2, prefix='r'))
+    reopened.close()
+    again = open_store(tmp_path)
+    assert sorted(p["id"] for p in again.scroll()) == ["p0", "p1", "p2", "r0"]
+    again.close()
+
+
+@pytest.mark.parametrize('quantization', ['int8', 'binary'])
+def test_quantized_search_rescores_with_float_vectors(tmp_path, quantization):
+    points = make_points(200, seed=3)
+    queries = np.random.default_rng(4).normal(size=(10, 8)).astype(np.float32)
+    exact = open_store(tmp_path / 'exact')
+    exact.upsert(points)
+    store = open_store(tmp_path / quantization, quantization=quantization, oversampling=200.0)
+    store.upsert(points[:150])
+    store.close()
+    # Reopen so base rows come from the memory map and the rest from the log
+    store = open_store(tmp_path / quantization, quantization=quantization, oversampling=200.0)
+    store.upsert(points[150:])
+    for query in queries:
+        expected = exact.search(query, limit=5)
+        hits = store.search(query, limit=5)
+        # With every row a candidate, rescoring must reproduce the exact ranking and cosine scores
+        assert [hit["id"] for hit in hits] == [hit["id"] for hit in expected]
+        assert [hit["score"] for hit in hits] == pytest.approx([hit["score"] for hit in expected], abs=1e-5)
+    unrescored = open_store(tmp_path / 'approx', quantization=quantization, rescore=False)
+    unrescored.upsert(points)
+    assert len(unrescored.search(queries[0], limit=5)) == 5
+    for s in (exact, store, unrescored):
+        s.close()
+
+
+def test_quantized_writes_keep_base_vectors_memory_mapped(tmp_path, monkeypatch):
+    points = make_points(500, seed=5)
+    store = open_store(tmp_path, quantization='int8')
+    store.bulk_upsert([points])
+    store._persist()
+    store.close()
+
+    store = open_store(tmp_path, quantization='int8')
+    store.upsert(make_points(1, seed=6, prefix='new'))
+    store.upsert([{**points[7], "vector": points[8]["vector"]}])
+    store.delete(["p9"])
+    # Only the two written vectors are in RAM; every base row is still read from vectors.npy
+    assert isinstance(store._vectors.base, np.memmap)
+    assert store._vectors.tail_rows == 2
+    assert len(store._vectors) == 500
+    assert store.retrieve(["p7"], with_vectors=True)[0]["vector"] == pytest.approx(
+        store.retrieve(["p8"], with_vectors=True)[0]["vector"], abs=1e-6)
+    assert store.search(points[8]["vector"], limit=2)[0]["score"] == pytest.approx(1.0, abs=1e-5)
+    assert store.retrieve(["p9"]) == []
+
+    monkeypatch.setattr(EmbeddedVectorStore, 'COMPACT_MIN_ROWS', 0)
+    monkeypatch.setattr(EmbeddedVectorStore, 'COMPACT_RATIO', 0)
+    store.upsert(make_points(1, seed=7, prefix='last'))
+    assert isinstance(store._vectors.base, np.memmap) and store._vectors.tail_rows == 0
+    store.close()
+    reopened = open_store(tmp_path, quantization='int8')
+    assert len(reopened.scroll()) == 501
+    assert reopened.search(points[8]["vector"], limit=2)[0]["score"] == pytest.approx(1.0, abs=1e-5)
+    reopened.close()
+
+
+def test_enabling_quantization_moves_existing_qdrant_vectors_to_disk(monkeypatch):
+    qdrant_client = pytest.importorskip('qdrant_client')
+    from qdrant_client.models import Distance, VectorParams
+    from src.core.vector_store import QdrantStore
+    client = qdrant_client.QdrantClient(':memory:')
+    client.create_collection('points', vectors_config=VectorParams(size=8, distance=Distance.COSINE))
+    updates = []
+    original = client.update_collection
+    monkeypatch.setattr(client, 'update_collection', lambda **kwargs: updates.append(kwargs) or original(**kwargs))
+    monkeypatch.setattr(qdrant_client, 'QdrantClient', lambda url: client)
+
+    QdrantStore('http://qdrant', 'points', vector_size=8, quantization='int8')
+    assert len(updates) == 1
+    assert updates[0]["vectors_config"][""].on_disk is True
+    assert updates[0]["quantization_config"].scalar.type.value == 'int8'
+
+
+def test_set_payload_is_logged_and_missing_keys_can_be_filtered(tmp_path):
+    store = open_store(tmp_path)
+    store.create_payload_index('kind')
+    store.upsert(make_points(4))
+    store.upsert([{"id": "bare", "vector": make_points(1)[0]["vector"], "payload": {"text": "no kind"}}])
+    assert [p["id"] for p in store.scroll(filters={"kind": None})] == ["bare"]
+    store.set_payload(["bare", "p1"], {"kind": "tagged"})
+    store.close()
+    reopened = open_store(tmp_path)
+    reopened.create_payload_index('kind')
+    assert sorted(p["id"] for p in reopened.scroll(filters={"kind": "tagged"})) == ["bare", "p1"]
+    assert reopened.retrieve(["bare"])[0]["payload"] == {"text": "no kind", "kind": "tagged"}
+    assert reopened.scroll(filters={"kind": None}) == []
+    reopened.close()
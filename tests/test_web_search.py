@@ -0,0 +1,153 @@
+import threading
+import pytest
+
+pytest.importorskip('duckduckgo_search')
+
+from src.services import web_search
+from src.services.page_cache import PageCache
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, text='', headers=None, body=None):
+        self.status_code = status_code
+        self.headers = headers or {'Content-Type': 'text/html'}
+        self.encoding = 'utf-8'
+        self._body = text.encode() if body is None else body
+        self.read_bytes = 0
+        self.closed = False
+
+    @property
+    def text(self):
+        raise AssertionError("the whole body must not be read at once")
+
+    def iter_content(self, chunk_size=65536):
+        for i in range(0, len(self._body), chunk_size):
+            self.read_bytes += len(self._body[i:i + chunk_size])
+            yield self._body[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class FakeBrowserPool:
+    def __init__(self):
+        self.urls = []
+
+    def get_content(self, url, profile=None, cancel=None):
+        self.urls.append(url)
+        return "<html><body><p>" + "rendered text " * 100 + "</p></body></html>"
+
+    def health(self):
+        return {"pages": len(self.urls)}
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr(web_search, 'get_search_cache', lambda: None)
+    monkeypatch.setattr(web_search, 'get_page_cache', lambda: PageCache(str(tmp_path / 'pages.db')))
+    browser = FakeBrowserPool()
+    monkeypatch.setattr(web_search, 'get_browser_pool', lambda: browser)
+    return web_search.WebSearchService()
+
+
+def serve(service, monkeypatch, *responses):
+    queue = list(responses)
+    monkeypatch.setattr(service.http, 'get', lambda url, **kwargs: queue.pop(0))
+    return queue
+
+
+@pytest.mark.parametrize('status', [404, 410, 500])
+def test_hard_errors_are_not_rendered_in_the_browser(service, monkeypatch, status):
+    serve(service, monkeypatch, FakeResponse(status))
+    assert service.scrape_url.__wrapped__(service, 'https://example.com/missing') == ""
+    assert service.browser_pool.urls == []
+    assert service.scrape_stats['https://example.com/missing'] == {
+        "tier": "http", "seconds": pytest.approx(0, abs=1), "chars": 0, "error": f"HTTP {status}"
+    }
+
+
+@pytest.mark.parametrize('status', [401, 403, 429])
+def test_refused_requests_fall_back_to_the_browser(service, monkeypatch, status):
+    serve(service, monkeypatch, FakeResponse(status))
+    text = service.scrape_url.__wrapped__(service, 'https://example.com/guarded')
+    assert "rendered text" in text
+    assert service.browser_pool.urls == ['https://example.com/guarded']
+    assert service.scrape_stats['https://example.com/guarded']["fallback_reason"] == f"HTTP {status}"
+
+
+def test_pdf_scrapes_record_how_they_were_served(service, monkeypatch):
+    url = 'https://example.com/paper.pdf'
+    service.page_cache.put(url, "cached pdf text", {'ETag': '"v1"'})
+    assert service.scrape_url.__wrapped__(service, url) == "cached pdf text"
+    assert service.scrape_stats[url]["tier"] == 'cache'
+
+    service.page_cache._conn.execute('UPDATE pages SET expires_at = 0 WHERE url = ?', (url,))
+    serve(service, monkeypatch, FakeResponse(304))
+    assert service.scrape_url.__wrapped__(service, url) == "cached pdf text"
+    assert service.scrape_stats[url]["tier"] == 'revalidated'
+    assert service.scrape_tier_counts == {'cache': 1, 'revalidated': 1}
+
+
+def test_health_reports_http_connection_stats(service):
+    service._record_scrape('https://example.com/a', 'http', 0.0, 'text')
+    health = service.health()
+    assert health["scrapes"] == 1
+    assert health["scrape_tiers"] == {"http": 1}
+    assert set(health["http"]) >= {"requests", "errors", "connections_opened", "reused", "reuse_ratio", "hosts"}
+    assert health["browser_pool"] == {"pages": 0}
+    assert health["page_cache"]["misses"] == 0
+
+
+def test_connection_stats_are_logged_every_interval(service, caplog):
+    service.stats_log_interval = 2
+    with caplog.at_level('INFO', logger=web_search.__name__):
+        service._record_scrape('https://example.com/a', 'http', 0.0, 'text')
+        assert 'HTTP connections' not in caplog.text
+        service._record_scrape('https://example.com/b', 'browser', 0.0, 'text')
+    assert 'HTTP connections' in caplog.text
+
+
+def test_pdf_behind_an_html_url_is_downloaded_once_within_the_cap(service, monkeypatch):
+    pdf = FakeResponse(headers={'Content-Type': 'application/pdf'}, body=b'%PDF' + b'x' * 300000)
+    queue = serve(service, monkeypatch, pdf)
+    service.pdf_max_bytes = 100000
+    service.scrape_url.__wrapped__(service, 'https://example.com/download?id=1')
+    assert queue == []
+    assert pdf.read_bytes <= service.pdf_max_bytes + 64 * 1024
+    assert pdf.closed
+    assert service.scrape_stats['https://example.com/download?id=1']["tier"] == 'pdf'
+    assert service.browser_pool.urls == []
+
+
+def test_static_html_is_read_up_to_max_bytes(service, monkeypatch):
+    page = FakeResponse(text="<html><body><p>" + "static words " * 100000 + "</p></body></html>")
+    serve(service, monkeypatch, page)
+    service.max_static_bytes = 200000
+    text = service.scrape_url.__wrapped__(service, 'https://example.com/long')
+    assert text.startswith("static words")
+    assert page.read_bytes <= service.max_static_bytes + 64 * 1024
+    assert page.closed
+
+
+def test_binary_bodies_are_not_read_or_rendered(service, monkeypatch):
+    image = FakeResponse(headers={'Content-Type': 'image/png'}, body=b'\x89PNG' * 1000)
+    serve(service, monkeypatch, image)
+    assert service.scrape_url.__wrapped__(service, 'https://example.com/logo') == ""
+    assert image.read_bytes == 0 and image.closed
+    assert service.browser_pool.urls == []
+
+
+def test_cancelled_scrapes_skip_the_browser(service, monkeypatch):
+    serve(service, monkeypatch, FakeResponse(403))
+    cancel = threading.Event()
+    cancel.set()
+    assert service.scrape_url.__wrapped__(service, 'https://example.com/guarded', cancel=cancel) == ""
+    assert service.browser_pool.urls == []
+    assert service.scrape_stats['https://example.com/guarded']["error"] == 'cancelled'